@@ -15,6 +15,7 @@ st.info("Conexiones de funciones de Arps aquí abajo.")
 
 import sys
 import os
+import numpy as np
 import plotly.graph_objects as go
 
 # Esto es para que Python encuentre tus funciones en la carpeta 'src'
@@ -23,9 +24,9 @@ from src.funciones_petroleras import predecir_declinacion_arps
 
 # 1. Carga de datos (Simulada por ahora o lee tu CSV)
 st.subheader("Visualización de Producción y Pronóstico")
-dias = list(range(0, 200))
-# Aquí conectaríamos tu función de Arps real
-produccion = [874 * (0.9985**d) for d in dias] 
+dias = np.arange(0, 200)
+# Función de Arps real: 0.9985^d equivale a una exponencial con di = -ln(0.9985)
+produccion = predecir_declinacion_arps(874, -np.log(0.9985), dias)
 
 # 2. Gráfico Interactivo
 fig = go.Figure()
@@ -1,14 +1,17 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from src.petro_logic import calcular_q_limite, get_documentation_pdf
+import numpy as np
+import plotly.graph_objects as go
+from src.petro_logic import calcular_q_limite, get_documentation_pdf, get_documentation_path
+from src.datos_compartidos import obtener_dataset
 
 
 st.set_page_config(page_title="Proyecto Añelo 2026", layout="wide")
 st.title("🛢️ Sistema de Gestión de Activos - VACA MUERTA 2026")
 
 
-df_campo = pd.read_csv('datos/datos_campo_masivos.csv')
+# Tabla compartida entre sesiones (se lee una vez por servidor); la sesión trabaja sobre su propia vista
+dataset_campo = obtener_dataset('datos/datos_campo_masivos.csv')
+df_campo = dataset_campo.vista()
 
 st.sidebar.header("Condiciones de Mercado")
 precio_brent = st.sidebar.slider("Precio Brent (USD/bbl)", 40, 120, 75)
@@ -21,7 +24,7 @@ q_lim_estandar = calcular_q_limite(opex_fijo_mensual/30, precio_brent, regalias)
 pozos_activos = df_campo[df_campo['prod_real_bpd'] > q_lim_estandar]
 prod_total = df_campo['prod_real_bpd'].sum()
 
-df_campo['rentable'] = df_campo['prod_real_bpd'] > q_lim_estandar
+df_campo = df_campo.assign(rentable=df_campo['prod_real_bpd'] > q_lim_estandar)
 pozos_riesgo = df_campo[df_campo['rentable'] == False]
 
 # --- INTERFAZ DINÁMICA ---
@@ -45,12 +48,22 @@ st.divider()
 # Gráfico dinámico: Distribución de Producción
 st.subheader("📊 Salud del Yacimiento")
 
-fig_dist = px.histogram(df_campo, x="prod_real_bpd", 
-                         color="rentable",
-                         title="Distribución de Pozos según Rentabilidad Actual",
-                         labels={'prod_real_bpd': 'Producción (bpd)', 'rentable': 'Es Rentable'},
-                         color_discrete_map={True: '#00FF00', False: '#FF4B4B'},
-                         template="plotly_dark")
+# Se grafica desde los bins del servidor (tamaño fijo), no un valor por pozo.
+# El bin que contiene al límite se reparte con el conteo exacto de pozos por debajo.
+hist_prod = dataset_campo.resumen().histogramas['prod_real_bpd']
+n_bajo_limite = int(np.count_nonzero(df_campo['prod_real_bpd'].to_numpy(dtype=float) <= q_lim_estandar))
+cuentas_bajo, cuentas_sobre = hist_prod.partir(q_lim_estandar, n_bajo_limite)
+
+visibles = hist_prod.ocupado()
+
+fig_dist = go.Figure()
+for rentable, cuentas, color in ((True, cuentas_sobre, '#00FF00'), (False, cuentas_bajo, '#FF4B4B')):
+    fig_dist.add_trace(go.Bar(x=hist_prod.centros[visibles], y=cuentas[visibles], width=hist_prod.anchos[visibles],
+                              name=str(rentable), marker_color=color,
+                              hovertemplate="%{x:.0f} bpd: %{y} pozos<extra></extra>"))
+fig_dist.update_layout(barmode='stack', bargap=0, template="plotly_dark",
+                       title="Distribución de Pozos según Rentabilidad Actual",
+                       xaxis_title='Producción (bpd)', yaxis_title='Pozos', legend_title_text='Es Rentable')
 
 # Línea de referencia del límite económico en el gráfico
 fig_dist.add_vline(x=q_lim_estandar, line_dash="dash", line_color="yellow", annotation_text="Punto de Equilibrio")
@@ -93,13 +106,11 @@ st.info("""
 st.sidebar.space(500)
 st.sidebar.divider()
 st.sidebar.title("Documentación")
-# Llamamos a la lógica para obtener el archivo
-pdf_bytes = get_documentation_pdf()
-
-if pdf_bytes:
+# Sólo verificamos que exista: los bytes se leen recién cuando alguien hace clic (data diferida)
+if get_documentation_path():
     st.sidebar.download_button(
         label="User Manual (PDF)",
-        data=pdf_bytes,
+        data=get_documentation_pdf,
         file_name="Manual_Usuario_Vaca_Muerta.pdf",
         mime="application/pdf"
     )
@@ -4,39 +4,35 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 
-from src.petro_logic import calcular_q_limite
+from src.petro_logic import calcular_q_limite, firma_archivo
+from src.almacenamiento import leer_manifiesto, cargar_resultados
+from src.reservas import reservas_por_pozo, resumir_reservas_campo
+from src.pronostico_agua import tendencia_desde_archivo
+from src.pronostico_campo import pronosticar_campo, capacidad_instalaciones
+from src.funciones_petroleras import categorizar_pozos
+from src.validacion import REGLAS_MONITOREO
+from src.datos_compartidos import obtener_dataset
+from src.optimizacion import estimar_candidatos, optimizar_intervenciones, resumir_plan
+from src.economia import vpn_por_pozo, vpn_portafolio
+from src.precios import RUTA_PRECIOS, cargar_precios, valorizar_produccion, resumir_valorizacion
+from src.ranking import TAMANO_PAGINA, Ranking, orden_por_valores
 
 
 st.set_page_config(layout="wide", page_title="Master Dashboard - Cuenca Neuquina")
 
+RUTA_MASIVOS = 'datos/datos_campo_masivos.csv'
+
 # --- LECTURA DE VOLUMEN CRÍTICO (Tus 100 pozos) ---
-@st.cache_data
-def cargar_datos_masivos():
-    try:
-        # Cargamos el archivo que generamos antes
-        df = pd.read_csv('datos/datos_campo_masivos.csv')
-        if df['water_cut'].max() > 1:
-         df['water_cut'] = df['water_cut'] / 100
-        return df
-       
-    except Exception as e:
-        st.error(f"No encontré el archivo: {e}")
-        return None
-
-df_campo = cargar_datos_masivos()
-
-# Esto es lo que nos faltó para redondear la sesión de hoy
-def limpiar_datos_operativos(df):
-    # 1. Filtramos producciones imposibles (menores a 0)
-    df['prod_real_bpd'] = df['prod_real_bpd'].clip(lower=0)
-    
-    # 2. Manejo de Nones: Si no hay dato, asumimos que el pozo está parado (0)
-    df['prod_real_bpd'] = df['prod_real_bpd'].fillna(0)
-    
-    return df
-
-# Aplicarlo antes de calcular el EBITDA
-df_campo = limpiar_datos_operativos(df_campo)
+# Dataset validado una sola vez por servidor y compartido (sólo lectura) entre sesiones.
+# Pipeline de validación (src/validacion.py): producciones negativas -> 0,
+# sin dato -> pozo parado (0) y water cut normalizado a fracción
+dataset_campo = obtener_dataset(RUTA_MASIVOS, REGLAS_MONITOREO)
+if dataset_campo is None:
+    st.error(f"No encontré el archivo: {RUTA_MASIVOS}")
+    st.stop()
+
+# Vista propia de esta sesión: las columnas derivadas no tocan el dataset compartido
+df_campo = dataset_campo.vista()
 
 # --- 2. CONTROLES DE ESCENARIO MACRO ---
 st.title("🛢️ Consola de Control de Activos - 100 Pozos")
@@ -47,18 +43,45 @@ with st.sidebar:
     opex_fijo_estimado = st.number_input("OPEX Fijo Promedio (USD/mes)", value=45000)
     costo_trat = st.slider("Costo Tratamiento (USD/bbl fluido)", 0.5, 5.0, 2.0)
     regalias = 0.12
+    tasa_descuento = st.slider("Tasa de Descuento Anual (%)", 0.0, 25.0, 10.0, 0.5) / 100
+
+    st.header("Plan de Intervenciones")
+    presupuesto_interv = st.number_input("Presupuesto de Intervención (USD)", value=2_000_000, step=100_000)
+    max_intervenciones = st.number_input("Intervenciones Máximas (cuadrillas)", min_value=1, value=20)
 
 # --- 3. CÁLCULO DE RENTABILIDAD EN LOTE ---
 # Calculamos el Q_limite para este escenario de costos
 q_lim_escenario = calcular_q_limite(opex_fijo_estimado / 30, brent, regalias)
 
 # Lógica de clasificación
-df_campo['Q_Limite'] = q_lim_escenario
-df_campo['Margen_BPD'] = df_campo['prod_real_bpd'] - q_lim_escenario
-df_campo['Estado'] = df_campo['Margen_BPD'].apply(lambda x: "✅ RENTABLE" if x > 0 else "🚨 ZONA ROJA")
+margen_bpd = df_campo['prod_real_bpd'] - q_lim_escenario
+df_campo = df_campo.assign(
+    Q_Limite=q_lim_escenario,
+    Margen_BPD=margen_bpd,
+    Estado=np.where(margen_bpd > 0, "✅ RENTABLE", "🚨 ZONA ROJA"),
+)
+
+# --- 3.b RESULTADOS PRECALCULADOS (worker nocturno: python -m src.precalculo) ---
+# Si el escenario coincide con el estándar precalculado, sumamos día de límite y cash flow sin recalcular
+@st.cache_data
+def cargar_precalculado(version):
+    return cargar_resultados('resumen_escenarios', version)
+
+manifiesto = leer_manifiesto()
+if manifiesto:
+    escenario_std = manifiesto.get('escenario', {})
+    if (brent in manifiesto.get('brent_estandar', [])
+            and opex_fijo_estimado == escenario_std.get('opex_mensual')
+            and costo_trat == escenario_std.get('costo_tratamiento_bbl')):
+        df_pre = cargar_precalculado(manifiesto.get('carpeta', manifiesto['version']))
+        if df_pre is not None:
+            df_pre = df_pre[df_pre['brent'] == brent].set_index('pozo_id')
+            df_campo['Dia_Limite'] = df_campo['pozo_id'].map(df_pre['dia_limite_economico'])
+            df_campo['CF_Horizonte_USD'] = df_campo['pozo_id'].map(df_pre['cf_acumulado_horizonte'])
+            st.caption(f"Resultados precalculados · versión {manifiesto['version']}")
 
 # --- 4. DASHBOARD DE ALTO IMPACTO ---
-m1, m2, m3 = st.columns(3)
+m1, m2, m3, m4, m5 = st.columns(5)
 with m1:
     st.metric("Total Pozos Analizados", len(df_campo))
 with m2:
@@ -69,25 +92,189 @@ with m3:
     ingreso_total = (df_campo['prod_real_bpd'] * brent * (1 - regalias)).sum()
     ebitda_total = ingreso_total - (opex_fijo_estimado * len(df_campo))
     st.metric("EBITDA Mensual Proyectado", f"USD {ebitda_total:,.0f}")
+with m4:
+    # Reservas remanentes hasta el límite económico (integral cerrada de Arps, sin curvas diarias)
+    reservas_campo = resumir_reservas_campo(reservas_por_pozo(df_campo, brent, opex_fijo_estimado, regalias))
+    st.metric("Reservas Remanentes (a Qel)", f"{reservas_campo['reservas_remanentes_bbl'] / 1e6:,.2f} MMbbl",
+              f"{reservas_campo['pozos_con_reservas']:.0f} pozos con reservas", delta_color="off")
+with m5:
+    # VPN de la flota en forma cerrada (src/economia.py): se recalcula con cada cambio de escenario
+    vpn_pozos = vpn_por_pozo(df_campo, brent, opex_fijo_estimado, costo_trat, regalias, tasa_descuento)
+    df_campo['VPN_USD'] = df_campo['pozo_id'].map(vpn_pozos.set_index('pozo_id')['vpn_usd'])
+    st.metric(f"VPN del Portafolio @ {tasa_descuento:.1%}", f"USD {vpn_pozos['vpn_usd'].sum() / 1e6:,.1f} M",
+              f"{(vpn_pozos['vpn_usd'] > 0).sum()} pozos con VPN > 0", delta_color="off")
+
+with st.expander("Sensibilidad del VPN del portafolio (Brent x tasa de descuento)"):
+    sensibilidad = vpn_portafolio(df_campo, range(40, 125, 10), [0.05, 0.08, 0.10, 0.12, 0.15],
+                                  opex_fijo_estimado, costo_trat, regalias)
+    tabla_vpn = sensibilidad.pivot(index='brent', columns='tasa_descuento', values='vpn_usd') / 1e6
+    tabla_vpn.columns = [f"{t:.0%}" for t in tabla_vpn.columns]
+    st.dataframe(tabla_vpn.style.format("{:,.1f}"), use_container_width=True)
+    st.caption("VPN en millones de USD, horizonte de 730 días, sin CAPEX.")
+
+# Distribuciones desde histogramas y sketches del servidor (src/distribuciones.py):
+# el gráfico lleva un valor por bin, no uno por pozo, y el margen es la producción corrida en Qel
+with st.expander("Distribuciones del campo (margen, water cut, eficiencia)"):
+    resumen_campo = dataset_campo.resumen()
+    st.dataframe(resumen_campo.percentiles(q_limite=q_lim_escenario).style.format("{:,.1f}"),
+                 use_container_width=True)
+    histogramas = [("Margen sobre Qel (bpd)", resumen_campo.margen(q_lim_escenario)),
+                   ("Water Cut (%)", resumen_campo.histogramas['water_cut']),
+                   ("Eficiencia (%)", resumen_campo.histogramas['eficiencia'])]
+    for columna, (titulo, hist) in zip(st.columns(len(histogramas)), histogramas):
+        visibles = hist.ocupado()
+        fig_hist = go.Figure(go.Bar(x=hist.centros[visibles], y=hist.cuentas[visibles], width=hist.anchos[visibles],
+                                    marker_color='#3498db'))
+        fig_hist.update_layout(title=titulo, template="plotly_dark", bargap=0, height=300,
+                               margin=dict(l=10, r=10, t=40, b=10), yaxis_title='Pozos')
+        columna.plotly_chart(fig_hist, use_container_width=True)
+    st.caption("Percentiles aproximados (sketch de cuantiles, error de rango ~1%); "
+               "valores fuera del rango de los bins se cuentan aparte y no se grafican.")
 
 # --- 5. RANKING Y FILTROS ---
 st.divider()
 st.subheader("📋 Ranking de Performance por Pozo")
 
+# Plan de intervenciones: greedy por VPN/costo bajo presupuesto y cuadrillas (src/optimizacion.py)
+# La clave del cache es la firma del dataset (no el DataFrame): no se hashea la tabla en cada rerun
+@st.cache_data
+def calcular_plan_intervenciones(firma_datos, brent, costo_trat, regalias, presupuesto, max_intervenciones):
+    df = obtener_dataset(RUTA_MASIVOS, REGLAS_MONITOREO).vista()
+    candidatos = estimar_candidatos(df, brent, regalias, costo_tratamiento_bbl=costo_trat)
+    return optimizar_intervenciones(candidatos, presupuesto, max_intervenciones)
+
+plan = calcular_plan_intervenciones(dataset_campo.firma, brent, costo_trat, regalias, presupuesto_interv, max_intervenciones)
+resumen_plan = resumir_plan(plan)
+p1, p2, p3 = st.columns(3)
+p1.metric("Pozos a Intervenir", resumen_plan['pozos'])
+p2.metric("Inversión del Plan", f"USD {resumen_plan['inversion_usd']:,.0f}")
+p3.metric("VPN del Plan", f"USD {resumen_plan['vpn_usd']:,.0f}", f"+{resumen_plan['uplift_bpd']:,.0f} bpd", delta_color="off")
+
+plan = plan.set_index('pozo_id')
+df_campo['Uplift_BPD'] = df_campo['pozo_id'].map(plan['uplift_bpd'])
+df_campo['VPN_Intervencion_USD'] = df_campo['pozo_id'].map(plan['vpn_usd'])
+df_campo['Prioridad'] = df_campo['pozo_id'].map(plan['prioridad'])
+df_campo['Intervenir'] = df_campo['pozo_id'].map(plan['intervenir'])
+
+# Orden por prioridad: se calcula una vez por plan (misma clave de cache que el plan)
+@st.cache_data
+def orden_por_prioridad(firma_datos, brent, costo_trat, regalias, presupuesto, max_intervenciones):
+    plan = calcular_plan_intervenciones(firma_datos, brent, costo_trat, regalias, presupuesto, max_intervenciones)
+    df = obtener_dataset(RUTA_MASIVOS, REGLAS_MONITOREO).vista()
+    return orden_por_valores(df['pozo_id'].map(plan.set_index('pozo_id')['prioridad']))
+
 # Filtro rápido
 estado_filtro = st.radio("Filtrar por condición:", ["Todos", "Solo Rentables", "Solo en Riesgo"], horizontal=True)
+orden_ranking = st.radio("Ordenar por:", ["Margen", "Prioridad de intervención"], horizontal=True)
 
-if estado_filtro == "Solo Rentables":
-    df_ver = df_campo[df_campo['Estado'] == "✅ RENTABLE"]
-elif estado_filtro == "Solo en Riesgo":
-    df_ver = df_campo[df_campo['Estado'] == "🚨 ZONA ROJA"]
+# Ranking paginado (src/ranking.py): no se ordena ni se envía la tabla completa en cada rerun.
+# Margen = producción - Qel, así que el orden por margen es el índice de producción del dataset
+# (se arma una vez) y "rentables" / "en riesgo" son cortes de ese índice en Qel.
+if orden_ranking == "Margen":
+    indice_prod = dataset_campo.indice_orden('prod_real_bpd')
+    if estado_filtro == "Solo Rentables":
+        posiciones = indice_prod.mayores(q_lim_escenario)
+    elif estado_filtro == "Solo en Riesgo":
+        posiciones = indice_prod.hasta(q_lim_escenario)
+    else:
+        posiciones = indice_prod.orden
 else:
-    df_ver = df_campo
+    posiciones = orden_por_prioridad(dataset_campo.firma, brent, costo_trat, regalias,
+                                     presupuesto_interv, max_intervenciones)
+    if estado_filtro != "Todos":
+        rentables = (df_campo['Estado'] == "✅ RENTABLE").to_numpy()
+        posiciones = posiciones[rentables[posiciones] == (estado_filtro == "Solo Rentables")]
+
+ranking = Ranking(df_campo, posiciones)
+r1, r2 = st.columns([1, 3])
+with r1:
+    pagina = st.number_input("Página", min_value=1, value=1, step=1)
+pagina = min(pagina, ranking.paginas())
+with r2:
+    st.caption(f"{len(ranking)} pozos · página {pagina} de {ranking.paginas()} ({TAMANO_PAGINA} por página)")
+st.dataframe(ranking.pagina(pagina), use_container_width=True)
 
-st.dataframe(df_ver.sort_values(by='Margen_BPD', ascending=True), use_container_width=True)
+# Exportación del ranking completo por bloques; se genera recién al hacer clic
+e1, e2, _ = st.columns([1, 1, 2])
+with e1:
+    st.download_button("Exportar ranking (CSV)", data=lambda: ranking.exportar("csv"),
+                       file_name="ranking_pozos.csv", mime="text/csv", on_click="ignore")
+with e2:
+    st.download_button("Exportar ranking (Arrow)", data=lambda: ranking.exportar("arrow"),
+                       file_name="ranking_pozos.arrows", mime="application/vnd.apache.arrow.stream",
+                       on_click="ignore")
 
 
 
+# --- 6. PRONÓSTICO DE PRODUCCIÓN DEL CAMPO ---
+st.divider()
+st.subheader("📈 Pronóstico de Producción del Campo")
+
+col_f1, col_f2 = st.columns([1, 3])
+with col_f1:
+    apertura = st.radio("Apertura por:", ["Total", "Estado", "Categoría"])
+    horizonte_campo = st.slider("Horizonte (Días)", 30, 1095, 730)
+    usar_wor = st.checkbox("Water cut según tendencia WOR", value=True,
+                           help="WOR vs petróleo acumulado ajustado sobre el historial; sin historial, water cut actual")
+
+df_pronostico_base = df_campo
+if apertura == "Categoría":
+    df_pronostico_base = df_campo.assign(eficiencia=df_campo['prod_real_bpd'] / df_campo['prod_teorica_bpd'] * 100)
+    df_pronostico_base = categorizar_pozos(df_pronostico_base)
+columna_grupo = {"Total": None, "Estado": "Estado", "Categoría": "categoria"}[apertura]
+
+pronostico = pronosticar_campo(df_pronostico_base, horizonte=horizonte_campo, agrupar_por=columna_grupo,
+                               tendencia_agua=tendencia_desde_archivo() if usar_wor else None)
+capacidad = capacidad_instalaciones(pronostico)
+
+with col_f1:
+    st.metric("Pico de Fluido (Separación)", f"{capacidad['pico_fluido_bpd']:,.0f} bbl/d", f"día {capacidad['dia_pico_fluido']}", delta_color="off")
+    st.metric("Pico de Agua (Tratamiento)", f"{capacidad['pico_agua_bpd']:,.0f} bbl/d")
+    st.metric("Fluido Total del Horizonte", f"{capacidad['fluido_total_bbl'] / 1e6:,.2f} MMbbl")
+
+with col_f2:
+    fig_campo = go.Figure()
+    for grupo, df_g in pronostico.groupby('grupo'):
+        fig_campo.add_trace(go.Scatter(x=df_g['dia'], y=df_g['petroleo_bpd'], name=f"Petróleo · {grupo}", stackgroup='petroleo'))
+    fluido_total = pronostico.groupby('dia')['fluido_bpd'].sum()
+    fig_campo.add_trace(go.Scatter(x=fluido_total.index, y=fluido_total.values, name="Fluido total", line=dict(color='deepskyblue', dash='dash')))
+    fig_campo.update_layout(title="Producción diaria proyectada del campo", xaxis_title="Días", yaxis_title="bbl/d", template="plotly_dark", hovermode="x unified")
+    st.plotly_chart(fig_campo, use_container_width=True)
+
+# --- 7. VALORIZACIÓN HISTÓRICA (Brent del día de cada registro) ---
+st.divider()
+st.subheader("💵 Valorización Histórica de la Producción")
+
+RUTA_HISTORICO = 'datos/produccion_historica.csv'
+
+@st.cache_data
+def valorizar_historico(firma_precios, firma_historico, regalias):
+    serie = cargar_precios(RUTA_PRECIOS)
+    df_val = valorizar_produccion(pd.read_csv(RUTA_HISTORICO), serie, regalias)
+    return df_val, resumir_valorizacion(df_val)
+
+firma_precios = firma_archivo(RUTA_PRECIOS)
+firma_historico = firma_archivo(RUTA_HISTORICO)
+if firma_precios is None or firma_historico is None:
+    st.info("Falta la serie de precios (datos/precios_brent.csv) o la producción histórica para valorizar.")
+else:
+    df_valorizado, resumen_val = valorizar_historico(firma_precios, firma_historico, regalias)
+    v1, v2, v3 = st.columns(3)
+    v1.metric("Barriles Producidos", f"{resumen_val['barriles'].sum():,.0f} bbl")
+    v2.metric("Ingreso Neto de Regalías", f"USD {resumen_val['ingreso_usd'].sum():,.0f}")
+    precio_realizado = (resumen_val['precio_realizado_usd'] * resumen_val['barriles']).sum() / resumen_val['barriles'].sum()
+    v3.metric("Brent Realizado (ponderado)", f"USD {precio_realizado:,.2f}/bbl", f"{precio_realizado - brent:+,.2f} vs escenario", delta_color="off")
+
+    ingreso_diario = df_valorizado.groupby('fecha').agg(ingreso_usd=('ingreso_usd', 'sum'), brent_usd=('brent_usd', 'first'))
+    fig_val = go.Figure()
+    fig_val.add_trace(go.Bar(x=ingreso_diario.index, y=ingreso_diario['ingreso_usd'], name="Ingreso diario (USD)", marker_color='seagreen'))
+    fig_val.add_trace(go.Scatter(x=ingreso_diario.index, y=ingreso_diario['brent_usd'], name="Brent (USD/bbl)", yaxis='y2', line=dict(color='gold')))
+    fig_val.update_layout(title="Ingreso diario del campo al precio de mercado", template="plotly_dark",
+                          yaxis=dict(title="USD"), yaxis2=dict(title="USD/bbl", overlaying='y', side='right'))
+    st.plotly_chart(fig_val, use_container_width=True)
+    st.dataframe(resumen_val.style.format({'barriles': "{:,.0f}", 'ingreso_usd': "USD {:,.0f}", 'precio_realizado_usd': "{:,.2f}"}),
+                 use_container_width=True)
+
 # --- CONECTOR A DETALLE ---
 st.divider()
 st.subheader("🔍 Análisis Profundo")
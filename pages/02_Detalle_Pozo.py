@@ -1,12 +1,22 @@
 from datetime import datetime
+from functools import lru_cache
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 
-from src.funciones_petroleras import predecir_declinacion_arps 
-from src.generador_reportes import crear_informe_ejecutivo
-from src.petro_logic import calcular_q_limite, proyectar_produccion, calcular_flujo_caja
+from src.funciones_petroleras import predecir_declinacion_arps
+from src.cola_exportacion import ColaExportacion
+from src.curvas_tipo import atributos_cuarentena, lote_curva_tipo
+from src.economia import evaluar_flujo_caja, tir_flujo_caja, TIR_MAXIMA
+from src.modelos_declinacion import MODELOS_DECLINACION
+from src.lote_pozos import LotePozos, ESTADO_NO_ENCONTRADO, ESTADO_ERROR
+from src.petro_logic import calcular_detalle_lote, datos_reporte, detalle_de_pozo, firma_archivo
+from src.pronostico_agua import RUTA_HISTORICO, tendencia_desde_archivo
+from src.precios import DIAS_MES, MazoPrecios
+from src.validacion import REGLAS_DETALLE
+from src.datos_compartidos import obtener_dataset, preparar_declinacion
+from src.historial import existe_historial, ultimos_dias
 
 
 st.set_page_config(layout="wide", page_title="Monitor Vaca Muerta")
@@ -18,51 +28,83 @@ else:
 
 
    
+RUTA_MASIVOS = 'datos/datos_campo_masivos.csv'
+
 # --- 1. LECTURA DE DATOS DINÁMICA ---
+# Tabla de pozos compartida entre sesiones (src/datos_compartidos.py): se lee y valida una vez
+# por servidor y se recarga sola si cambia el CSV (mtime, tamaño).
+def cargar_tabla_pozos():
+    # Pipeline de validación: caudales <= 0 o >= 5000 van a cuarentena, WC normalizado a fracción.
+    # preparar_declinacion: di estimado (mínimo técnico, capado al 5% diario) y modelo por pozo
+    # (el aviso de registros omitidos sale por consola una vez, al cargar)
+    return obtener_dataset(RUTA_MASIVOS, REGLAS_DETALLE, origen="datos_campo_masivos",
+                           preparar=preparar_declinacion)
+
 @st.cache_data
-def cargar_datos_pozo(id_buscado):
+def cargar_datos_pozo(id_buscado, firma_datos=None):
+    """
+    LotePozos de un pozo (qi, bsw, di, modelo, b). Si el pozo quedó en
+    cuarentena (caudal inválido) se le asigna la curva tipo de sus vecinos por
+    atributos; si el ID no existe o falla la lectura, devuelve valores de
+    referencia con ese estado: siempre el mismo tipo.
+    """
+    id_buscado = str(id_buscado).strip()
     try:
-        # Leemos el archivo masivo que tiene los 100 pozos
-        df_masivo = pd.read_csv('datos/datos_campo_masivos.csv')
-        df_limpio = df_masivo[df_masivo['prod_real_bpd'] > 0].copy()
-        df_limpio = df_limpio[df_limpio['prod_real_bpd'] < 5000]
-        # Aseguramos que la declinación no sea cero para evitar errores matemáticos
-        #Manejo de la Declinación (di)
-        if 'di' not in df_limpio.columns:
-            df_limpio['di'] = (df_limpio['prod_teorica_bpd'] - df_limpio['prod_real_bpd']) / df_limpio['prod_teorica_bpd']
-            
-            # Limpiamos el cálculo: si da negativo o cero, ponemos un mínimo técnico
-            df_limpio['di'] = df_limpio['di'].apply(lambda x: x if x > 0 else 0.001)
-            # Capamos la declinación máxima al 5% diario para evitar distorsiones
-            df_limpio['di'] = df_limpio['di'].clip(upper=0.05)
-
-        # Reporte de limpieza en consola (para tu seguimiento como Analista)
-        filas_eliminadas = len(df_masivo) - len(df_limpio)
-        if filas_eliminadas > 0:
-             print(f"Resiliencia: Se omitieron {filas_eliminadas} registros inconsistentes.")
-
-        df_limpio['pozo_id'] = df_limpio['pozo_id'].astype(str).str.strip()
-        id_buscado = str(id_buscado).strip()
-        
-        # Filtramos por el pozo que viene de la memoria (pozo_actual)
-        datos_pozo = df_limpio[df_limpio['pozo_id'] == id_buscado]
-        
-        if not datos_pozo.empty:
-            q_inicio = float(datos_pozo['prod_real_bpd'].values[0])
-            bsw_raw = float(datos_pozo['water_cut'].values[0])
-            di_calculado = float(datos_pozo['di'].values[0])
-            bsw_real = bsw_raw / 100 if bsw_raw > 1 else bsw_raw
-            return q_inicio, bsw_real, di_calculado
-        else:
-           # Si entra acá, es que el ID buscado no existe en el CSV
-            st.error(f"ID '{id_buscado}' no encontrado en el archivo masivo.")
-            return 500.0, 0.15, 0.005
+        # Búsqueda directa por índice en el dataset compartido (sin filtrar la tabla)
+        tabla = cargar_tabla_pozos()
+        lote = tabla.lote([id_buscado])
+        if len(lote) > 0:
+            return lote
+        atributos = atributos_cuarentena(id_buscado, "datos_campo_masivos")
+        if atributos is not None and len(tabla.curvas_tipo()) > 0:
+            asignado = tabla.curvas_tipo().asignar(atributos)
+            fila = asignado.iloc[0]
+            st.warning(f"'{id_buscado}' está en cuarentena (datos de producción inválidos): se proyecta con "
+                       f"la curva tipo {fila['curva'] + 1} ({fila['modelo']}, di={fila['di']:.4f}, b={fila['b']:.2f}) "
+                       f"y qi estimado por los pozos más parecidos ({', '.join(fila['vecinos'])}).")
+            return lote_curva_tipo(id_buscado, asignado)
+        # Si entra acá, es que el ID buscado no existe en el CSV
+        st.error(f"ID '{id_buscado}' no encontrado en el archivo masivo.")
+        return LotePozos(id_buscado, 500.0, 0.005, bsw=0.15, estado=ESTADO_NO_ENCONTRADO)
     except Exception as e:
         st.error(f"Error de lectura: {e}")
-        return 874.1, 0.30
-
-# EJECUCIÓN: Ahora le pasamos el 'pozo_actual' que recuperamos arriba
-qi_real, bsw, di_real = cargar_datos_pozo(pozo_actual)
+        return LotePozos(id_buscado, 874.1, 0.005, bsw=0.30, estado=ESTADO_ERROR)
+
+
+def escenario_precios(precio_brent, variacion_brent, escalamiento_costos, horizonte):
+    """Brent fijo, o curva mensual con tendencia y costos escalados si alguno de los dos varía."""
+    if variacion_brent == 0 and escalamiento_costos == 0:
+        return precio_brent
+    return MazoPrecios.desde_tendencia(precio_brent, variacion_brent, escalamiento_costos,
+                                       meses=-(-horizonte // DIAS_MES))
+
+# --- 2. CACHE DEL DETALLE COMPLETO POR (POZO, ESCENARIO) ---
+# Compartido entre sesiones (st.cache_data es global al servidor), acotado (LRU) y con TTL.
+@st.cache_data(max_entries=256, ttl=3600, show_spinner=False)
+def calcular_detalle_cacheado(pozo_id, escenario, firma_datos, firma_historico=None):
+    """
+    Resultado completo del detalle (proyección, fluido, emulsión, cash flow,
+    día de quiebre y datos del reporte) para un pozo y un escenario
+    (brent y su variación anual, opex_mensual, costo_tratamiento, escalamiento
+    de costos, horizonte, water cut por tendencia WOR). El PDF no se arma acá:
+    lo genera la cola de exportación en segundo plano.
+    """
+    (precio_brent, opex_mensual, costo_tratamiento, horizonte, modelo, b,
+     variacion_brent, escalamiento, usar_wor) = escenario
+    lote = cargar_datos_pozo(pozo_id, firma_datos).reemplazar(modelo=modelo, b=b)
+    precios = escenario_precios(precio_brent, variacion_brent, escalamiento, horizonte)
+    tendencia = tendencia_desde_archivo() if usar_wor else None
+
+    # Mismo cálculo vectorizado que un lote de muchos pozos, con un lote de uno
+    detalle = detalle_de_pozo(calcular_detalle_lote(lote, precios, opex_mensual, costo_tratamiento,
+                                                    horizonte=horizonte, tendencia_agua=tendencia))
+    detalle.update({"qi": float(lote.qi[0]), "bsw": float(lote.bsw[0]), "di": float(lote.di[0])})
+    return detalle
+
+# --- 3. COLA DE EXPORTACIÓN (una por servidor, compartida entre sesiones) ---
+@st.cache_resource
+def obtener_cola_exportacion():
+    return ColaExportacion(max_workers=2)
 
 # Línea de depuración (Borrar después)
 # st.write(f'⚠️ DEBUG: Produccion Real bdp:{qi_real}    | Water Cut: {bsw} ')
@@ -72,47 +114,57 @@ st.title(f"🛢️ Centro de Control Operativo | Analizando Pozo: **{pozo_actual
 # Parámetros en el Sidebar
 st.sidebar.header("Variables de Mercado")
 precio_brent = st.sidebar.slider("Precio Brent (USD/bbl)", 40, 120, 75)
+variacion_brent = st.sidebar.slider("Variación Anual del Brent (%)", -30.0, 30.0, 0.0, 1.0,
+                                    help="Curva de precios de presupuesto: 0 = Brent fijo todo el horizonte") / 100
 opex_diario = 58000  # Valor fijo según analisis del reporte anterior
-regalias = 0.12
 
 st.sidebar.subheader("Costos Operativos")
 opex_base = st.sidebar.number_input("OPEX Fijo Mensual (USD)", value=60000)
 costo_tratamiento_bbl = st.sidebar.slider("Costo Tratamiento (USD/bbl fluido)", 0.5, 5.0, 1.5)
+escalamiento_costos = st.sidebar.slider("Escalamiento Anual de Costos (%)", 0.0, 15.0, 0.0, 0.5) / 100
 
 st.sidebar.subheader("Proyección Operativo")
 horizonte_proyeccion = st.sidebar.slider("Horizonte de Análisis (Días)", 30, 1095, 730)
+usar_wor = st.sidebar.toggle("Water cut según tendencia WOR", value=True,
+                             help="Pendiente de WOR vs petróleo acumulado del historial del pozo; sin historial, water cut constante")
+
+st.sidebar.subheader("Evaluación Económica")
+tasa_descuento = st.sidebar.slider("Tasa de Descuento Anual (%)", 0.0, 25.0, 10.0, 0.5) / 100
+capex_intervencion = st.sidebar.number_input("CAPEX de Intervención (USD)", min_value=0, value=0, step=50000)
+
+# Modelo de declinación: por defecto el asignado al pozo en el archivo, seleccionable acá
+dataset_pozos = cargar_tabla_pozos()
+firma_datos = dataset_pozos.firma
+lote_pozo = cargar_datos_pozo(pozo_actual, firma_datos)
+modelos_disponibles = list(MODELOS_DECLINACION)
+modelo_pozo = lote_pozo.modelo[0]
+b_pozo = float(lote_pozo.b[0])
+
+modelo_decl = st.sidebar.selectbox(
+    "Modelo de Declinación", modelos_disponibles,
+    index=modelos_disponibles.index(modelo_pozo) if modelo_pozo in modelos_disponibles else 0)
+es_hiperbolico = modelo_decl.startswith("hiperbolica")
+b_decl = st.sidebar.slider("Exponente hiperbólico (b)", 0.0, 2.0, b_pozo if b_pozo > 0 else 0.5, 0.05,
+                           disabled=not es_hiperbolico)
+if not es_hiperbolico:
+    b_decl = 0.0
 
 # --- LÓGICA DE INGENIERÍA ---
-m_std=30  # mes estándar de 30 días
-
-# A. Cálculo de Punto de Equilibrio
-q_limite = calcular_q_limite(
-    opex_base/m_std, 
-    precio_brent, 
-    regalias
-    )
-
-# B. Proyección de Producción (200 días)
-dias, prod_proyectada = proyectar_produccion(
-    qi=qi_real, 
-    di=di_real, 
-    dias_proyeccion=horizonte_proyeccion
-    )
-
-# C. Cálculo de OPEX Variable (Emulsión)
-
-produccion_fluido = prod_proyectada / (1 - bsw)
-costo_emulsion_diario = produccion_fluido * costo_tratamiento_bbl
-opex_total_diario = (opex_base / m_std) + costo_emulsion_diario
-
-
-# D. Flujo de Caja
-cash_flow_diario, cash_flow_acumulado = calcular_flujo_caja(
-    prod_proyectada, 
-    precio_brent, 
-    opex_total_diario, 
-    regalias
-    )
+# Qel, proyección, emulsión, flujo de caja, día de quiebre y PDF salen del cache compartido
+escenario = (precio_brent, opex_base, costo_tratamiento_bbl, horizonte_proyeccion, modelo_decl, b_decl,
+             variacion_brent, escalamiento_costos, usar_wor)
+detalle = calcular_detalle_cacheado(pozo_actual, escenario, firma_datos, firma_archivo(RUTA_HISTORICO))
+
+qi_real, bsw, di_real = detalle["qi"], detalle["bsw"], detalle["di"]
+q_limite = detalle["q_limite"]
+q_limite_diario = detalle["q_limite_diario"]
+dias = detalle["dias"]
+prod_proyectada = detalle["prod_proyectada"]
+opex_total_diario = detalle["opex_total_diario"]
+cash_flow_diario = detalle["cash_flow_diario"]
+cash_flow_acumulado = detalle["cash_flow_acumulado"]
+produccion_fluido = detalle["produccion_fluido"]
+water_cut_diario = detalle["water_cut_diario"]
 
 # --- VISUALIZACIÓN ---
 fig = go.Figure()
@@ -124,14 +176,21 @@ fig.add_trace(go.Scatter(x=dias,
                          line=dict(color='#FF4B4B', width=3),
                          hovertemplate='Día: %{x}<br>Prod: %{y:.1f} bbl/d<extra></extra>'))
 
-# Línea dinámica de Límite Económico
-fig.add_hline(
-    y=q_limite, 
-    line_dash="dash", 
-    line_color="#00FF00", 
-    annotation_text=f"Límite Económico: {q_limite:.1f} bbl/d", 
-    annotation_position="bottom right"
-    )
+# Línea dinámica de Límite Económico (curva si el precio o los costos cambian en el horizonte)
+if np.ptp(q_limite_diario) > 0:
+    fig.add_trace(go.Scatter(x=dias,
+                             y=q_limite_diario,
+                             name='Límite Económico',
+                             line=dict(color='#00FF00', dash='dash'),
+                             hovertemplate='Día: %{x}<br>Qel: %{y:.1f} bbl/d<extra></extra>'))
+else:
+    fig.add_hline(
+        y=q_limite, 
+        line_dash="dash", 
+        line_color="#00FF00", 
+        annotation_text=f"Límite Económico: {q_limite:.1f} bbl/d", 
+        annotation_position="bottom right"
+        )
 fig.add_annotation(
     x=horizonte_proyeccion * 0.8, # La posicionamos al final del gráfico
     y=prod_proyectada[0] * 0.9,
@@ -157,9 +216,8 @@ col1, col2 = st.columns(2)
 with col1:
     st.metric("Punto de Quiebre (Qel)", f"{q_limite:.2f} bbl/d")
 with col2:
-    # Encontrar el día donde la producción cae por debajo del límite
-    dia_quiebre = np.where(prod_proyectada < q_limite)[0]
-    dia_final = dia_quiebre[0] if len(dia_quiebre) > 0 else 730
+    # Día donde la producción cae por debajo del límite (calculado en el detalle)
+    dia_final = detalle["dia_final"]
     st.metric("Días de Vida Útil", f"{dia_final} días")
     st.write(f'Tiempo hasta llegar al Límite Económico con una proyección estimada a {horizonte_proyeccion} días.')
 # Línea de depuración (Borrar después)
@@ -178,7 +236,21 @@ elif dia_final < 365:
 else:
     st.success(f"✅ **OPERACIÓN RENTABLE:** Bajo este escenario de USD {precio_brent}, el pozo se mantiene por encima del punto de equilibrio durante todo el año.")
 
-
+# --- HISTORIAL REGISTRADO (base SQLite: python -m src.historial --cargar ...) ---
+# Consulta por índice (pozo_id, fecha): sólo se leen las filas del pozo, no el CSV completo
+if existe_historial():
+    with st.expander("📜 Historial registrado del pozo"):
+        dias_historial = st.select_slider("Ventana", [30, 90, 180, 365, 730], value=90, format_func=lambda d: f"últimos {d} días")
+        df_historial = ultimos_dias(pozo_actual, dias_historial)
+        if df_historial.empty:
+            st.info(f"Sin registros históricos para {pozo_actual}.")
+        else:
+            fig_hist = go.Figure()
+            fig_hist.add_trace(go.Scatter(x=df_historial['fecha'], y=df_historial['q_petroleo'], name='Petróleo (bbl/d)', line=dict(color='#FF4B4B')))
+            fig_hist.add_trace(go.Scatter(x=df_historial['fecha'], y=df_historial['water_cut'], name='Water Cut (%)', yaxis='y2', line=dict(color='deepskyblue', dash='dot')))
+            fig_hist.update_layout(title=f"Producción registrada · {pozo_actual}", template="plotly_dark", hovermode="x unified",
+                                   yaxis=dict(title="bbl/d"), yaxis2=dict(title="WC %", overlaying='y', side='right'))
+            st.plotly_chart(fig_hist, use_container_width=True)
 
 
 # --- CÁLCULO DE CASH FLOW ---
@@ -213,12 +285,24 @@ with col_cf2:
 
 # --- 3. VISUALIZACIÓN ---
 st.write("### 💰 Cash Flow con Costo de Emulsión Variable")
-col_m1, col_m2 = st.columns(2)
+col_m1, col_m2, col_m3 = st.columns(3)
 
 with col_m1:
     st.metric("OPEX Diario Promedio", f"USD {opex_total_diario.mean():,.2f}")
 with col_m2:
     st.metric("EBITDA Proyectado Anual", f"USD {cash_flow_acumulado[-1]:,.2f}")
+with col_m3:
+    # VPN descontado del flujo diario (src/economia.py); TIR y payback sólo si hay inversión
+    economia = evaluar_flujo_caja(cash_flow_diario, tasa_descuento, capex=capex_intervencion)
+    if capex_intervencion > 0:
+        tir = tir_flujo_caja(cash_flow_diario, capex_intervencion)
+        texto_tir = "s/d" if np.isnan(tir) else (f"> {TIR_MAXIMA:.0%}" if tir >= TIR_MAXIMA else f"{tir:.1%}")
+        payback = int(economia['payback_dia'])
+        st.metric(f"VPN @ {tasa_descuento:.1%}", f"USD {float(economia['vpn']):,.0f}",
+                  f"TIR {texto_tir} · payback {'no recupera' if payback < 0 else f'{payback} días'}",
+                  delta_color="off")
+    else:
+        st.metric(f"VPN @ {tasa_descuento:.1%}", f"USD {float(economia['vpn']):,.0f}")
 
 # Gráfico de barras para el flujo diario
 fig_cash = go.Figure()
@@ -226,32 +310,80 @@ fig_cash.add_trace(go.Bar(x=dias, y=cash_flow_diario, name='Flujo Neto Diario',
 fig_cash.update_layout(title="Flujo de Caja Diario (Neto)", template="plotly_dark")
 st.plotly_chart(fig_cash, use_container_width=True)
 
+# Fluido total y water cut proyectados (base del costo de tratamiento)
+fig_fluido = go.Figure()
+fig_fluido.add_trace(go.Scatter(x=dias, y=prod_proyectada, name='Petróleo (bbl/d)', stackgroup='fluido', line=dict(color='#FF4B4B')))
+fig_fluido.add_trace(go.Scatter(x=dias, y=produccion_fluido - prod_proyectada, name='Agua (bbl/d)', stackgroup='fluido', line=dict(color='deepskyblue')))
+fig_fluido.add_trace(go.Scatter(x=dias, y=water_cut_diario * 100, name='Water Cut (%)', yaxis='y2', line=dict(color='white', dash='dot')))
+fig_fluido.update_layout(title="Fluido Total Proyectado", template="plotly_dark", hovermode="x unified",
+                         yaxis=dict(title="bbl/d"), yaxis2=dict(title="WC %", overlaying='y', side='right'))
+st.plotly_chart(fig_fluido, use_container_width=True)
 
-# Empaquetamos la información para el reporte
-datos_para_reporte = {
-    "qi": round(qi_real, 2),
-    "brent": precio_brent,
-    "q_limite": q_limite,
-    "opex": opex_total_diario.mean(), # Usamos el promedio diario
-    "estado": "OPERACION RENTABLE" if dia_final == 730 else f"ALERTA DE CIERRE (Día {dia_final})",
-    "dia_quiebre": dia_final
-}
 
 st.sidebar.divider()
 st.sidebar.subheader("Reportes")
 
-# Generamos el PDF en memoria
-try:
-    pdf_bytes = crear_informe_ejecutivo(datos_para_reporte)
-
-    st.sidebar.download_button(
-        label="📥 Descargar Reporte PDF",
-        data=pdf_bytes,
-        file_name=f"Reporte_Produccion_2026_{datetime.now().strftime('%d%m%y')}.pdf",
-        mime="application/pdf"
-    )
-except Exception as e:
-    st.sidebar.error("Error al generar PDF. Verifique fpdf2.")
+# Los reportes se encolan y se generan en segundo plano: la página no se bloquea mientras tanto
+cola = obtener_cola_exportacion()
+fecha_archivo = datetime.now().strftime('%d%m%y')
+trabajos = st.session_state.setdefault('trabajos_export', [])
+
+if st.sidebar.button("📄 Generar Reporte PDF"):
+    clave = ('pdf', pozo_actual, escenario, firma_datos)
+    cola.enviar(clave, [(f"{pozo_actual}.pdf", detalle["datos_reporte"])],
+                f"Reporte_Produccion_{pozo_actual}_{fecha_archivo}.pdf")
+    if clave not in trabajos:
+        trabajos.append(clave)
+
+pozos_lote = st.sidebar.multiselect("Lote multi-pozo", dataset_pozos.columna('pozo_id'))
+if st.sidebar.button("📦 Exportar lote (ZIP)", disabled=not pozos_lote):
+    lote_export = dataset_pozos.lote(pozos_lote)
+    # Un único cálculo vectorizado para todo el lote, dentro del worker (no bloquea la página)
+    # y recién al armar el primer PDF. Cada pozo usa su propio modelo de declinación.
+    detalle_lote = lru_cache(maxsize=1)(lambda: calcular_detalle_lote(
+        lote_export, escenario_precios(precio_brent, variacion_brent, escalamiento_costos, horizonte_proyeccion),
+        opex_base, costo_tratamiento_bbl, horizonte=horizonte_proyeccion,
+        tendencia_agua=tendencia_desde_archivo() if usar_wor else None))
+
+    clave = ('zip', tuple(sorted(pozos_lote)), escenario, firma_datos)
+    cola.enviar(clave, [(f"{pozo_id}.pdf", lambda i=i: datos_reporte(detalle_lote(), i))
+                        for i, pozo_id in enumerate(lote_export.pozo_id)],
+                f"Reportes_Lote_{len(lote_export)}_pozos_{fecha_archivo}.zip")
+    if clave not in trabajos:
+        trabajos.append(clave)
+
+@st.fragment(run_every="1s")
+def panel_exportaciones_en_curso():
+    # Sólo se refresca este panel; cuando todo termina, un rerun completo deja los botones fijos
+    pendientes = False
+    for clave in trabajos:
+        estado = cola.estado(clave)
+        if estado and estado["resultado"] is None and estado["error"] is None:
+            pendientes = True
+            st.progress(estado["hechos"] / estado["total"], text=f"{estado['nombre_archivo']} ({estado['hechos']}/{estado['total']})")
+    if not pendientes:
+        st.rerun(scope="app")
+
+with st.sidebar:
+    en_curso = False
+    for clave in list(trabajos):
+        estado = cola.estado(clave)
+        if estado is None:
+            trabajos.remove(clave)
+        elif estado["error"] is not None:
+            st.error(f"Error al generar {estado['nombre_archivo']}. Verifique fpdf2.")
+        elif estado["resultado"] is not None:
+            st.download_button(
+                label=f"📥 {estado['nombre_archivo']}",
+                data=estado["resultado"],
+                file_name=estado["nombre_archivo"],
+                mime=estado["mime"],
+                key=f"descarga_{hash(clave)}"
+            )
+        else:
+            en_curso = True
+    if en_curso:
+        panel_exportaciones_en_curso()
 
 
 # Una línea divisoria para separar el análisis de la firma
@@ -0,0 +1,101 @@
+# src/activos.py
+"""
+Servicio de activos estáticos (manual PDF, gráficos de los reportes).
+
+Cada archivo se mapea en memoria (mmap de sólo lectura) una única vez por
+proceso y se comparte entre todas las sesiones; si cambia la fecha de
+modificación o el tamaño, se vuelve a mapear. Los consumidores reciben vistas
+sin copia (memoryview) o lectores tipo archivo sobre esa misma vista, que es lo
+que aceptan st.download_button y FPDF.image.
+"""
+import io
+import mmap
+import threading
+from pathlib import Path
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+DIR_ASSETS = RAIZ_PROYECTO / "assets"
+
+_mapeos = {}
+_lock = threading.Lock()
+
+
+class LectorActivo(io.RawIOBase):
+    """Lector de sólo lectura sobre una memoryview: cada lector tiene su propia posición."""
+
+    def __init__(self, vista, nombre=""):
+        super().__init__()
+        self._vista = vista
+        self._pos = 0
+        self.name = nombre
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, destino):
+        n = max(0, min(len(destino), len(self._vista) - self._pos))
+        destino[:n] = self._vista[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._vista)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+def _resolver(ruta):
+    ruta = Path(ruta)
+    return ruta if ruta.is_absolute() else RAIZ_PROYECTO / ruta
+
+
+def firma_archivo(ruta):
+    """
+    Devuelve una firma (mtime, tamaño) del archivo. Se usa como parte de la
+    clave de cache para invalidar resultados cuando el dato de origen cambia.
+    """
+    try:
+        info = Path(ruta).stat()
+        return info.st_mtime_ns, info.st_size
+    except OSError:
+        return None
+
+
+def obtener_activo(ruta):
+    """
+    memoryview de sólo lectura con el contenido del archivo (sin copia).
+    Devuelve None si el archivo no existe.
+    """
+    ruta = _resolver(ruta)
+    try:
+        info = ruta.stat()
+    except OSError:
+        return None
+    firma = (info.st_mtime_ns, info.st_size)
+
+    with _lock:
+        entrada = _mapeos.get(ruta)
+        if entrada is None or entrada[0] != firma:
+            if info.st_size == 0:
+                vista = memoryview(b"")
+            else:
+                with open(ruta, "rb") as f:
+                    vista = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            # El mapeo anterior se libera solo cuando no quedan vistas en uso
+            entrada = (firma, vista)
+            _mapeos[ruta] = entrada
+        return entrada[1]
+
+
+def abrir_activo(ruta):
+    """Lector tipo archivo sobre el activo compartido (para download_button / FPDF.image), o None."""
+    vista = obtener_activo(ruta)
+    if vista is None:
+        return None
+    return LectorActivo(vista, nombre=_resolver(ruta).name)
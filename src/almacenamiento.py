@@ -0,0 +1,98 @@
+# src/almacenamiento.py
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+# Carpeta donde el worker deja los resultados precalculados (una subcarpeta por versión, una tabla .parquet por resultado)
+DIR_PRECALCULADO = Path(__file__).resolve().parent.parent / "datos" / "precalculado"
+ARCHIVO_MANIFIESTO = "manifiesto.json"
+MANTENER_VERSIONES = 3
+
+
+def _escritura_atomica(ruta, escribir):
+    """Escribe primero en un temporal y lo renombra: los lectores nunca ven un archivo a medias."""
+    ruta_tmp = ruta.with_name(ruta.name + ".tmp")
+    escribir(ruta_tmp)
+    os.replace(ruta_tmp, ruta)
+
+
+def generar_version(firma_entrada=""):
+    """Sello de versión: fecha UTC + hash corto de los archivos de entrada."""
+    sello = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if not firma_entrada:
+        return sello
+    return f"{sello}-{hashlib.sha1(firma_entrada.encode()).hexdigest()[:8]}"
+
+
+def guardar_resultados(tablas, metadatos=None, directorio=DIR_PRECALCULADO, mantener=MANTENER_VERSIONES):
+    """
+    Guarda un dict {nombre: DataFrame} como tablas .parquet en una carpeta
+    nueva <version>/ y al final reemplaza el manifiesto, que apunta a esa
+    carpeta (el manifiesto es el 'commit': un lector ve la versión anterior
+    completa o la nueva completa). Quedan las últimas 'mantener' versiones.
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    metadatos = dict(metadatos or {})
+    version = metadatos.setdefault("version", generar_version(metadatos.get("firma_entrada", "")))
+
+    carpeta = directorio / version
+    carpeta_tmp = directorio / f".{version}.tmp"
+    shutil.rmtree(carpeta_tmp, ignore_errors=True)
+    carpeta_tmp.mkdir()
+    for nombre, df in tablas.items():
+        df.to_parquet(carpeta_tmp / f"{nombre}.parquet", index=False)
+    shutil.rmtree(carpeta, ignore_errors=True)  # misma versión regenerada: nadie la referencia todavía
+    os.replace(carpeta_tmp, carpeta)
+
+    metadatos["carpeta"] = version
+    metadatos["tablas"] = sorted(tablas)
+    metadatos["generado"] = datetime.now(timezone.utc).isoformat()
+    _escritura_atomica(
+        directorio / ARCHIVO_MANIFIESTO,
+        lambda ruta: ruta.write_text(json.dumps(metadatos, indent=2, default=str), encoding="utf-8"),
+    )
+    _podar_versiones(directorio, version, mantener)
+    return version
+
+
+def _podar_versiones(directorio, actual, mantener):
+    # Las carpetas de versión empiezan con el sello UTC: el orden de nombre es el cronológico.
+    # Se conservan algunas anteriores para lectores que leyeron el manifiesto viejo hace un momento.
+    versiones = sorted(c.name for c in directorio.iterdir() if c.is_dir() and c.name[:1].isdigit())
+    for nombre in versiones[:-mantener]:
+        if nombre != actual:
+            shutil.rmtree(directorio / nombre, ignore_errors=True)
+
+
+def leer_manifiesto(directorio=DIR_PRECALCULADO):
+    """Devuelve el manifiesto de la última corrida, o None si nunca se precalculó."""
+    ruta = Path(directorio) / ARCHIVO_MANIFIESTO
+    if not ruta.exists():
+        return None
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def cargar_resultados(nombre, version=None, directorio=DIR_PRECALCULADO):
+    """
+    Lee una tabla precalculada de una versión (por defecto la del manifiesto
+    actual). Devuelve None si no existe (o si esa versión ya se podó).
+    """
+    directorio = Path(directorio)
+    if version is None:
+        manifiesto = leer_manifiesto(directorio)
+        if manifiesto is None:
+            return None
+        version = manifiesto.get("carpeta", manifiesto.get("version"))
+    ruta = directorio / str(version) / f"{nombre}.parquet"
+    if not ruta.exists():
+        return None
+    return pd.read_parquet(ruta)
@@ -0,0 +1,582 @@
+# src/api.py
+"""
+API HTTP/JSON local sobre el motor de cálculo (sin sesión de Streamlit).
+
+Servidor asyncio de la librería estándar (HTTP/1.1 con keep-alive). El cálculo
+corre en un pool de threads para no bloquear el loop; las respuestas se
+guardan en un cache LRU con TTL (la clave incluye la firma del archivo de
+pozos, así un CSV nuevo invalida todo) y pedidos idénticos simultáneos se
+resuelven con un único cálculo.
+
+Uso (desde la raíz del proyecto):
+    python -m src.api
+    python -m src.api --host 0.0.0.0 --puerto 8765
+
+Endpoints (GET con query string o POST con cuerpo JSON; respuestas JSON):
+    GET  /salud
+    GET  /qel              opex_mensual, precio_brent, regalias (escalares o listas)
+    POST /proyeccion       qi, di (escalares o listas por pozo), dias, modelo, b
+    GET  /campo/kpis       precio_brent, opex_mensual, costo_tratamiento_bbl, tasa_descuento
+    POST /pozos            pozo_ids (opcional: todos) + escenario -> Qel, día límite, reservas y VPN por pozo
+    GET  /ranking          condicion (todos/rentables/riesgo), pagina, tamano + escenario -> una página por margen
+    POST /escenarios       precios_brent, tasas_descuento, opex_mensual, costo_tratamiento_bbl
+    POST /agua             pozo_ids (opcional: todos), dias -> petróleo, agua, fluido y water cut diarios (tendencia WOR)
+    POST /curvas_tipo      prod_teorica_bpd, water_cut, presion_psi, temp_c (escalares o listas; los que haya)
+                           -> curvas tipo del campo y curva, qi y vecinos asignados a cada pozo
+    POST /reportes         pozo_id + escenario -> {"id"}; GET /reportes/<id> -> estado o PDF
+    POST /lote             {"solicitudes": [{"ruta": "/qel", "parametros": {...}}, ...]}
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from src.activos import RAIZ_PROYECTO
+from src.cola_exportacion import ColaExportacion
+from src.curvas_tipo import ATRIBUTOS
+from src.datos_compartidos import obtener_dataset, preparar_declinacion
+from src.economia import TASA_DESCUENTO, vpn_por_pozo, vpn_portafolio
+from src.modelos_declinacion import MODELOS_DECLINACION, dia_limite_economico
+from src.petro_logic import calcular_detalle_lote, calcular_q_limite, datos_reporte, firma_archivo, proyectar_produccion
+from src.pronostico_agua import RUTA_HISTORICO, ln_wor_desde_water_cut, proyectar_agua, tendencia_desde_archivo
+from src.ranking import TAMANO_PAGINA, Ranking
+from src.reservas import reservas_por_pozo
+from src.validacion import REGLAS_DETALLE, REGLAS_MONITOREO
+
+RUTA_MASIVOS = 'datos/datos_campo_masivos.csv'
+MAX_CUERPO_BYTES = 10 * 1024 * 1024
+MAX_CELDAS_PROYECCION = 5_000_000   # pozos x días por pedido
+MAX_REPORTES = 256                  # ids de /reportes recordados (los más viejos dan 404)
+MAX_TAMANO_PAGINA = 1000
+ESTADOS_HTTP = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorAPI(Exception):
+    """Error con código HTTP (se responde como {"error": mensaje})."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# --- PARÁMETROS Y SERIALIZACIÓN ---
+
+def _numero(parametros, nombre, defecto=None):
+    # Escalar o lista -> float / array float (los GET llegan como texto, las listas como "1,2,3")
+    valor = parametros.get(nombre, defecto)
+    if valor is None:
+        raise ErrorAPI(400, f"Falta el parámetro '{nombre}'")
+    if isinstance(valor, str) and "," in valor:
+        valor = valor.split(",")
+    try:
+        return np.asarray(valor, dtype=float) if isinstance(valor, list) else float(valor)
+    except (TypeError, ValueError):
+        raise ErrorAPI(400, f"Parámetro '{nombre}' no numérico: {valor!r}") from None
+
+
+def _entero(parametros, nombre, defecto=None):
+    # Parámetros que sólo admiten un valor (horizonte, días, página): una lista es un 400
+    valor = _numero(parametros, nombre, defecto)
+    if isinstance(valor, np.ndarray):
+        if valor.size != 1:
+            raise ErrorAPI(400, f"Parámetro '{nombre}' debe ser un único número")
+        valor = float(valor[0])
+    if not math.isfinite(valor):
+        raise ErrorAPI(400, f"Parámetro '{nombre}' no finito: {valor!r}")
+    return int(valor)
+
+
+def _ids(parametros):
+    # Lista de pozo_id; un texto (GET con query string) es "AN-001,AN-002". None: todos
+    ids = parametros.get("pozo_ids")
+    if ids is None:
+        return None
+    if isinstance(ids, str):
+        ids = ids.split(",")
+    if not isinstance(ids, list):
+        raise ErrorAPI(400, "'pozo_ids' debe ser una lista o un texto separado por comas")
+    ids = [str(i).strip() for i in ids if str(i).strip()]
+    return ids or None
+
+
+def _escenario(parametros):
+    return {
+        "precio_brent": _numero(parametros, "precio_brent", 75),
+        "opex_mensual": _numero(parametros, "opex_mensual", 45000),
+        "costo_tratamiento_bbl": _numero(parametros, "costo_tratamiento_bbl", 2.0),
+        "regalias": _numero(parametros, "regalias", 0.12),
+        "horizonte": _entero(parametros, "horizonte", 730),
+    }
+
+
+def _a_json(valor):
+    # numpy -> tipos nativos; NaN / inf -> null (JSON no los admite)
+    if isinstance(valor, dict):
+        return {str(k): _a_json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_a_json(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind == 'f' and not np.isfinite(valor).all():
+            return _a_json(valor.astype(object).tolist())
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+def _tabla(df):
+    return {columna: _a_json(df[columna].to_numpy()) for columna in df.columns}
+
+
+# --- ENDPOINTS (funciones síncronas: corren en el pool de threads) ---
+
+def _dataset_monitoreo():
+    dataset = obtener_dataset(RUTA_MASIVOS, REGLAS_MONITOREO)
+    if dataset is None:
+        raise ErrorAPI(404, f"No existe {RUTA_MASIVOS}")
+    return dataset
+
+
+def _dataset_pozos():
+    dataset = obtener_dataset(RUTA_MASIVOS, REGLAS_DETALLE, origen="datos_campo_masivos",
+                              preparar=preparar_declinacion)
+    if dataset is None:
+        raise ErrorAPI(404, f"No existe {RUTA_MASIVOS}")
+    return dataset
+
+
+def endpoint_salud(parametros):
+    return {"estado": "ok", "pozos": len(_dataset_monitoreo())}
+
+
+def endpoint_qel(parametros):
+    opex, precio, regalias = np.broadcast_arrays(
+        np.asarray(_numero(parametros, "opex_mensual", 45000)) / _numero(parametros, "m_std", 30),
+        np.asarray(_numero(parametros, "precio_brent", 75)),
+        np.asarray(_numero(parametros, "regalias", 0.12)))
+    q_limite = calcular_q_limite(opex, precio, regalias)
+    return {"q_limite": q_limite if opex.ndim == 0 else q_limite.ravel()}
+
+
+def endpoint_proyeccion(parametros):
+    qi = _numero(parametros, "qi")
+    di = _numero(parametros, "di")
+    b = _numero(parametros, "b", 0.0)
+    dias = _entero(parametros, "dias", 365)
+    modelo = parametros.get("modelo", "exponencial")
+    if np.size(qi) * dias > MAX_CELDAS_PROYECCION:
+        raise ErrorAPI(413, f"Proyección demasiado grande (máximo {MAX_CELDAS_PROYECCION} pozos x días)")
+    if isinstance(qi, np.ndarray) and not isinstance(modelo, (str, list)):
+        raise ErrorAPI(400, "'modelo' debe ser un nombre o una lista de nombres por pozo")
+    if np.ndim(qi) == 0 and not isinstance(modelo, str):
+        raise ErrorAPI(400, "Con un solo pozo 'modelo' debe ser un nombre")
+    if isinstance(modelo, list) and len(modelo) != np.size(qi):
+        raise ErrorAPI(400, "'modelo' debe tener un nombre por pozo")
+    desconocidos = sorted({str(m) for m in np.atleast_1d(modelo)} - MODELOS_DECLINACION.keys())
+    if desconocidos:
+        raise ErrorAPI(400, f"Modelo de declinación desconocido: {', '.join(desconocidos)} "
+                            f"(válidos: {', '.join(MODELOS_DECLINACION)})")
+    if not np.all(np.asarray(qi) >= 0):
+        raise ErrorAPI(400, "'qi' debe ser mayor o igual a 0")
+    if not np.all(np.asarray(di) > 0):
+        raise ErrorAPI(400, "'di' debe ser mayor que 0")
+    dias_curva, curva = proyectar_produccion(qi, di, dias, modelo=modelo, b=b)
+    return {"dias": int(len(dias_curva)), "q": np.round(curva, 2)}
+
+
+def endpoint_campo_kpis(parametros):
+    esc = _escenario(parametros)
+    tasa = _numero(parametros, "tasa_descuento", TASA_DESCUENTO)
+    df = _dataset_monitoreo().vista()
+    q_limite = calcular_q_limite(esc["opex_mensual"] / 30, esc["precio_brent"], esc["regalias"])
+    produccion = df['prod_real_bpd'].to_numpy(dtype=float)
+    ingreso = (produccion * esc["precio_brent"] * (1 - esc["regalias"])).sum()
+    reservas = reservas_por_pozo(df, esc["precio_brent"], esc["opex_mensual"], esc["regalias"])
+    vpn = vpn_por_pozo(df, esc["precio_brent"], esc["opex_mensual"], esc["costo_tratamiento_bbl"],
+                       esc["regalias"], tasa, esc["horizonte"])
+    return {
+        "pozos": len(df),
+        "q_limite": q_limite,
+        "pozos_en_riesgo": int((produccion <= q_limite).sum()),
+        "produccion_bpd": produccion.sum(),
+        "ebitda_mensual_usd": ingreso - esc["opex_mensual"] * len(df),
+        "reservas_remanentes_bbl": reservas['reservas_remanentes_bbl'].sum(),
+        "vpn_portafolio_usd": vpn['vpn_usd'].sum(),
+    }
+
+
+def endpoint_pozos(parametros):
+    esc = _escenario(parametros)
+    tasa = _numero(parametros, "tasa_descuento", TASA_DESCUENTO)
+    df = _dataset_pozos().vista()
+    ids = _ids(parametros)
+    if ids:
+        df = df[df['pozo_id'].isin(ids)]
+
+    q_limite = calcular_q_limite(esc["opex_mensual"] / 30, esc["precio_brent"], esc["regalias"])
+    qi = df['prod_real_bpd'].to_numpy(dtype=float)
+    dia_limite = dia_limite_economico(df['modelo_declinacion'].to_numpy(), qi, df['di'].to_numpy(dtype=float),
+                                      df['b'].to_numpy(dtype=float), q_limite, esc["horizonte"])
+    reservas = reservas_por_pozo(df, esc["precio_brent"], esc["opex_mensual"], esc["regalias"])
+    vpn = vpn_por_pozo(df, esc["precio_brent"], esc["opex_mensual"], esc["costo_tratamiento_bbl"],
+                       esc["regalias"], tasa, esc["horizonte"])
+    return {
+        "q_limite": q_limite,
+        "pozos": {
+            "pozo_id": _a_json(df['pozo_id'].to_numpy()),
+            "prod_real_bpd": _a_json(qi),
+            "margen_bpd": _a_json(qi - q_limite),
+            "dia_limite": _a_json(dia_limite),
+            "reservas_remanentes_bbl": _a_json(reservas['reservas_remanentes_bbl'].to_numpy()),
+            "vpn_usd": _a_json(vpn['vpn_usd'].to_numpy()),
+        },
+    }
+
+
+def endpoint_ranking(parametros):
+    # Página del ranking por margen (= producción - Qel): índice preordenado del dataset y cortes en Qel
+    esc = _escenario(parametros)
+    dataset = _dataset_monitoreo()
+    q_limite = calcular_q_limite(esc["opex_mensual"] / 30, esc["precio_brent"], esc["regalias"])
+    indice = dataset.indice_orden('prod_real_bpd')
+    condicion = parametros.get("condicion", "todos")
+    if condicion == "rentables":
+        posiciones = indice.mayores(q_limite)
+    elif condicion == "riesgo":
+        posiciones = indice.hasta(q_limite)
+    elif condicion == "todos":
+        posiciones = indice.orden
+    else:
+        raise ErrorAPI(400, "'condicion' debe ser todos, rentables o riesgo")
+    tamano = min(max(1, _entero(parametros, "tamano", TAMANO_PAGINA)), MAX_TAMANO_PAGINA)
+    ranking = Ranking(dataset.vista(), posiciones)
+    pagina = min(max(1, _entero(parametros, "pagina", 1)), ranking.paginas(tamano))
+    filas = ranking.pagina(pagina, tamano)
+    qi = filas['prod_real_bpd'].to_numpy(dtype=float)
+    return {
+        "q_limite": q_limite,
+        "total": len(ranking),
+        "pagina": pagina,
+        "paginas": ranking.paginas(tamano),
+        "pozos": {
+            "pozo_id": _a_json(filas['pozo_id'].to_numpy()),
+            "prod_real_bpd": _a_json(qi),
+            "margen_bpd": _a_json(qi - q_limite),
+        },
+    }
+
+
+def endpoint_agua(parametros):
+    # Water cut por tendencia WOR del historial (o el actual del pozo, si no tiene historial)
+    dataset = _dataset_pozos()
+    dias = _entero(parametros, "dias", 365)
+    ids = _ids(parametros)
+    lote = dataset.lote(ids) if ids else dataset.lote()
+    if len(lote) == 0:
+        raise ErrorAPI(404, f"Pozos no encontrados: {', '.join(ids or [])}")
+    if len(lote) * dias > MAX_CELDAS_PROYECCION:
+        raise ErrorAPI(413, f"Proyección demasiado grande (máximo {MAX_CELDAS_PROYECCION} pozos x días)")
+    _, petroleo = proyectar_produccion(lote, dias_proyeccion=dias)
+    tendencia = tendencia_desde_archivo()
+    if tendencia is None:
+        ln_wor, pendiente = ln_wor_desde_water_cut(lote.bsw), np.zeros(len(lote))
+    else:
+        ln_wor, pendiente = tendencia.para_lote(lote)
+    fluidos = proyectar_agua(petroleo, ln_wor, pendiente)
+    return {
+        "dias": dias,
+        "pozos": {
+            "pozo_id": _a_json(lote.pozo_id),
+            "petroleo_bpd": np.round(petroleo, 2),
+            "agua_bpd": np.round(fluidos["agua"], 2),
+            "fluido_bpd": np.round(fluidos["fluido"], 2),
+            "water_cut": np.round(fluidos["water_cut"] * 100, 2),
+        },
+        "campo": {
+            "petroleo_bpd": np.round(petroleo.sum(axis=0), 2),
+            "agua_bpd": np.round(fluidos["agua"].sum(axis=0), 2),
+            "fluido_bpd": np.round(fluidos["fluido"].sum(axis=0), 2),
+        },
+    }
+
+
+def endpoint_curvas_tipo(parametros):
+    # Pozos nuevos o sin caudal válido: curva tipo y qi por vecinos según los atributos informados
+    atributos = {nombre: np.atleast_1d(_numero(parametros, nombre)) for nombre in ATRIBUTOS if nombre in parametros}
+    if not atributos:
+        raise ErrorAPI(400, f"Se espera al menos uno de: {', '.join(ATRIBUTOS)}")
+    largos = {len(valores) for valores in atributos.values()}
+    if len(largos) > 1:
+        raise ErrorAPI(400, "Los atributos deben tener el mismo largo")
+    biblioteca = _dataset_pozos().curvas_tipo()
+    if len(biblioteca) == 0:
+        raise ErrorAPI(404, "No hay pozos con declinación válida para armar curvas tipo")
+    return {"curvas": _tabla(biblioteca.curvas()), "pozos": _tabla(biblioteca.asignar(pd.DataFrame(atributos)))}
+
+
+def endpoint_escenarios(parametros):
+    esc = _escenario(parametros)
+    precios = np.atleast_1d(_numero(parametros, "precios_brent", list(range(40, 125, 5))))
+    tasas = np.atleast_1d(_numero(parametros, "tasas_descuento", [TASA_DESCUENTO]))
+    grilla = vpn_portafolio(_dataset_monitoreo().vista(), precios, tasas, esc["opex_mensual"],
+                            esc["costo_tratamiento_bbl"], esc["regalias"], esc["horizonte"])
+    return {"escenarios": _tabla(grilla)}
+
+
+# --- SERVIDOR ---
+
+class CacheRespuestas:
+    """LRU con TTL para respuestas ya serializadas."""
+
+    def __init__(self, max_entradas=2048, ttl=300):
+        self._entradas = OrderedDict()
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+
+    def obtener(self, clave):
+        entrada = self._entradas.get(clave)
+        if entrada is None or time.monotonic() - entrada[0] > self.ttl:
+            self._entradas.pop(clave, None)
+            return None
+        self._entradas.move_to_end(clave)
+        return entrada[1]
+
+    def guardar(self, clave, respuesta):
+        self._entradas[clave] = (time.monotonic(), respuesta)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+
+class ServidorAPI:
+    """Servidor HTTP/JSON sobre asyncio. Las rutas de cálculo se cachean; /reportes no."""
+
+    RUTAS = {
+        "/salud": endpoint_salud,
+        "/qel": endpoint_qel,
+        "/proyeccion": endpoint_proyeccion,
+        "/campo/kpis": endpoint_campo_kpis,
+        "/pozos": endpoint_pozos,
+        "/ranking": endpoint_ranking,
+        "/escenarios": endpoint_escenarios,
+        "/agua": endpoint_agua,
+        "/curvas_tipo": endpoint_curvas_tipo,
+    }
+
+    def __init__(self, max_workers=4, cache=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        self.cache = cache or CacheRespuestas()
+        self._en_curso = {}
+        self._cola = ColaExportacion(max_workers=2)
+        # id -> clave de la cola; acotado como los resultados de la cola (un id viejo da 404)
+        self._reportes = OrderedDict()
+
+    # -- despacho --
+
+    def _ejecutar_ruta(self, ruta, parametros):
+        # Síncrono: lo usan el pool (un pedido) y /lote (varios pedidos en un solo job del pool)
+        funcion = self.RUTAS.get(ruta)
+        if funcion is None:
+            raise ErrorAPI(404, f"Ruta desconocida: {ruta}")
+        return _a_json(funcion(parametros))
+
+    def _ejecutar_lote(self, solicitudes):
+        resultados = []
+        for solicitud in solicitudes:
+            try:
+                resultados.append({"estado": 200, "respuesta": self._ejecutar_ruta(solicitud.get("ruta"),
+                                                                                    solicitud.get("parametros") or {})})
+            except ErrorAPI as e:
+                resultados.append({"estado": e.estado, "error": str(e)})
+            except Exception as e:
+                resultados.append({"estado": 500, "error": str(e)})
+        return {"resultados": resultados}
+
+    async def _calcular(self, clave, funcion, *args):
+        # Cache + coalescencia: pedidos idénticos en vuelo esperan el mismo futuro
+        respuesta = self.cache.obtener(clave)
+        if respuesta is not None:
+            return respuesta
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            loop = asyncio.get_running_loop()
+            futuro = loop.run_in_executor(self._pool, funcion, *args)
+            self._en_curso[clave] = futuro
+            try:
+                respuesta = json.dumps(await futuro, ensure_ascii=False).encode()
+                self.cache.guardar(clave, respuesta)
+            finally:
+                self._en_curso.pop(clave, None)
+            return respuesta
+        await futuro
+        return self.cache.obtener(clave) or json.dumps(futuro.result(), ensure_ascii=False).encode()
+
+    def _clave(self, ruta, parametros):
+        # Sólo un stat del CSV (no se carga nada en el loop): si el archivo cambia, la clave cambia
+        firma = firma_archivo(RAIZ_PROYECTO / RUTA_MASIVOS)
+        if ruta in ("/agua", "/lote"):  # un lote puede incluir /agua
+            firma = (firma, firma_archivo(RUTA_HISTORICO))
+        return (ruta, json.dumps(parametros, sort_keys=True, default=str), firma)
+
+    async def despachar(self, metodo, ruta, parametros):
+        """Devuelve (estado, tipo de contenido, cuerpo en bytes)."""
+        if ruta == "/lote":
+            if metodo != "POST":
+                raise ErrorAPI(405, "/lote sólo acepta POST")
+            solicitudes = parametros.get("solicitudes")
+            if not isinstance(solicitudes, list):
+                raise ErrorAPI(400, "Se espera {'solicitudes': [...]}")
+            cuerpo = await self._calcular(self._clave(ruta, parametros), self._ejecutar_lote, solicitudes)
+            return 200, "application/json", cuerpo
+
+        if ruta == "/reportes" or ruta.startswith("/reportes/"):
+            return await self._reporte(metodo, ruta, parametros)
+
+        if ruta not in self.RUTAS:
+            raise ErrorAPI(404, f"Ruta desconocida: {ruta}")
+        cuerpo = await self._calcular(self._clave(ruta, parametros), self._ejecutar_ruta, ruta, parametros)
+        return 200, "application/json", cuerpo
+
+    async def _reporte(self, metodo, ruta, parametros):
+        # Reutiliza la cola de exportación: POST encola y devuelve un id; GET consulta o descarga
+        if metodo == "POST" and ruta == "/reportes":
+            pozo_id = str(parametros.get("pozo_id", "")).strip()
+            esc = _escenario(parametros)
+            # La carga del dataset (primera vez o archivo cambiado) corre en el pool, no en el loop
+            loop = asyncio.get_running_loop()
+            lote = await loop.run_in_executor(self._pool, lambda: _dataset_pozos().lote([pozo_id]))
+            if len(lote) == 0:
+                raise ErrorAPI(404, f"Pozo '{pozo_id}' no encontrado")
+            # Con la firma del CSV: si cambian los datos, el mismo pedido es otro reporte
+            clave = ("api", pozo_id, tuple(sorted(esc.items())), firma_archivo(RAIZ_PROYECTO / RUTA_MASIVOS))
+            id_reporte = hashlib.sha1(repr(clave).encode()).hexdigest()[:16]
+            self._reportes[id_reporte] = clave
+            self._reportes.move_to_end(id_reporte)
+            while len(self._reportes) > MAX_REPORTES:
+                self._reportes.popitem(last=False)
+            datos = lambda: datos_reporte(calcular_detalle_lote(
+                lote, esc["precio_brent"], esc["opex_mensual"], esc["costo_tratamiento_bbl"],
+                horizonte=esc["horizonte"], regalias=esc["regalias"]))
+            self._cola.enviar(clave, [(f"{pozo_id}.pdf", datos)], f"Reporte_{pozo_id}.pdf")
+            return 202, "application/json", json.dumps({"id": id_reporte, "estado": f"/reportes/{id_reporte}"}).encode()
+
+        if metodo == "GET" and ruta.startswith("/reportes/"):
+            clave = self._reportes.get(ruta.rsplit("/", 1)[-1])
+            estado = self._cola.estado(clave) if clave else None
+            if estado is None:
+                raise ErrorAPI(404, "Reporte inexistente o vencido")
+            if estado["error"] is not None:
+                raise ErrorAPI(500, estado["error"])
+            if estado["resultado"] is None:
+                return 202, "application/json", json.dumps({"hechos": estado["hechos"], "total": estado["total"]}).encode()
+            return 200, estado["mime"], estado["resultado"]
+
+        raise ErrorAPI(405, "Use POST /reportes o GET /reportes/<id>")
+
+    # -- HTTP --
+
+    async def atender(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+
+                encabezados = {}
+                while True:
+                    h = await lector.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = h.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                try:
+                    largo = int(encabezados.get("content-length", 0) or 0)
+                except ValueError:
+                    largo = -1
+                if largo < 0:
+                    # Sin un largo válido no se sabe dónde termina el cuerpo: se responde y se cierra
+                    await self._responder(escritor, 400, "application/json",
+                                          json.dumps({"error": "Content-Length inválido"}).encode(), False)
+                    break
+                conexion = encabezados.get("connection", "").lower()
+                # HTTP/1.1 mantiene la conexión por defecto; HTTP/1.0 sólo si lo pide
+                mantener = conexion == "keep-alive" or (conexion != "close" and "1.1" in version)
+                if largo > MAX_CUERPO_BYTES:
+                    await self._responder(escritor, 413, "application/json",
+                                          json.dumps({"error": "Cuerpo demasiado grande"}).encode(), False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+
+                estado, tipo, respuesta = await self._procesar(metodo.upper(), destino, cuerpo)
+                await self._responder(escritor, estado, tipo, respuesta, mantener)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _procesar(self, metodo, destino, cuerpo):
+        partes = urlsplit(destino)
+        try:
+            if metodo not in ("GET", "POST"):
+                raise ErrorAPI(405, f"Método no soportado: {metodo}")
+            parametros = dict(parse_qsl(partes.query))
+            if cuerpo:
+                try:
+                    datos = json.loads(cuerpo)
+                except json.JSONDecodeError as e:
+                    raise ErrorAPI(400, f"JSON inválido: {e}") from None
+                if not isinstance(datos, dict):
+                    raise ErrorAPI(400, "El cuerpo debe ser un objeto JSON")
+                parametros.update(datos)
+            return await self.despachar(metodo, partes.path.rstrip("/") or "/", parametros)
+        except ErrorAPI as e:
+            return e.estado, "application/json", json.dumps({"error": str(e)}, ensure_ascii=False).encode()
+        except Exception as e:
+            print(f"Error en API ({destino}): {e}")
+            return 500, "application/json", json.dumps({"error": str(e)}, ensure_ascii=False).encode()
+
+    async def _responder(self, escritor, estado, tipo, cuerpo, mantener):
+        encabezado = (f"HTTP/1.1 {estado} {ESTADOS_HTTP.get(estado, '')}\r\n"
+                      f"Content-Type: {tipo}\r\n"
+                      f"Content-Length: {len(cuerpo)}\r\n"
+                      f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+        escritor.write(encabezado.encode("latin-1") + cuerpo)
+        await escritor.drain()
+
+
+async def servir(host="127.0.0.1", puerto=8765, max_workers=4):
+    servidor_api = ServidorAPI(max_workers=max_workers)
+    servidor = await asyncio.start_server(servidor_api.atender, host, puerto)
+    print(f"🛢️ API escuchando en http://{host}:{puerto}")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local del motor de cálculo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.workers))
+    except KeyboardInterrupt:
+        pass
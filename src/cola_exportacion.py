@@ -0,0 +1,86 @@
+# src/cola_exportacion.py
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.generador_reportes import crear_informe_ejecutivo
+
+
+class ColaExportacion:
+    """
+    Cola de exportación de reportes PDF en segundo plano.
+    Una sola instancia por servidor (compartida entre sesiones): los trabajos se
+    identifican por una clave, así dos usuarios que piden el mismo reporte
+    reutilizan el mismo trabajo y su resultado.
+    """
+
+    def __init__(self, max_workers=2, max_resultados=64):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export-pdf")
+        self._trabajos = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_resultados = max_resultados
+
+    def enviar(self, clave, tareas, nombre_archivo):
+        """
+        Encola un trabajo y devuelve su clave sin esperar.
+        tareas: lista de (nombre_pdf, datos_reporte). 'datos_reporte' puede ser un
+        dict o una función sin argumentos que lo calcula (se evalúa en el worker).
+        Con una sola tarea el resultado es el PDF; con varias, un ZIP con todos.
+        """
+        with self._lock:
+            trabajo = self._trabajos.get(clave)
+            if trabajo is not None and trabajo["error"] is None:
+                self._trabajos.move_to_end(clave)
+                return clave
+
+            trabajo = {
+                "total": len(tareas),
+                "hechos": 0,
+                "resultado": None,
+                "error": None,
+                "nombre_archivo": nombre_archivo,
+                "mime": "application/pdf" if len(tareas) == 1 else "application/zip",
+            }
+            self._trabajos[clave] = trabajo
+            self._podar()
+
+        self._pool.submit(self._ejecutar, trabajo, list(tareas))
+        return clave
+
+    def estado(self, clave):
+        """Copia del estado del trabajo (progreso, resultado, error) o None si no existe."""
+        with self._lock:
+            trabajo = self._trabajos.get(clave)
+            return dict(trabajo) if trabajo is not None else None
+
+    def _ejecutar(self, trabajo, tareas):
+        try:
+            pdfs = []
+            for nombre_pdf, datos in tareas:
+                datos = datos() if callable(datos) else dict(datos)
+                pdfs.append((nombre_pdf, crear_informe_ejecutivo(datos)))
+                trabajo["hechos"] += 1
+
+            if len(pdfs) == 1:
+                resultado = pdfs[0][1]
+            else:
+                buf = io.BytesIO()
+                with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+                    for nombre_pdf, contenido in pdfs:
+                        zf.writestr(nombre_pdf, contenido)
+                resultado = buf.getvalue()
+            trabajo["resultado"] = resultado
+        except Exception as e:
+            print(f"Error en exportación: {e}")
+            trabajo["error"] = str(e)
+
+    def _podar(self):
+        # Descarta los trabajos terminados más viejos cuando se supera el máximo (LRU)
+        for clave in list(self._trabajos):
+            if len(self._trabajos) <= self._max_resultados:
+                break
+            t = self._trabajos[clave]
+            if t["resultado"] is not None or t["error"] is not None:
+                del self._trabajos[clave]
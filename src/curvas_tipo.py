@@ -0,0 +1,368 @@
+# src/curvas_tipo.py
+"""
+Curvas tipo de la flota y asignación por vecinos para pozos nuevos o con datos malos.
+
+Los parámetros de declinación ya ajustados de cada pozo (ln di, b) se agrupan
+con k-means incremental (mini-batch: cada centro es el promedio de los pozos
+que recibió, se actualiza sumando sólo los nuevos). Cada grupo es una curva
+tipo normalizada q(t)/qi con su di, b y el modelo más frecuente.
+
+Para un pozo sin declinación propia (nuevo, o con el caudal en cuarentena) se
+buscan los pozos más parecidos por los atributos que tenga informados
+(producción teórica, water cut, presión, temperatura): la curva tipo sale del
+voto de los vecinos y qi de su productividad (real / teórica). La distancia
+estandariza cada atributo con media y desvío acumulados de la flota y usa
+sólo los atributos presentes en ambos pozos, así un pozo con un único dato
+igual encuentra vecinos. La búsqueda es exacta y por bloques de consultas
+(matriz consultas x pozos acotada en memoria).
+
+Agregar pozos (p. ej. las filas nuevas de src/ingesta.py) actualiza centros,
+conteos, estadísticas e índice sin recorrer la flota de nuevo.
+"""
+import copy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.lote_pozos import ESTADO_CURVA_TIPO, LotePozos
+from src.modelos_declinacion import MODELOS_DECLINACION, tasa_por_pozo
+from src.validacion import DIR_CUARENTENA, normalizar_water_cut
+
+ATRIBUTOS = ("prod_teorica_bpd", "water_cut", "presion_psi", "temp_c")
+N_CURVAS = 8
+K_VECINOS = 7
+CELDAS_BLOQUE = 4_000_000  # consultas x pozos por bloque de búsqueda
+MODELOS = tuple(MODELOS_DECLINACION)
+
+
+class AgrupadorIncremental:
+    """
+    k-means incremental: centros = promedio de los puntos asignados a cada uno
+    (con sus conteos). Mientras haya menos de n_grupos centros (p. ej. la
+    primera carga tenía pocos pozos distintos), cada bloque nuevo puede abrir más.
+    """
+
+    def __init__(self, n_grupos=N_CURVAS, semilla=0):
+        self.n_grupos = n_grupos
+        self.centros = None
+        self.cuentas = None
+        self._rng = np.random.default_rng(semilla)
+
+    def _sembrar(self, puntos):
+        # k-means++: centros nuevos (sin pozos todavía) elegidos entre los puntos con
+        # probabilidad proporcional a la distancia² al centro más cercano, hasta n_grupos;
+        # un punto que coincide con un centro no puede abrir otro
+        distintos = np.unique(puntos, axis=0)
+        centros = [] if self.centros is None else list(self.centros)
+        if not centros:
+            centros.append(distintos[self._rng.integers(len(distintos))])
+        d2 = ((distintos[:, None, :] - np.array(centros)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        while len(centros) < self.n_grupos and d2.max() > 0:
+            centros.append(distintos[self._rng.choice(len(distintos), p=d2 / d2.sum())])
+            d2 = np.minimum(d2, ((distintos - centros[-1]) ** 2).sum(axis=1))
+        cuentas = np.zeros(len(centros), dtype=np.int64)
+        if self.cuentas is not None:
+            cuentas[:len(self.cuentas)] = self.cuentas
+        self.centros = np.array(centros, dtype=float)
+        self.cuentas = cuentas
+
+    def asignar(self, puntos):
+        """Índice del centro más cercano de cada punto."""
+        d2 = ((np.asarray(puntos, dtype=float)[:, None, :] - self.centros[None, :, :]) ** 2).sum(axis=2)
+        return d2.argmin(axis=1)
+
+    def agregar(self, puntos):
+        """Suma los puntos a sus centros más cercanos (promedio exacto por centro). Devuelve las etiquetas."""
+        puntos = np.asarray(puntos, dtype=float)
+        if len(puntos) == 0:
+            return np.empty(0, dtype=int)
+        if self.centros is None or len(self.centros) < self.n_grupos:
+            # Primer bloque, o una carga inicial con pocos puntos distintos: se abren
+            # centros con los puntos nuevos que quedan lejos de los existentes
+            self._sembrar(puntos)
+        etiquetas = self.asignar(puntos)
+        k, d = self.centros.shape
+        nuevos = np.bincount(etiquetas, minlength=k)
+        sumas = np.stack([np.bincount(etiquetas, weights=puntos[:, j], minlength=k) for j in range(d)], axis=1)
+        total = self.cuentas + nuevos
+        con_puntos = nuevos > 0
+        self.centros[con_puntos] = ((self.centros * self.cuentas[:, None] + sumas)[con_puntos]
+                                    / total[con_puntos, None])
+        self.cuentas = total
+        return etiquetas
+
+
+class IndiceVecinos:
+    """k vecinos más cercanos sobre atributos con faltantes (NaN); crece por bloques sin rearmarse."""
+
+    def __init__(self, n_atributos):
+        self.n = 0
+        self._x = np.empty((0, n_atributos))
+        self._suma = np.zeros(n_atributos)
+        self._suma2 = np.zeros(n_atributos)
+        self._presentes = np.zeros(n_atributos, dtype=np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def agregar(self, x):
+        x = np.asarray(x, dtype=float)
+        if self.n + len(x) > len(self._x):
+            # Capacidad al doble: agregar de a pocos pozos es O(1) amortizado
+            nuevo = np.empty((max(2 * len(self._x), self.n + len(x)), self._x.shape[1]))
+            nuevo[:self.n] = self._x[:self.n]
+            self._x = nuevo
+        self._x[self.n:self.n + len(x)] = x
+        self.n += len(x)
+        self._suma += np.nansum(x, axis=0)
+        self._suma2 += np.nansum(x * x, axis=0)
+        self._presentes += np.isfinite(x).sum(axis=0)
+
+    def atributos(self):
+        """Atributos crudos de los pozos indexados (vista de sólo lectura)."""
+        x = self._x[:self.n]
+        x.flags.writeable = False
+        return x
+
+    def escala(self):
+        """(media, desvío) de cada atributo sobre los pozos indexados."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            media = self._suma / self._presentes
+            desvio = np.sqrt(np.maximum(self._suma2 / self._presentes - media ** 2, 0))
+        return np.nan_to_num(media), np.where(desvio > 0, desvio, 1.0)
+
+    def buscar(self, consultas, k=K_VECINOS):
+        """
+        (posiciones, distancias) de los k vecinos de cada consulta (consultas x k).
+        Distancia: raíz del promedio de las diferencias estandarizadas al
+        cuadrado sobre los atributos presentes en ambos; inf si no comparten ninguno.
+        """
+        consultas = np.asarray(consultas, dtype=float)
+        k = min(k, self.n)
+        media, desvio = self.escala()
+        base = (self._x[:self.n] - media) / desvio
+        base_presente = np.isfinite(base)
+        completas = base_presente.all(axis=0)
+        base = np.nan_to_num(base).astype(np.float32)
+        posiciones = np.empty((len(consultas), k), dtype=int)
+        distancias = np.empty((len(consultas), k))
+        bloque = max(1, CELDAS_BLOQUE // max(self.n, 1))
+        for inicio in range(0, len(consultas), bloque):
+            q = (consultas[inicio:inicio + bloque] - media) / desvio
+            q_presente = np.isfinite(q)
+            q = np.nan_to_num(q).astype(np.float32)
+            suma = np.zeros((len(q), self.n), dtype=np.float32)
+            comunes = np.zeros((len(q), self.n), dtype=np.float32)
+            diferencia = np.empty_like(suma)
+            for j in np.flatnonzero(q_presente.any(axis=0)):
+                np.subtract(q[:, j, None], base[None, :, j], out=diferencia)
+                np.multiply(diferencia, diferencia, out=diferencia)
+                # Atributo j presente en ambos: con la flota completa alcanza la máscara de la consulta
+                ambos = (q_presente[:, j, None] if completas[j]
+                         else q_presente[:, j, None] & base_presente[None, :, j])
+                diferencia *= ambos
+                suma += diferencia
+                comunes += ambos
+            with np.errstate(divide='ignore', invalid='ignore'):
+                d = np.where(comunes > 0, np.sqrt(suma / comunes), np.inf)
+            cerca = (np.argpartition(d, k - 1, axis=1)[:, :k] if k < self.n
+                     else np.tile(np.arange(self.n), (len(q), 1)))
+            d_cerca = np.take_along_axis(d, cerca, axis=1)
+            orden = np.argsort(d_cerca, axis=1, kind='stable')
+            posiciones[inicio:inicio + bloque] = np.take_along_axis(cerca, orden, axis=1)
+            distancias[inicio:inicio + bloque] = np.take_along_axis(d_cerca, orden, axis=1)
+        return posiciones, distancias
+
+
+def _atributos(df):
+    # Matriz pozos x ATRIBUTOS (NaN donde falta); water cut en fracción
+    x = np.full((len(df), len(ATRIBUTOS)), np.nan)
+    for j, nombre in enumerate(ATRIBUTOS):
+        if nombre not in df.columns:
+            continue
+        if nombre == "water_cut":
+            x[:, j] = normalizar_water_cut(df[nombre], unidad="fraccion")
+        else:
+            x[:, j] = pd.to_numeric(df[nombre], errors='coerce').to_numpy(dtype=float)
+    return x
+
+
+def _mediana(matriz):
+    # Mediana por fila sin NaN (NaN si la fila no tiene ningún valor)
+    presentes = np.isfinite(matriz).any(axis=1)
+    resultado = np.full(len(matriz), np.nan)
+    if presentes.any():
+        resultado[presentes] = np.nanmedian(matriz[presentes], axis=1)
+    return resultado
+
+
+class BibliotecaCurvasTipo:
+    """Curvas tipo (grupos de ln di y b de la flota) más el índice de vecinos por atributos."""
+
+    def __init__(self, n_curvas=N_CURVAS, semilla=0):
+        self.agrupador = AgrupadorIncremental(n_curvas, semilla)
+        self.indice = IndiceVecinos(len(ATRIBUTOS))
+        # Por pozo indexado: id, parámetros (ln di, b), modelo, qi y productividad (real / teórica)
+        self._pozo_id = []
+        self._modelos = []
+        self._parametros = []
+        self._qi = []
+        self._productividad = []
+        self._curvas = None
+
+    def __len__(self):
+        return len(self.indice)
+
+    @classmethod
+    def desde_dataframe(cls, df, n_curvas=N_CURVAS):
+        return cls(n_curvas).agregar(df)
+
+    def copia(self):
+        return copy.deepcopy(self)
+
+    def agregar(self, df):
+        """
+        Suma los pozos con declinación válida (prod_real_bpd > 0, di > 0; columnas
+        di, b y modelo_declinacion como las deja preparar_declinacion). Devuelve self.
+        """
+        qi = pd.to_numeric(df['prod_real_bpd'], errors='coerce').to_numpy(dtype=float)
+        di = pd.to_numeric(df['di'], errors='coerce').to_numpy(dtype=float)
+        b = pd.to_numeric(df['b'], errors='coerce').to_numpy(dtype=float) if 'b' in df.columns else np.zeros(len(df))
+        validos = np.isfinite(qi) & (qi > 0) & np.isfinite(di) & (di > 0) & np.isfinite(b)
+        if not validos.any():
+            return self
+        parametros = np.column_stack([np.log(di[validos]), b[validos]])
+        self.agrupador.agregar(parametros)
+        self._curvas = None
+
+        modelos = (df['modelo_declinacion'].astype(str).to_numpy()[validos] if 'modelo_declinacion' in df.columns
+                   else np.full(validos.sum(), MODELOS[0]))
+        self._modelos.append(np.array([MODELOS.index(m) if m in MODELOS else 0 for m in modelos], dtype=int))
+
+        x = _atributos(df)[validos]
+        teorica = x[:, ATRIBUTOS.index("prod_teorica_bpd")]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            productividad = np.where(teorica > 0, qi[validos] / teorica, np.nan)
+        self.indice.agregar(x)
+        ids = df['pozo_id'].astype(str).to_numpy() if 'pozo_id' in df.columns else np.full(len(df), '')
+        self._pozo_id.append(np.asarray(ids, dtype=object)[validos])
+        self._parametros.append(parametros)
+        self._qi.append(qi[validos])
+        self._productividad.append(productividad)
+        return self
+
+    def _columna(self, partes):
+        # Los bloques agregados se juntan recién al consultar (y quedan juntos)
+        if len(partes) > 1:
+            partes[:] = [np.concatenate(partes)]
+        return partes[0] if partes else np.empty(0)
+
+    def curvas(self):
+        """
+        DataFrame de curvas tipo: di, b, modelo más frecuente y cantidad de pozos
+        (según el centro más cercano a cada pozo con los centros actuales).
+        Se arma una vez por cada bloque agregado.
+        """
+        centros = self.agrupador.centros
+        if centros is None:
+            return pd.DataFrame(columns=['curva', 'di', 'b', 'modelo', 'pozos'])
+        if self._curvas is not None:
+            return self._curvas
+        etiquetas = self.agrupador.asignar(self._columna(self._parametros))
+        modelos = np.zeros((len(centros), len(MODELOS)), dtype=np.int64)
+        np.add.at(modelos, (etiquetas, self._columna(self._modelos)), 1)
+        self._curvas = pd.DataFrame({
+            'curva': np.arange(len(centros)),
+            'di': np.exp(centros[:, 0]),
+            'b': centros[:, 1],
+            'modelo': np.asarray(MODELOS, dtype=object)[modelos.argmax(axis=1)],
+            'pozos': modelos.sum(axis=1),
+        })
+        return self._curvas
+
+    def curva_normalizada(self, dias):
+        """Matriz (curvas x días) de q(t)/qi de cada curva tipo."""
+        curvas = self.curvas()
+        return tasa_por_pozo(curvas['modelo'].to_numpy(), np.ones(len(curvas)), curvas['di'].to_numpy(),
+                             curvas['b'].to_numpy(), dias)
+
+    def asignar(self, df_atributos, k=K_VECINOS):
+        """
+        Curva tipo y qi estimado para pozos descriptos sólo por atributos
+        (columnas de ATRIBUTOS que tengan; las demás se ignoran). qi = mediana
+        de la productividad de los vecinos x producción teórica, o mediana del
+        qi de los vecinos si no hay teórica. Devuelve un DataFrame por pozo
+        (curva, qi, di, b, modelo, water_cut, distancia media y ids de los vecinos);
+        el water cut faltante se toma de la mediana de los vecinos. Un pozo sin
+        atributos en común con la flota recibe la curva más poblada y medianas del campo.
+        """
+        if len(self) == 0:
+            raise ValueError("La biblioteca de curvas tipo está vacía")
+        x = _atributos(df_atributos)
+        posiciones, distancias = self.indice.buscar(x, k)
+        curvas = self.curvas()
+        parametros = self._columna(self._parametros)
+        qi = self._columna(self._qi)
+        productividad = self._columna(self._productividad)
+        pozo_id = self._columna(self._pozo_id)
+
+        # Sólo cuentan los vecinos con algún atributo en común (distancia finita); un pozo
+        # sin ninguno toma la curva con más pozos y las medianas de toda la flota
+        cercanos = np.isfinite(distancias)
+        sin_vecinos = ~cercanos.any(axis=1)
+
+        # Voto de los vecinos ponderado por cercanía (la etiqueta se recalcula con los centros actuales)
+        etiquetas = self.agrupador.asignar(parametros[posiciones.ravel()]).reshape(posiciones.shape)
+        pesos = np.where(cercanos, 1 / (distancias + 1e-6), 0.0)
+        votos = np.zeros((len(x), len(curvas)))
+        np.add.at(votos, (np.repeat(np.arange(len(x)), posiciones.shape[1]), etiquetas.ravel()), pesos.ravel())
+        curva = np.where(sin_vecinos, self.agrupador.cuentas.argmax(), votos.argmax(axis=1))
+
+        def mediana_vecinos(valores):
+            por_vecino = np.where(cercanos, valores[posiciones], np.nan)
+            return np.where(sin_vecinos, _mediana(valores[None, :])[0], _mediana(por_vecino))
+
+        teorica = x[:, ATRIBUTOS.index("prod_teorica_bpd")]
+        prod_vecinos = mediana_vecinos(productividad)
+        wc = x[:, ATRIBUTOS.index("water_cut")]
+        wc_vecinos = mediana_vecinos(self.indice.atributos()[:, ATRIBUTOS.index("water_cut")])
+        qi_estimado = np.where(np.isfinite(teorica) & np.isfinite(prod_vecinos), teorica * prod_vecinos,
+                               mediana_vecinos(qi))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distancia_media = np.where(cercanos, distancias, 0.0).sum(axis=1) / cercanos.sum(axis=1)
+        return pd.DataFrame({
+            'curva': curva,
+            'qi': qi_estimado,
+            'di': curvas['di'].to_numpy()[curva],
+            'b': curvas['b'].to_numpy()[curva],
+            'modelo': curvas['modelo'].to_numpy()[curva],
+            'water_cut': np.where(np.isfinite(wc), wc, wc_vecinos),
+            'distancia_vecinos': distancia_media,
+            'vecinos': [list(ids[usar]) for ids, usar in zip(pozo_id[posiciones], cercanos)],
+        }, index=df_atributos.index)
+
+
+def atributos_cuarentena(pozo_id, origen, dir_cuarentena=DIR_CUARENTENA):
+    """
+    Última fila en cuarentena de un pozo (sólo las columnas de ATRIBUTOS que
+    tenga), como DataFrame de una fila; None si el pozo no está en cuarentena.
+    """
+    ruta = Path(dir_cuarentena) / f"{origen}_cuarentena.csv"
+    if not ruta.exists():
+        return None
+    df = pd.read_csv(ruta)
+    if 'pozo_id' not in df.columns:
+        return None
+    df = df[df['pozo_id'].astype(str).str.strip() == str(pozo_id).strip()]
+    if len(df) == 0:
+        return None
+    return df[[c for c in ATRIBUTOS if c in df.columns]].tail(1).reset_index(drop=True)
+
+
+def lote_curva_tipo(pozo_ids, asignados):
+    """LotePozos (estado curva_tipo) con lo que devolvió BibliotecaCurvasTipo.asignar."""
+    return LotePozos(pozo_ids, asignados['qi'].to_numpy(dtype=float), asignados['di'].to_numpy(dtype=float),
+                     b=asignados['b'].to_numpy(dtype=float),
+                     bsw=np.nan_to_num(asignados['water_cut'].to_numpy(dtype=float)),
+                     modelo=asignados['modelo'].to_numpy(), estado=ESTADO_CURVA_TIPO)
@@ -0,0 +1,212 @@
+# src/datos_compartidos.py
+"""
+Capa de datos compartida e inmutable entre sesiones de Streamlit.
+
+Cada archivo de datos (con su conjunto de reglas de validación) se carga y
+valida una única vez por proceso; todas las sesiones reciben el mismo
+DatasetCampo. Nadie modifica ese objeto:
+  - columna(nombre) devuelve arrays NumPy de sólo lectura (sin copia);
+  - vista() devuelve un DataFrame nuevo por sesión que comparte los buffers
+    (copia superficial con Copy-on-Write de pandas): agregar o pisar columnas
+    en la vista sólo afecta a esa sesión y copia únicamente lo que se escribe.
+Así la memoria base queda fija aunque crezcan los usuarios concurrentes; cada
+sesión sólo paga sus columnas derivadas. Si cambia el archivo (mtime/tamaño)
+se actualiza: si sólo se agregaron filas al final (src/ingesta.py) se leen,
+validan y preparan únicamente esas filas y se anexan a un DatasetCampo nuevo;
+si fue reescrito se vuelve a cargar completo.
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.activos import RAIZ_PROYECTO, firma_archivo
+from src.curvas_tipo import BibliotecaCurvasTipo
+from src.distribuciones import ResumenCampo
+from src.funciones_petroleras import preparar_pozos
+from src.ingesta import leer_nuevas_filas
+from src.lote_pozos import LotePozos
+from src.ranking import IndiceOrden
+from src.validacion import fijar_unidades, unidades_consistentes, validar_datos
+
+# vista() aísla las sesiones sólo con Copy-on-Write: fijo desde pandas 3 (requirements.txt),
+# en pandas 2.x hay que activarlo o una escritura en la vista llegaría a la tabla compartida
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+_datasets = {}
+_lock = threading.Lock()
+
+
+class DatasetCampo:
+    """Tabla de pozos validada, de sólo lectura, compartida por todas las sesiones."""
+
+    def __init__(self, df, firma, contadores=None, marca=None, reglas=()):
+        self._df = df.reset_index(drop=True)
+        self.firma = firma
+        self.contadores = contadores or {}
+        # Marca de agua del archivo y reglas con la unidad fijada, para anexar filas nuevas
+        self.marca = marca
+        self.reglas = reglas
+        # Posición de cada pozo para búsquedas O(1) (Detalle de pozo)
+        self._posiciones = _posiciones(self._df)
+        self._lote = None
+        self._resumen = None
+        self._indices = {}
+        self._curvas_tipo = None
+
+    def __len__(self):
+        return len(self._df)
+
+    @property
+    def columnas(self):
+        return list(self._df.columns)
+
+    def columna(self, nombre):
+        """Array NumPy de sólo lectura con la columna (sin copia para columnas numéricas)."""
+        valores = self._df[nombre].to_numpy()
+        valores.flags.writeable = False
+        return valores
+
+    def vista(self):
+        """DataFrame propio de la sesión sobre los mismos buffers (Copy-on-Write)."""
+        return self._df.copy(deep=False)
+
+    def fila(self, pozo_id):
+        """Dict con los valores de un pozo, o None si no existe."""
+        pos = self._posiciones.get(str(pozo_id).strip())
+        if pos is None:
+            return None
+        return self._df.iloc[pos].to_dict()
+
+    def lote(self, pozo_ids=None):
+        """
+        LotePozos de sólo lectura con todos los pozos, o con los pedidos (en ese
+        orden; los inexistentes se omiten). Requiere la columna 'di' (datasets
+        cargados con preparar_declinacion). El lote completo se arma una vez.
+        """
+        if self._lote is None:
+            lote = LotePozos.desde_dataframe(self._df)
+            for campo in LotePozos.__slots__:
+                getattr(lote, campo).flags.writeable = False
+            self._lote = lote
+        if pozo_ids is None:
+            return self._lote
+        ids = (str(pozo_id).strip() for pozo_id in pozo_ids)
+        posiciones = [self._posiciones[i] for i in ids if i in self._posiciones]
+        return self._lote[np.array(posiciones, dtype=int)]
+
+    def resumen(self):
+        """
+        ResumenCampo (histogramas y sketches de cuantiles) de todos los pozos,
+        para graficar distribuciones sin mandar un valor por pozo. Se arma una
+        vez; al anexar filas sólo se suman las nuevas.
+        """
+        if self._resumen is None:
+            self._resumen = ResumenCampo.desde_dataframe(self._df)
+        return self._resumen
+
+    def curvas_tipo(self):
+        """
+        BibliotecaCurvasTipo de los pozos con declinación válida (requiere 'di'),
+        para asignar curva y qi a pozos sin datos propios. Se arma una vez; al
+        anexar filas sólo se agregan las nuevas.
+        """
+        if self._curvas_tipo is None:
+            self._curvas_tipo = BibliotecaCurvasTipo.desde_dataframe(self._df)
+        return self._curvas_tipo
+
+    def indice_orden(self, nombre):
+        """IndiceOrden de una columna numérica (para el ranking paginado); se arma una vez por columna."""
+        indice = self._indices.get(nombre)
+        if indice is None:
+            indice = IndiceOrden(pd.to_numeric(self._df[nombre], errors='coerce'))
+            self._indices[nombre] = indice
+        return indice
+
+    def anexar(self, df_nuevo, firma, contadores, marca):
+        """DatasetCampo nuevo con las filas agregadas (éste no se modifica)."""
+        nuevo = DatasetCampo.__new__(DatasetCampo)
+        nuevo._df = pd.concat([self._df, df_nuevo], ignore_index=True) if len(df_nuevo) else self._df
+        nuevo.firma = firma
+        nuevo.contadores = {clave: self.contadores.get(clave, 0) + contadores.get(clave, 0)
+                            for clave in self.contadores.keys() | contadores.keys()}
+        nuevo.marca = marca
+        nuevo.reglas = self.reglas
+        # Sólo se indexan las filas nuevas (un pozo repetido apunta a su última fila)
+        nuevo._posiciones = {**self._posiciones, **_posiciones(df_nuevo, len(self._df))}
+        nuevo._lote = None
+        nuevo._resumen = None
+        nuevo._indices = {} if len(df_nuevo) else self._indices
+        if self._resumen is not None and len(df_nuevo):
+            # None si las filas nuevas cambian la unidad del water cut: se rearma al pedirlo
+            nuevo._resumen = self._resumen.copia().actualizar(df_nuevo)
+        elif self._resumen is not None:
+            nuevo._resumen = self._resumen
+        nuevo._curvas_tipo = self._curvas_tipo
+        if self._curvas_tipo is not None and len(df_nuevo):
+            nuevo._curvas_tipo = self._curvas_tipo.copia().agregar(df_nuevo)
+        return nuevo
+
+
+def _posiciones(df, desde=0):
+    if 'pozo_id' not in df.columns:
+        return {}
+    ids = df['pozo_id'].astype(str).str.strip()
+    return dict(zip(ids, range(desde, desde + len(ids))))
+
+
+def preparar_declinacion(df):
+    """Completa 'di' (si el archivo no lo trae), 'modelo_declinacion' y 'b' por pozo."""
+    return preparar_pozos(df)
+
+
+def obtener_dataset(ruta, reglas=(), origen=None, preparar=None):
+    """
+    DatasetCampo compartido para (archivo, reglas, preparación). Se carga bajo
+    lock: si varias sesiones lo piden a la vez, se lee una sola vez.
+    Devuelve None si el archivo no existe.
+    """
+    ruta = Path(ruta)
+    ruta = ruta if ruta.is_absolute() else RAIZ_PROYECTO / ruta
+    clave = (ruta, repr(reglas), origen, getattr(preparar, '__qualname__', None))
+
+    with _lock:
+        firma = firma_archivo(ruta)
+        if firma is None:
+            return None
+        dataset = _datasets.get(clave)
+        if dataset is None or dataset.firma != firma:
+            dataset = _actualizar(dataset, ruta, firma, reglas, origen, preparar)
+            _datasets[clave] = dataset
+        return dataset
+
+
+def _procesar(df, ruta, reglas, origen, preparar):
+    contadores = {}
+    if reglas:
+        df, contadores = validar_datos(df, reglas, origen=origen)
+        if contadores['filas_cuarentena'] > 0:
+            print(f"Resiliencia: Se omitieron {contadores['filas_cuarentena']} registros "
+                  f"inconsistentes de {ruta.name} (ver datos/cuarentena/).")
+    if preparar is not None:
+        df = preparar(df)
+    return df, contadores
+
+
+def _actualizar(dataset, ruta, firma, reglas, origen, preparar):
+    """Anexa sólo las filas nuevas si el archivo creció por el final; si no, carga completo."""
+    marca = dataset.marca if dataset is not None else None
+    df, marca, completo = leer_nuevas_filas(ruta, marca)
+    if not completo:
+        if len(df) == 0:
+            return dataset.anexar(df, firma, {}, marca)
+        if unidades_consistentes(dataset.reglas, df):
+            df, contadores = _procesar(df, ruta, dataset.reglas, origen, preparar)
+            return dataset.anexar(df, firma, contadores, marca)
+        df, marca, completo = leer_nuevas_filas(ruta)
+
+    reglas = fijar_unidades(reglas, df)
+    df, contadores = _procesar(df, ruta, reglas, origen, preparar)
+    return DatasetCampo(df, firma, contadores, marca, reglas)
@@ -0,0 +1,232 @@
+# src/distribuciones.py
+"""
+Distribuciones del campo resumidas en el servidor: histogramas con bordes
+fijos y sketches de cuantiles (estilo KLL) para producción, water cut,
+eficiencia y margen sobre Qel.
+
+Los gráficos se arman con los bins (un valor por bin), no con un valor por
+pozo: el payload que viaja al navegador es el mismo con 100 o con un millón
+de pozos. Ambas estructuras se combinan sumando (histogramas) o uniendo
+niveles (sketches), así se actualizan sólo con las filas nuevas
+(src/ingesta.py) sin recorrer de nuevo el campo completo.
+
+El margen sobre Qel es la producción desplazada en Qel: no se guarda aparte,
+se deriva de la producción para cualquier escenario de precios.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from src.validacion import normalizar_water_cut, unidad_origen
+
+# Rango y cantidad de bins de cada métrica (lo que cae afuera se cuenta aparte)
+METRICAS = {
+    "prod_real_bpd": {"titulo": "Producción (bpd)", "minimo": 0.0, "maximo": 5000.0, "bins": 200},
+    "water_cut": {"titulo": "Water Cut (%)", "minimo": 0.0, "maximo": 100.0, "bins": 50},
+    "eficiencia": {"titulo": "Eficiencia (%)", "minimo": 0.0, "maximo": 200.0, "bins": 80},
+}
+K_SKETCH = 200  # error de rango del orden de 1/K
+
+
+def _finitos(valores):
+    valores = np.asarray(valores, dtype=float).ravel()
+    return valores[np.isfinite(valores)]
+
+
+class Histograma:
+    """Conteos sobre bordes fijos [b0, b1), [b1, b2)... más conteos por debajo y por encima del rango."""
+
+    def __init__(self, minimo, maximo, bins):
+        self.bordes = np.linspace(minimo, maximo, bins + 1)
+        self.cuentas = np.zeros(bins, dtype=np.int64)
+        self.bajo_rango = 0
+        self.sobre_rango = 0
+
+    @property
+    def total(self):
+        return int(self.cuentas.sum()) + self.bajo_rango + self.sobre_rango
+
+    @property
+    def centros(self):
+        return (self.bordes[:-1] + self.bordes[1:]) / 2
+
+    @property
+    def anchos(self):
+        return np.diff(self.bordes)
+
+    def agregar(self, valores):
+        """Suma los valores (NaN se ignoran) a los conteos. Devuelve self."""
+        valores = _finitos(valores)
+        posicion = np.searchsorted(self.bordes, valores, side='right') - 1
+        # El borde superior cierra el último bin
+        posicion[valores == self.bordes[-1]] = len(self.cuentas) - 1
+        adentro = (posicion >= 0) & (posicion < len(self.cuentas))
+        self.cuentas += np.bincount(posicion[adentro], minlength=len(self.cuentas))
+        self.bajo_rango += int((posicion < 0).sum())
+        self.sobre_rango += int((posicion >= len(self.cuentas)).sum())
+        return self
+
+    def combinar(self, otro):
+        """Histograma con los conteos de ambos (mismos bordes)."""
+        if not np.array_equal(self.bordes, otro.bordes):
+            raise ValueError("Sólo se combinan histogramas con los mismos bordes")
+        nuevo = copy.deepcopy(self)
+        nuevo.cuentas += otro.cuentas
+        nuevo.bajo_rango += otro.bajo_rango
+        nuevo.sobre_rango += otro.sobre_rango
+        return nuevo
+
+    def desplazado(self, delta):
+        """Mismo histograma con los bordes corridos en 'delta' (p. ej. producción -> margen sobre Qel)."""
+        nuevo = copy.deepcopy(self)
+        nuevo.bordes = self.bordes + delta
+        return nuevo
+
+    def partir(self, umbral, n_bajo=None):
+        """
+        (cuentas <= umbral, cuentas > umbral) por bin. El bin que contiene al
+        umbral se reparte con 'n_bajo' (total exacto de valores <= umbral, si se
+        conoce) o, si no, en proporción lineal dentro del bin.
+        """
+        izquierdo, derecho = self.bordes[:-1], self.bordes[1:]
+        bajo = np.where(derecho <= umbral, self.cuentas, 0)
+        cruce = np.flatnonzero((izquierdo <= umbral) & (derecho > umbral))
+        if len(cruce):
+            i = cruce[0]
+            if n_bajo is None:
+                parte = np.floor(self.cuentas[i] * (umbral - izquierdo[i]) / (derecho[i] - izquierdo[i]))
+            else:
+                parte = n_bajo - self.bajo_rango - bajo.sum()
+            bajo[i] = int(np.clip(parte, 0, self.cuentas[i]))
+        return bajo, self.cuentas - bajo
+
+    def ocupado(self):
+        """Slice de bins sin los vacíos de los extremos (para graficar sólo el rango con datos)."""
+        ocupados = np.flatnonzero(self.cuentas)
+        if len(ocupados) == 0:
+            return slice(0, 0)
+        return slice(ocupados[0], ocupados[-1] + 1)
+
+
+class SketchCuantiles:
+    """
+    Sketch de cuantiles mergeable (compactores por nivel, estilo KLL): cada
+    nivel h guarda valores de peso 2**h; cuando un nivel se llena se ordena y
+    sube uno de cada dos valores. Memoria O(k log(n/k)); exacto si n <= k.
+    """
+
+    def __init__(self, k=K_SKETCH, semilla=0):
+        self.k = k
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self._rng = np.random.default_rng(semilla)
+
+    def __len__(self):
+        return sum(len(nivel) for nivel in self.niveles)
+
+    def _capacidad(self, h):
+        # Los niveles bajos (pesos chicos) tienen menos lugar: decae 2/3 por nivel
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.niveles) - 1 - h))))
+
+    def _compactar(self):
+        h = 0
+        while h < len(self.niveles):
+            if len(self.niveles[h]) <= self._capacidad(h):
+                h += 1
+                continue
+            nuevo_nivel = h + 1 == len(self.niveles)
+            if nuevo_nivel:
+                self.niveles.append(np.empty(0))
+            nivel = np.sort(self.niveles[h])
+            pares = len(nivel) - len(nivel) % 2
+            promovidos = nivel[:pares][self._rng.integers(2)::2]
+            self.niveles[h] = nivel[pares:]
+            self.niveles[h + 1] = np.concatenate([self.niveles[h + 1], promovidos])
+            # Con un nivel más bajan las capacidades de los de abajo: se revisa desde el principio
+            h = 0 if nuevo_nivel else h + 1
+
+    def agregar(self, valores):
+        """Agrega valores (NaN se ignoran). Devuelve self."""
+        valores = _finitos(valores)
+        self.n += len(valores)
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+
+    def combinar(self, otro):
+        """Sketch de la unión de ambos conjuntos."""
+        nuevo = copy.deepcopy(self)
+        nuevo.n += otro.n
+        for h, nivel in enumerate(otro.niveles):
+            if h == len(nuevo.niveles):
+                nuevo.niveles.append(np.empty(0))
+            nuevo.niveles[h] = np.concatenate([nuevo.niveles[h], nivel])
+        nuevo._compactar()
+        return nuevo
+
+    def cuantiles(self, q):
+        """Valores aproximados para las probabilidades q (escalar o array en [0, 1])."""
+        q = np.asarray(q, dtype=float)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(nivel), 2.0 ** h) for h, nivel in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind='stable')
+        acumulado = np.cumsum(pesos[orden])
+        posicion = np.searchsorted(acumulado, q * acumulado[-1], side='left')
+        return valores[orden][np.clip(posicion, 0, len(valores) - 1)]
+
+
+class ResumenCampo:
+    """Histograma y sketch por métrica del campo; se actualiza con las filas nuevas."""
+
+    def __init__(self, origen_wc=None):
+        self.histogramas = {nombre: Histograma(m["minimo"], m["maximo"], m["bins"]) for nombre, m in METRICAS.items()}
+        self.sketches = {nombre: SketchCuantiles() for nombre in METRICAS}
+        # Unidad del water cut decidida sobre el archivo completo (no por bloque de filas nuevas)
+        self.origen_wc = origen_wc
+
+    @classmethod
+    def desde_dataframe(cls, df):
+        resumen = cls(unidad_origen(df['water_cut']) if 'water_cut' in df.columns else None)
+        return resumen.actualizar(df)
+
+    def _metricas(self, df):
+        prod = pd.to_numeric(df['prod_real_bpd'], errors='coerce').to_numpy(dtype=float)
+        valores = {"prod_real_bpd": prod}
+        if 'water_cut' in df.columns:
+            valores["water_cut"] = normalizar_water_cut(df['water_cut'], unidad="porcentaje", origen=self.origen_wc)
+        if 'prod_teorica_bpd' in df.columns:
+            teorica = pd.to_numeric(df['prod_teorica_bpd'], errors='coerce').to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                valores["eficiencia"] = np.where(teorica > 0, prod / teorica * 100, np.nan)
+        return valores
+
+    def actualizar(self, df):
+        """
+        Suma las filas de 'df' a histogramas y sketches. Devuelve self, o None si
+        las filas nuevas cambian la unidad del water cut (hay que rearmarlo completo).
+        """
+        if (self.origen_wc == "fraccion" and 'water_cut' in df.columns
+                and unidad_origen(df['water_cut']) == "porcentaje"):
+            return None
+        for nombre, valores in self._metricas(df).items():
+            self.histogramas[nombre].agregar(valores)
+            self.sketches[nombre].agregar(valores)
+        return self
+
+    def copia(self):
+        return copy.deepcopy(self)
+
+    def margen(self, q_limite):
+        """Histograma del margen sobre Qel (producción - q_limite): el de producción con los bordes corridos."""
+        return self.histogramas["prod_real_bpd"].desplazado(-q_limite)
+
+    def percentiles(self, probabilidades=(0.1, 0.5, 0.9), q_limite=None):
+        """Tabla métrica x percentil (P10/P50/P90 por defecto) desde los sketches; margen si se pasa Qel."""
+        filas = {METRICAS[nombre]["titulo"]: sketch.cuantiles(probabilidades)
+                 for nombre, sketch in self.sketches.items() if sketch.n}
+        if q_limite is not None and self.sketches["prod_real_bpd"].n:
+            filas["Margen sobre Qel (bpd)"] = self.sketches["prod_real_bpd"].cuantiles(probabilidades) - q_limite
+        return pd.DataFrame(filas, index=[f"P{round(p * 100)}" for p in probabilidades]).T
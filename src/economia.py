@@ -0,0 +1,245 @@
+# src/economia.py
+"""
+Motor económico: flujo de caja descontado, VPN, TIR y payback.
+
+Dos caminos, ambos vectorizados sobre pozos y escenarios (broadcasting de NumPy):
+  - evaluar_flujo_caja / tir_flujo_caja: sobre flujos diarios ya calculados
+    (p. ej. el cash_flow_diario de calcular_detalle_pozo, o una matriz pozos x días).
+  - evaluar_pozos_analitico / tir_pozos_analitico: sin curvas diarias. El pozo
+    produce hasta su caudal de equilibrio (ingreso neto = OPEX) y el volumen
+    descontado sale de acumulada_descontada de cada modelo de declinación
+    (forma cerrada en la exponencial, cuadratura fija en las hiperbólicas).
+    Es lo que permite recalcular el VPN de toda la flota de forma interactiva.
+
+Convenciones: tasa de descuento anual efectiva, descuento continuo diario
+r = ln(1 + tasa) / 365; el CAPEX se invierte en t = 0; el impuesto se aplica
+sobre el flujo operativo positivo; los días por debajo del límite económico
+no producen (igual que calcular_flujo_caja).
+"""
+import numpy as np
+import pandas as pd
+
+from src.funciones_petroleras import preparar_pozos
+from src.modelos_declinacion import (
+    acumulada_descontada_por_pozo,
+    acumulada_por_pozo,
+    tiempo_a_tasa_por_pozo,
+)
+from src.validacion import normalizar_water_cut
+
+TASA_DESCUENTO = 0.10
+TAMANO_BLOQUE = 50000
+TIR_MINIMA, TIR_MAXIMA = -0.99, 10.0
+
+
+def tasa_diaria(tasa_anual):
+    """Tasa continua diaria equivalente a una tasa anual efectiva."""
+    return np.log1p(np.asarray(tasa_anual, dtype=float)) / 365
+
+
+def factores_descuento(dias, tasa_anual=TASA_DESCUENTO):
+    """
+    (1 + tasa)^(-t/365). Si 'tasa_anual' es un array de escenarios, el resultado
+    tiene forma (escenarios..., días) y se combina por broadcasting con los flujos.
+    """
+    tasa = np.asarray(tasa_anual, dtype=float)[..., None]
+    return (1 + tasa) ** (-np.asarray(dias, dtype=float) / 365)
+
+
+# --- CAMINO 1: FLUJOS DIARIOS ---
+
+def _flujo_despues_de_impuestos(cf_diario, tasa_impuesto, cerrar_en_limite):
+    cf = np.asarray(cf_diario, dtype=float)
+    if cerrar_en_limite:
+        cf = np.maximum(cf, 0)
+    return cf - tasa_impuesto * np.maximum(cf, 0)
+
+
+def evaluar_flujo_caja(cf_diario, tasa_descuento=TASA_DESCUENTO, capex=0.0, tasa_impuesto=0.0,
+                       cerrar_en_limite=True):
+    """
+    VPN, payback e índice de rentabilidad de flujos diarios (..., días).
+    'tasa_descuento' y 'capex' se combinan por broadcasting con las dimensiones
+    iniciales de cf_diario (p. ej. tasas (escenarios, 1) contra cf (pozos, días)).
+    Devuelve un dict de arrays; payback_dia = -1 si no se recupera la inversión.
+    """
+    cf = _flujo_despues_de_impuestos(cf_diario, tasa_impuesto, cerrar_en_limite)
+    capex = np.asarray(capex, dtype=float)
+    dias = np.arange(cf.shape[-1])
+
+    vpn = (cf * factores_descuento(dias, tasa_descuento)).sum(axis=-1) - capex
+    acumulado = np.cumsum(cf, axis=-1) - capex[..., None]
+    recuperado = acumulado >= 0
+    payback = np.where(recuperado.any(axis=-1), recuperado.argmax(axis=-1), -1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indice = np.where(capex > 0, vpn / capex, np.nan)
+    return {"vpn": vpn, "payback_dia": payback, "indice_rentabilidad": indice}
+
+
+def _biseccion_tir(vpn_a_tasa, forma, iteraciones=60):
+    # El VPN decrece con la tasa: bisección vectorizada sobre todos los casos a la vez
+    bajo = np.full(forma, TIR_MINIMA)
+    alto = np.full(forma, TIR_MAXIMA)
+    vpn_bajo = vpn_a_tasa(bajo)
+    vpn_alto = vpn_a_tasa(alto)
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        positivo = vpn_a_tasa(medio) > 0
+        bajo = np.where(positivo, medio, bajo)
+        alto = np.where(positivo, alto, medio)
+    tir = (bajo + alto) / 2
+    # Sin cambio de signo en el rango no hay TIR (nunca se recupera, o supera el tope)
+    tir = np.where(vpn_bajo <= 0, np.nan, tir)
+    return np.where(vpn_alto > 0, TIR_MAXIMA, tir)
+
+
+def tir_flujo_caja(cf_diario, capex, tasa_impuesto=0.0, cerrar_en_limite=True):
+    """TIR anual de cada flujo diario (..., días) con inversión 'capex' en t = 0. NaN si no hay."""
+    cf = _flujo_despues_de_impuestos(cf_diario, tasa_impuesto, cerrar_en_limite)
+    capex = np.asarray(capex, dtype=float)
+    dias = np.arange(cf.shape[-1])
+    forma = np.broadcast_shapes(cf.shape[:-1], capex.shape)
+    return _biseccion_tir(lambda tasa: (cf * factores_descuento(dias, tasa)).sum(axis=-1) - capex, forma)
+
+
+# --- CAMINO 2: FORMA CERRADA SOBRE LOS MODELOS DE DECLINACIÓN ---
+
+def _preparar_caso(forma, modelos, qi, di, b, precio_brent, opex_mensual, water_cut, costo_tratamiento_bbl,
+                   regalias, horizonte, m_std):
+    # Lleva todo a arrays planos de la forma común y calcula el tiempo productivo de cada caso
+    qi, di, b, precio, opex, wc, trat = (np.broadcast_to(np.asarray(x, dtype=float), forma) for x in
+                                         (qi, di, b, precio_brent, opex_mensual, water_cut, costo_tratamiento_bbl))
+    modelos = np.broadcast_to(np.asarray(modelos, dtype=object), forma).ravel()
+    caso = {
+        'modelos': modelos,
+        'qi': qi.ravel(), 'di': di.ravel(), 'b': b.ravel(),
+        # Margen por barril de petróleo: el agua asociada paga tratamiento como fluido
+        'neto_bbl': (precio * (1 - regalias) - trat / (1 - np.clip(wc, 0, 0.99))).ravel(),
+        'opex_diario': (opex / m_std).ravel(),
+    }
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q_equilibrio = np.where(caso['neto_bbl'] > 0, caso['opex_diario'] / caso['neto_bbl'], np.inf)
+        t_fin = tiempo_a_tasa_por_pozo(modelos, caso['qi'], caso['di'], caso['b'], q_equilibrio)
+    t_fin = np.where(np.isfinite(t_fin), t_fin, horizonte)
+    t_fin = np.where(caso['qi'] > q_equilibrio, np.clip(t_fin, 0, horizonte), 0.0)
+    caso['t_fin'] = t_fin
+    return caso
+
+
+def _vpn_operativo(caso, r, tasa_impuesto):
+    # Ingreso neto descontado - OPEX fijo descontado, por bloques (la cuadratura usa nodos x casos)
+    r = np.broadcast_to(np.asarray(r, dtype=float), caso['qi'].shape)
+    volumen = np.empty(len(r))
+    for inicio in range(0, len(r), TAMANO_BLOQUE):
+        s = slice(inicio, inicio + TAMANO_BLOQUE)
+        volumen[s] = acumulada_descontada_por_pozo(caso['modelos'][s], caso['qi'][s], caso['di'][s],
+                                                   caso['b'][s], caso['t_fin'][s], r[s])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        anualidad = np.where(r != 0, -np.expm1(-r * caso['t_fin']) / r, caso['t_fin'])
+    return (1 - tasa_impuesto) * (caso['neto_bbl'] * volumen - caso['opex_diario'] * anualidad)
+
+
+def evaluar_pozos_analitico(modelos, qi, di, b, precio_brent, opex_mensual, water_cut=0.0,
+                            costo_tratamiento_bbl=0.0, regalias=0.12, tasa_descuento=TASA_DESCUENTO,
+                            horizonte=730, capex=0.0, tasa_impuesto=0.0, m_std=30):
+    """
+    VPN, días productivos, volumen, payback e índice de rentabilidad sin curvas diarias.
+    Todos los parámetros se combinan por broadcasting: p. ej. precios (escenarios, 1)
+    contra qi (pozos,) devuelve arrays (escenarios, pozos).
+    """
+    forma = np.broadcast_shapes(*(np.shape(x) for x in (modelos, qi, di, b, precio_brent, opex_mensual, water_cut,
+                                                        costo_tratamiento_bbl, tasa_descuento, capex)))
+    caso = _preparar_caso(forma, modelos, qi, di, b, precio_brent, opex_mensual, water_cut, costo_tratamiento_bbl,
+                          regalias, horizonte, m_std)
+    r = np.broadcast_to(tasa_diaria(tasa_descuento), forma).ravel()
+    capex = np.broadcast_to(np.asarray(capex, dtype=float), forma).ravel()
+
+    vpn = _vpn_operativo(caso, r, tasa_impuesto) - capex
+
+    # Payback sin descontar: caja acumulada creciente en [0, t_fin] -> bisección sobre t
+    def caja(t):
+        np_t = acumulada_por_pozo(caso['modelos'], caso['qi'], caso['di'], caso['b'], t)
+        return (1 - tasa_impuesto) * (caso['neto_bbl'] * np_t - caso['opex_diario'] * t)
+
+    payback = np.zeros(len(capex), dtype=int)
+    if (capex > 0).any():
+        recupera = caja(caso['t_fin']) >= capex
+        bajo, alto = np.zeros_like(capex), caso['t_fin'].copy()
+        for _ in range(40):
+            medio = (bajo + alto) / 2
+            alcanzado = caja(medio) >= capex
+            alto = np.where(alcanzado, medio, alto)
+            bajo = np.where(alcanzado, bajo, medio)
+        payback = np.where(capex <= 0, 0, np.where(recupera, np.ceil(alto), -1)).astype(int)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indice = np.where(capex > 0, vpn / capex, np.nan)
+    volumen = acumulada_por_pozo(caso['modelos'], caso['qi'], caso['di'], caso['b'], caso['t_fin'])
+    return {
+        "vpn": vpn.reshape(forma),
+        "dias_produccion": caso['t_fin'].reshape(forma),
+        "volumen_bbl": volumen.reshape(forma),
+        "payback_dia": payback.reshape(forma),
+        "indice_rentabilidad": indice.reshape(forma),
+    }
+
+
+def tir_pozos_analitico(modelos, qi, di, b, precio_brent, opex_mensual, capex, water_cut=0.0,
+                        costo_tratamiento_bbl=0.0, regalias=0.12, horizonte=730, tasa_impuesto=0.0, m_std=30):
+    """TIR anual de cada pozo / escenario con inversión 'capex' en t = 0 (NaN si no hay)."""
+    forma = np.broadcast_shapes(*(np.shape(x) for x in (modelos, qi, di, b, precio_brent, opex_mensual, capex,
+                                                        water_cut, costo_tratamiento_bbl)))
+    caso = _preparar_caso(forma, modelos, qi, di, b, precio_brent, opex_mensual, water_cut, costo_tratamiento_bbl,
+                          regalias, horizonte, m_std)
+    capex = np.broadcast_to(np.asarray(capex, dtype=float), forma).ravel()
+    tir = _biseccion_tir(lambda tasa: _vpn_operativo(caso, tasa_diaria(tasa), tasa_impuesto) - capex, capex.shape)
+    return tir.reshape(forma)
+
+
+# --- PORTAFOLIO ---
+
+def _columnas_pozos(df):
+    wc = np.zeros(len(df))
+    if 'water_cut' in df.columns:
+        wc = np.nan_to_num(normalizar_water_cut(df['water_cut'], unidad="fraccion"))
+    qi = pd.to_numeric(df['prod_real_bpd'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    return (df['modelo_declinacion'].to_numpy(), qi,
+            df['di'].to_numpy(dtype=float), df['b'].to_numpy(dtype=float), wc)
+
+
+def vpn_por_pozo(df, precio_brent, opex_mensual, costo_tratamiento_bbl=0.0, regalias=0.12,
+                 tasa_descuento=TASA_DESCUENTO, horizonte=730, capex=0.0, tasa_impuesto=0.0):
+    """VPN y días productivos de cada pozo para un escenario (DataFrame por pozo)."""
+    df = preparar_pozos(df)
+    modelos, qi, di, b, wc = _columnas_pozos(df)
+    res = evaluar_pozos_analitico(modelos, qi, di, b, precio_brent, opex_mensual, wc, costo_tratamiento_bbl,
+                                  regalias, tasa_descuento, horizonte, capex, tasa_impuesto)
+    return pd.DataFrame({
+        'pozo_id': df['pozo_id'].to_numpy(),
+        'vpn_usd': res['vpn'],
+        'dias_produccion': res['dias_produccion'],
+        'volumen_bbl': res['volumen_bbl'],
+        'payback_dia': res['payback_dia'],
+    })
+
+
+def vpn_portafolio(df, precios_brent, tasas_descuento, opex_mensual, costo_tratamiento_bbl=0.0,
+                   regalias=0.12, horizonte=730, capex=0.0, tasa_impuesto=0.0):
+    """
+    VPN del portafolio para la grilla Brent x tasa de descuento, en una sola
+    evaluación vectorizada (escenarios x pozos). Devuelve un DataFrame largo.
+    """
+    df = preparar_pozos(df)
+    modelos, qi, di, b, wc = _columnas_pozos(df)
+    precios = np.asarray(precios_brent, dtype=float)[:, None, None]
+    tasas = np.asarray(tasas_descuento, dtype=float)[None, :, None]
+    res = evaluar_pozos_analitico(modelos, qi, di, b, precios, opex_mensual, wc, costo_tratamiento_bbl,
+                                  regalias, tasas, horizonte, capex, tasa_impuesto)
+    grilla_precio, grilla_tasa = np.meshgrid(precios.ravel(), tasas.ravel(), indexing='ij')
+    return pd.DataFrame({
+        'brent': grilla_precio.ravel(),
+        'tasa_descuento': grilla_tasa.ravel(),
+        'vpn_usd': res['vpn'].sum(axis=-1).ravel(),
+        'pozos_rentables': (res['vpn'] > 0).sum(axis=-1).ravel(),
+    })
@@ -2,32 +2,64 @@ import pandas as pd
 import numpy as np
 import os
 
+# Se importa como 'src.*' desde las páginas y como módulo suelto desde los notebooks
+try:
+    from src.ingesta import leer_nuevas_filas
+    from src.modelos_declinacion import obtener_modelo, completar_columnas_modelo
+    from src.validacion import validar_datos, normalizar_water_cut, REGLAS_PRODUCCION
+except ImportError:
+    from ingesta import leer_nuevas_filas
+    from modelos_declinacion import obtener_modelo, completar_columnas_modelo
+    from validacion import validar_datos, normalizar_water_cut, REGLAS_PRODUCCION
+
 #-----------------------------------------------------------------------------------------------------------------#
 # Funcion para PROCESAR DATOS DE PRODUCCIÓN
 #-----------------------------------------------------------------------------------------------------------------#
 
 
-def procesar_datos_produccion(nombre_archivo):
+# Modo incremental: por archivo, (marca de agua, DataFrame ya procesado)
+_procesados = {}
+
+
+def calcular_eficiencia(df):
+    """Tipado (pipeline de validación), eficiencia (%) y barriles perdidos por fila."""
+    # Limpieza de datos (tipado numérico con el pipeline de validación)
+    df, contadores = validar_datos(df, REGLAS_PRODUCCION)
+
+    # Cálculos core
+    df['eficiencia'] = (df['prod_real_bpd'] / df['prod_teorica_bpd'].replace(0, np.nan)) * 100
+    df['barriles_perdidos'] = df['prod_teorica_bpd'] - df['prod_real_bpd']
+    return df
+
+
+def procesar_datos_produccion(nombre_archivo, incremental=False):
     """
     Busca el archivo en la carpeta 'datos' usando rutas absolutas
     para que funcione tanto en Notebooks como en Terminal.
+    Con incremental=True recuerda lo ya procesado en este proceso y, si el
+    archivo sólo creció, limpia y calcula únicamente las filas nuevas.
     """
     # 1. Calculamos la ruta absoluta de forma dinámica
     base_path = os.path.dirname(os.path.abspath(__file__)) 
     ruta_completa = os.path.join(base_path, "..", "datos", nombre_archivo)
     
     try:
-        df = pd.read_csv(ruta_completa)
-        
-        # Limpieza de datos
-        df['prod_real_bpd'] = pd.to_numeric(df['prod_real_bpd'], errors='coerce')
-        df['prod_teorica_bpd'] = pd.to_numeric(df['prod_teorica_bpd'], errors='coerce')
-
-        # Cálculos core
-        df['eficiencia'] = (df['prod_real_bpd'] / df['prod_teorica_bpd'].replace(0, np.nan)) * 100
-        df['barriles_perdidos'] = df['prod_teorica_bpd'] - df['prod_real_bpd']
-        
-        return df
+        if not incremental:
+            return calcular_eficiencia(pd.read_csv(ruta_completa))
+
+        ruta_completa = os.path.abspath(ruta_completa)
+        marca, df_previo = _procesados.get(ruta_completa, (None, None))
+        df_nuevo, marca, completo = leer_nuevas_filas(ruta_completa, marca)
+        df_nuevo = calcular_eficiencia(df_nuevo)
+        if completo:
+            df = df_nuevo
+        elif len(df_nuevo):
+            df = pd.concat([df_previo, df_nuevo], ignore_index=True)
+        else:
+            df = df_previo
+        _procesados[ruta_completa] = (marca, df)
+        # Copia superficial: quien llama puede agregar columnas sin tocar lo guardado
+        return df.copy(deep=False)
 
     except FileNotFoundError:
         print(f"❌ Error: No se encuentra el archivo en: {ruta_completa}")
@@ -100,17 +132,19 @@ def calcular_distancia_monitoreo(df):
 # Funcion para CALCULAR LA PRODUCCION NETA DE PETROLEO
 #-----------------------------------------------------------------------------------------------------------------#
 
-def calcular_produccion_neta(df):
+def calcular_produccion_neta(df, origen_wc=None):
     """
     Calcula el petróleo neto. Si la columna 'water_cut' no existe, 
     asume 0% para no frenar el proceso, pero informa al usuario.
+    origen_wc: unidad de entrada ya decidida ('fraccion' o 'porcentaje'), para
+    procesar partes del dataset con la misma regla que el archivo completo.
     """
     if 'water_cut' not in df.columns:
         print("⚠️ Advertencia: No se encontró columna 'water_cut'. Calculando con 0%.")
         df['water_cut'] = 0
     
-    # Aseguramos que los valores sean numéricos
-    df['water_cut'] = pd.to_numeric(df['water_cut'], errors='coerce').fillna(0)
+    # Aseguramos que los valores sean numéricos y estén en % (misma regla de unidad que el pipeline)
+    df['water_cut'] = np.nan_to_num(normalizar_water_cut(df['water_cut'], unidad="porcentaje", origen=origen_wc))
     
     # Aplicamos la fórmula industrial
     df['prod_neta_petroleo'] = df['prod_real_bpd'] * (1 - (df['water_cut'] / 100))
@@ -164,16 +198,46 @@ def calcular_metricas_emulsion(df):
 # Funcion para CALCULAR las Curvas de Declinación de Arps
 #-----------------------------------------------------------------------------------------------------------------#
 
-def predecir_declinacion_arps(q_inicial, tasa_d, tiempo_dias):
+def predecir_declinacion_arps(q_inicial, tasa_d, tiempo_dias, modelo="exponencial", b=0.0):
     """
-    Calcula la producción futura usando Declinación Exponencial (Arps).
+    Calcula la producción futura usando Declinación de Arps.
     q_inicial: Producción actual (bbl/d)
     tasa_d: Tasa de declinación diaria (ej: 0.003)
     tiempo_dias: Días a proyectar hacia adelante
+    modelo: 'exponencial', 'armonica', 'hiperbolica' o 'hiperbolica_modificada' (ver modelos_declinacion)
+    b: exponente hiperbólico (sólo modelos hiperbólicos)
+    """
+    # Exponencial: q(t) = qi * e^(-D*t) | Hiperbólica: q(t) = qi * (1 + b*D*t)^(-1/b)
+    produccion_proyectada = obtener_modelo(modelo).tasa(q_inicial, tasa_d, b, tiempo_dias)
+    return np.round(produccion_proyectada, 2)
+
+
+#-----------------------------------------------------------------------------------------------------------------#
+# Funcion para ESTIMAR LA TASA DE DECLINACIÓN (di) DESDE EL GAP TEÓRICA/REAL
+#-----------------------------------------------------------------------------------------------------------------#
+
+def estimar_tasa_declinacion(df, di_minimo=0.001, di_maximo=0.05):
+    """
+    Estima la declinación diaria (di) como la caída relativa entre la producción
+    teórica y la real. Si da negativo o cero se usa un mínimo técnico y se capa
+    al máximo diario para evitar distorsiones.
+    """
+    di = (df['prod_teorica_bpd'] - df['prod_real_bpd']) / df['prod_teorica_bpd']
+    di = np.where(di > 0, di, di_minimo)
+    df['di'] = np.clip(di, None, di_maximo)
+    return df
+
+
+def preparar_pozos(df):
     """
-    # Fórmula: q(t) = qi * e^(-D*t)
-    produccion_proyectada = q_inicial * np.exp(-tasa_d * tiempo_dias)
-    return round(produccion_proyectada, 2)
+    Columnas mínimas de declinación por pozo: 'di' estimado (si el archivo no lo
+    trae), 'modelo_declinacion' y 'b'. Trabaja sobre una copia (perezosa con
+    Copy-on-Write), así el DataFrame recibido no se modifica.
+    """
+    df = df.copy()
+    if 'di' not in df.columns:
+        df = estimar_tasa_declinacion(df)
+    return completar_columnas_modelo(df)
 
 
 #-----------------------------------------------------------------------------------------------------------------#
@@ -184,16 +248,11 @@ def calcular_limite_economico(produccion_proyectada, costo_op_diario, precio_bar
     """
     Determina en qué punto la ganancia por petróleo ya no cubre los costos.
     """
-    dias = len(produccion_proyectada)
-    dia_limite = None
-    
-    for t in range(dias):
-        ingreso = produccion_proyectada[t] * precio_barril
-        if ingreso <= costo_op_diario:
-            dia_limite = t
-            break
-            
-    return dia_limite
+    # Primer día donde el ingreso no cubre el costo (vectorizado, sin recorrer día por día)
+    ingreso = np.asarray(produccion_proyectada) * precio_barril
+    dias_sin_margen = np.flatnonzero(ingreso <= costo_op_diario)
+
+    return int(dias_sin_margen[0]) if len(dias_sin_margen) > 0 else None
 
 
 
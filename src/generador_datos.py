@@ -3,9 +3,10 @@ import numpy as np
 from datetime import datetime, timedelta
 import os
 
-def fabricar_dataset_historico(n_dias=90, ruta_salida='../datos/produccion_historica.csv'):
+def fabricar_dataset_historico(n_dias=90, ruta_salida='../datos/produccion_historica.csv', ruta_bd=None):
     """
     Simula datos reales de Vaca Muerta para entrenamiento de modelos.
+    Si se indica 'ruta_bd', además los carga en la base de historial (src/historial.py).
     """
     # Aseguramos que la carpeta datos exista
     os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
@@ -36,4 +37,40 @@ def fabricar_dataset_historico(n_dias=90, ruta_salida='../datos/produccion_histo
             
     df = pd.DataFrame(datos)
     df.to_csv(ruta_salida, index=False)
-    return ruta_salida
\ No newline at end of file
+    if ruta_bd is not None:
+        try:
+            from src.historial import cargar_dataframe
+        except ImportError:
+            from historial import cargar_dataframe
+        cargar_dataframe(df, ruta_bd)
+    return ruta_salida
+
+def fabricar_serie_brent(fecha_inicio='2018-01-02', fecha_fin=None, ruta_salida='../datos/precios_brent.csv', semilla=42):
+    """
+    Simula una serie diaria de Brent (USD/bbl) y tipo de cambio (ARS/USD) en días hábiles.
+    Brent: paseo aleatorio log-normal con reversión a la media; tipo de cambio: deriva
+    devaluatoria con ruido. Sirve como reemplazo local de una serie de mercado.
+    """
+    os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+    rng = np.random.default_rng(semilla)
+
+    fechas = pd.bdate_range(fecha_inicio, fecha_fin or datetime.now().date())
+    n = len(fechas)
+
+    # Brent: log-precio con reversión a ln(70) y volatilidad diaria ~1.8%
+    log_brent = np.empty(n)
+    log_brent[0] = np.log(65)
+    choques = rng.normal(0, 0.018, n)
+    for i in range(1, n):
+        log_brent[i] = log_brent[i - 1] + 0.01 * (np.log(70) - log_brent[i - 1]) + choques[i]
+
+    # Tipo de cambio: devaluación diaria promedio ~0.15% con ruido
+    tipo_cambio = 38 * np.exp(np.cumsum(rng.normal(0.0015, 0.004, n)))
+
+    df = pd.DataFrame({
+        'fecha': fechas.strftime('%Y-%m-%d'),
+        'brent_usd': np.round(np.exp(log_brent), 2),
+        'tipo_cambio': np.round(tipo_cambio, 2),
+    })
+    df.to_csv(ruta_salida, index=False)
+    return ruta_salida
@@ -1,26 +1,44 @@
 import io
-from fpdf import FPDF
 from datetime import datetime
-import matplotlib.pyplot as plt
+from functools import lru_cache
 
-class ReportePetrolero(FPDF):
-    def header(self):
-        # Titulo corporativo sin caracteres especiales
-        self.set_font('helvetica', 'B', 9)
-        self.set_text_color(100, 100, 100)
-        self.cell(0, 5, 'Cuenca Operativa | 2026', 0, 1, 'R')
-        self.line(10, 15, 200, 15)
-        self.ln(5)
+# fpdf y matplotlib se importan recién al generar un reporte (no al cargar la página):
+# son casi un segundo de arranque en frío que sólo paga quien exporta.
 
-       
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Pagina {self.page_no()} | Firma: Rojas Silvio Jonathan - Data Analyst', 0, 0, 'C')
+@lru_cache(maxsize=None)
+def clase_reporte():
+    """Devuelve la clase ReportePetrolero (FPDF), creada en el primer uso."""
+    from fpdf import FPDF
+
+    class ReportePetrolero(FPDF):
+        def header(self):
+            # Titulo corporativo sin caracteres especiales
+            self.set_font('helvetica', 'B', 9)
+            self.set_text_color(100, 100, 100)
+            self.cell(0, 5, 'Cuenca Operativa | 2026', 0, 1, 'R')
+            self.line(10, 15, 200, 15)
+            self.ln(5)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('Arial', 'I', 8)
+            self.cell(0, 10, f'Pagina {self.page_no()} | Firma: Rojas Silvio Jonathan - Data Analyst', 0, 0, 'C')
+
+    return ReportePetrolero
+
+@lru_cache(maxsize=None)
+def clase_figura():
+    """Figure de matplotlib con el estilo ggplot aplicado una sola vez (rcParams es global al proceso)."""
+    import matplotlib.style
+    from matplotlib.figure import Figure
+
+    matplotlib.style.use('ggplot')
+    return Figure
 
 def generar_grafico_memoria(datos):
-    plt.style.use('ggplot')
-    fig, ax = plt.subplots(figsize=(6, 2.5))
+    # Figure directa (sin el estado global de pyplot): se puede generar desde los threads de exportación
+    fig = clase_figura()(figsize=(6, 2.5))
+    ax = fig.add_subplot()
     
     categorias = ['Prod. Actual', 'Punto Quiebre']
     valores = [datos['qi'], datos['q_limite']]
@@ -29,8 +47,7 @@ def generar_grafico_memoria(datos):
     ax.set_title("Comparativa de Producción (bbl/d)", fontsize=10, fontweight='bold')
     
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', dpi=120)
-    plt.close(fig)
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=120)
     buf.seek(0)
     return buf
 
@@ -45,7 +62,7 @@ def crear_informe_ejecutivo(datos):
             datos[clave] = datos[clave].replace('ñ', 'n').replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u').replace('Á', 'A').replace('É', 'E').replace('Í', 'I').replace('Ó', 'O').replace('Ú', 'U').replace('Ñ', 'N')
 
     # 2. Inicializar PDF
-    pdf = ReportePetrolero()
+    pdf = clase_reporte()()
     pdf.add_page()
 
      # Título
@@ -14,7 +14,11 @@ class ReportePetrolero(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Pagina {self.page_no()}', 0, 0, 'C')
 
-def generar_pdf_final(df_analisis):
+def generar_pdf_final(df_analisis, destino='Reporte_Produccion_Anelo.pdf', top_n=5):
+    """
+    Reporte de pozos críticos. 'destino' puede ser una ruta o un stream binario;
+    'top_n' es la cantidad de pozos de la tabla (ordenados por pérdida diaria).
+    """
     pdf = ReportePetrolero()
     pdf.add_page()
     pdf.set_font('Arial', '', 10)
@@ -30,11 +34,12 @@ def generar_pdf_final(df_analisis):
     pdf.set_font('Arial', '', 10)
     pdf.set_text_color(0, 0, 0)
     
-    # Buscamos al pozo AN-005 que encontramos ayer
-    if 'AN-005' in df_analisis['pozo_id'].values:
-        pozo_falla = df_analisis[df_analisis['pozo_id'] == 'AN-005'].iloc[0]
+    # El pozo con mayor pérdida diaria es el que se destaca en la alerta
+    top = df_analisis.nlargest(top_n, 'perdida_usd_dia')
+    if not top.empty:
+        pozo_falla = top.iloc[0]
         pdf.multi_cell(0, 10, f"Se ha detectado una ineficiencia critica en el pozo {pozo_falla['pozo_id']}. "
-                              f"Con un Water Cut de apenas {pozo_falla['water_cut']:.2f}%, "
+                              f"Con un Water Cut de {pozo_falla['water_cut']:.2f}%, "
                               f"presenta una perdida estimada de USD {pozo_falla['perdida_usd_dia']:,.2f} por dia.")
     
     pdf.ln(10)
@@ -45,15 +50,16 @@ def generar_pdf_final(df_analisis):
     pdf.ln()
     
     pdf.set_font('Arial', '', 10)
-    top_5 = df_analisis.sort_values('perdida_usd_dia', ascending=False).head(5)
-    for index, row in top_5.iterrows():
-        pdf.cell(40, 10, str(row['pozo_id']), 1)
-        pdf.cell(40, 10, f"{row['water_cut']:.2f}", 1)
-        pdf.cell(60, 10, f"{row['perdida_usd_dia']:,.2f}", 1)
+    for pozo_id, wc, perdida in zip(top['pozo_id'].to_numpy(), top['water_cut'].to_numpy(),
+                                    top['perdida_usd_dia'].to_numpy()):
+        pdf.cell(40, 10, str(pozo_id), 1)
+        pdf.cell(40, 10, f"{wc:.2f}", 1)
+        pdf.cell(60, 10, f"{perdida:,.2f}", 1)
         pdf.ln()
 
-    pdf.output('Reporte_Produccion_Anelo.pdf')
-    print("✅ ¡EXITO! Archivo 'Reporte_Produccion_Anelo.pdf' generado en tu carpeta.")
+    pdf.output(destino)
+    print(f"✅ ¡EXITO! Reporte generado en: {destino}")
+    return destino
 
 # 2. EJECUCIÓN (Usando el combustible que recargamos antes)
 # generar_pdf_final(df_masivo)
@@ -0,0 +1,251 @@
+# src/historial.py
+"""
+Base de datos local (SQLite) con el historial diario de producción por pozo.
+
+La tabla 'produccion' usa clave primaria compuesta (pozo_id, fecha) y está
+declarada WITHOUT ROWID: las filas quedan ordenadas físicamente por pozo y
+fecha, así "AN-003, últimos 90 días" es una búsqueda por índice que lee sólo
+esas filas, en lugar de cargar y filtrar el CSV completo.
+
+La tabla 'resumen' guarda por pozo registros, primera/última fecha y
+acumulada; se actualiza en cada carga sólo con las filas que entran (un
+reemplazo de un día ya cargado resta el valor anterior), así el resumen del
+campo no recorre todo el historial.
+
+Carga masiva desde los CSV existentes (o desde un DataFrame de los
+generadores) y consultas que devuelven pandas / NumPy.
+
+Uso (desde la raíz del proyecto):
+    python -m src.historial --cargar datos/produccion_historica.csv
+    python -m src.historial --pozo AN-003 --ultimos 90
+"""
+import argparse
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+RUTA_BD = Path(__file__).resolve().parent.parent / "datos" / "historial.sqlite"
+COLUMNAS = ("pozo_id", "fecha", "q_petroleo", "water_cut", "presion_psi", "temp_c")
+TAMANO_BLOQUE = 200_000
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS produccion (
+    pozo_id     TEXT NOT NULL,
+    fecha       TEXT NOT NULL,          -- ISO 'YYYY-MM-DD' (el orden de texto es el cronológico)
+    q_petroleo  REAL,
+    water_cut   REAL,
+    presion_psi REAL,
+    temp_c      REAL,
+    PRIMARY KEY (pozo_id, fecha)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS resumen (
+    pozo_id     TEXT PRIMARY KEY,
+    registros   INTEGER NOT NULL,
+    desde       TEXT,
+    hasta       TEXT,
+    np_bbl      REAL NOT NULL
+) WITHOUT ROWID;
+"""
+VERSION_ESQUEMA = 1
+
+_inicializadas = set()
+_lock = threading.Lock()
+
+# Área de carga por conexión: las filas entrantes pasan por acá para acumular el resumen
+_ENTRANTES = """
+CREATE TEMP TABLE IF NOT EXISTS entrantes (
+    pozo_id TEXT NOT NULL, fecha TEXT NOT NULL,
+    q_petroleo REAL, water_cut REAL, presion_psi REAL, temp_c REAL,
+    PRIMARY KEY (pozo_id, fecha)
+) WITHOUT ROWID;
+"""
+
+# Delta por pozo de las filas entrantes contra lo ya guardado (LEFT JOIN por clave)
+_ACUMULAR_RESUMEN = """
+INSERT INTO resumen (pozo_id, registros, desde, hasta, np_bbl)
+SELECT e.pozo_id, SUM(p.pozo_id IS NULL), MIN(e.fecha), MAX(e.fecha),
+       TOTAL(e.q_petroleo) - TOTAL(p.q_petroleo)
+FROM entrantes e LEFT JOIN produccion p ON p.pozo_id = e.pozo_id AND p.fecha = e.fecha
+WHERE true
+GROUP BY e.pozo_id
+ON CONFLICT(pozo_id) DO UPDATE SET
+    registros = registros + excluded.registros,
+    desde = MIN(desde, excluded.desde),
+    hasta = MAX(hasta, excluded.hasta),
+    np_bbl = np_bbl + excluded.np_bbl
+"""
+
+_RECONSTRUIR_RESUMEN = """
+DELETE FROM resumen;
+INSERT INTO resumen (pozo_id, registros, desde, hasta, np_bbl)
+SELECT pozo_id, COUNT(*), MIN(fecha), MAX(fecha), TOTAL(q_petroleo) FROM produccion GROUP BY pozo_id;
+"""
+
+
+def inicializar(ruta=RUTA_BD):
+    """
+    Crea la base, el esquema y el resumen (bases viejas) una vez por ruta y por
+    proceso; las conexiones siguientes sólo conectan. Si el archivo se borró,
+    se vuelve a crear.
+    """
+    ruta = Path(ruta).resolve()
+    with _lock:
+        if ruta in _inicializadas and ruta.exists():
+            return ruta
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(ruta)) as conexion:
+            # WAL queda guardado en el archivo: lecturas concurrentes mientras se carga
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.executescript(_ESQUEMA)
+            if conexion.execute("PRAGMA user_version").fetchone()[0] < VERSION_ESQUEMA:
+                # Bases creadas antes de la tabla 'resumen': se arma una vez desde el historial
+                with conexion:
+                    conexion.executescript(_RECONSTRUIR_RESUMEN)
+                    conexion.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        _inicializadas.add(ruta)
+        return ruta
+
+
+def conectar(ruta=RUTA_BD):
+    """Abre (y si hace falta crea) la base. Cada thread debe usar su propia conexión."""
+    conexion = sqlite3.connect(inicializar(ruta))
+    # NORMAL es seguro con WAL y mucho más rápido (es por conexión, no se guarda en el archivo)
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    return conexion
+
+
+# --- CARGA MASIVA ---
+
+def _normalizar(df):
+    # Columnas del esquema (las que falten quedan NULL), fecha ISO y pozo_id limpio
+    df = df.reindex(columns=COLUMNAS)
+    df['pozo_id'] = df['pozo_id'].astype(str).str.strip()
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce').dt.strftime('%Y-%m-%d')
+    df = df.dropna(subset=['pozo_id', 'fecha'])
+    for columna in COLUMNAS[2:]:
+        df[columna] = pd.to_numeric(df[columna], errors='coerce')
+    # Insertar en el orden de la clave hace que el árbol B crezca sólo por el final
+    return df.sort_values(['pozo_id', 'fecha'])
+
+
+def insertar(conexion, df):
+    """
+    Inserta (o reemplaza, por pozo y fecha) los registros de un DataFrame
+    dentro de la transacción de 'conexion' y acumula el resumen. Devuelve filas.
+    """
+    df = _normalizar(df)
+    # Columnas -> listas de tipos nativos y zip: mucho más rápido que itertuples para executemany
+    filas = zip(*(df[columna].tolist() for columna in COLUMNAS))
+    if df[list(COLUMNAS[2:])].isna().any().any():
+        # NaN -> NULL sólo si el bloque los tiene (el caso general no paga la conversión por valor)
+        filas = (tuple(None if v != v else v for v in fila) for fila in filas)
+    conexion.execute(_ENTRANTES)
+    conexion.executemany(
+        f"INSERT OR REPLACE INTO entrantes ({', '.join(COLUMNAS)}) VALUES ({', '.join('?' * len(COLUMNAS))})",
+        filas)
+    conexion.execute(_ACUMULAR_RESUMEN)
+    conexion.execute(f"INSERT OR REPLACE INTO produccion ({', '.join(COLUMNAS)}) "
+                     f"SELECT {', '.join(COLUMNAS)} FROM entrantes")
+    conexion.execute("DELETE FROM entrantes")
+    return len(df)
+
+
+def cargar_dataframe(df, ruta=RUTA_BD):
+    """Inserta (o reemplaza, por pozo y fecha) los registros de un DataFrame. Devuelve filas cargadas."""
+    with closing(conectar(ruta)) as conexion, conexion:
+        return insertar(conexion, df)
+
+
+def cargar_csv(ruta_csv, ruta=RUTA_BD, tamano_bloque=TAMANO_BLOQUE):
+    """Carga un CSV de historial por bloques (no se lee entero en memoria). Devuelve filas cargadas."""
+    total = 0
+    for bloque in pd.read_csv(ruta_csv, chunksize=tamano_bloque):
+        total += cargar_dataframe(bloque, ruta)
+    return total
+
+
+# --- CONSULTAS ---
+
+def _fecha_iso(fecha):
+    return None if fecha is None else pd.Timestamp(fecha).strftime('%Y-%m-%d')
+
+
+def historial_pozo(pozo_id, desde=None, hasta=None, columnas=COLUMNAS[1:], ruta=RUTA_BD):
+    """Registros de un pozo entre 'desde' y 'hasta' (inclusive, opcionales), ordenados por fecha."""
+    return historial_pozos([pozo_id], desde, hasta, columnas, ruta)
+
+
+def historial_pozos(pozo_ids, desde=None, hasta=None, columnas=COLUMNAS[1:], ruta=RUTA_BD):
+    """Igual que historial_pozo para varios pozos (una búsqueda por índice por pozo)."""
+    columnas = [c for c in columnas if c in COLUMNAS]
+    if 'pozo_id' not in columnas and len(pozo_ids) > 1:
+        columnas = ['pozo_id'] + columnas
+    marcas = ", ".join("?" * len(pozo_ids))
+    consulta = (f"SELECT {', '.join(columnas)} FROM produccion "
+                f"WHERE pozo_id IN ({marcas}) AND fecha >= ? AND fecha <= ? ORDER BY pozo_id, fecha")
+    parametros = [str(p).strip() for p in pozo_ids] + [_fecha_iso(desde) or "0000-00-00",
+                                                       _fecha_iso(hasta) or "9999-99-99"]
+    with closing(conectar(ruta)) as conexion:
+        df = pd.read_sql_query(consulta, conexion, params=parametros)
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'])
+    for columna in COLUMNAS[2:]:
+        if columna in df.columns:
+            df[columna] = pd.to_numeric(df[columna], errors='coerce')
+    return df
+
+
+def ultimos_dias(pozo_id, dias=90, columnas=COLUMNAS[1:], ruta=RUTA_BD):
+    """Los últimos 'dias' días de historial del pozo (contados desde su último registro)."""
+    with closing(conectar(ruta)) as conexion:
+        ultima = conexion.execute("SELECT MAX(fecha) FROM produccion WHERE pozo_id = ?",
+                                  (str(pozo_id).strip(),)).fetchone()[0]
+    if ultima is None:
+        return pd.DataFrame(columns=list(columnas))
+    desde = pd.Timestamp(ultima) - pd.Timedelta(days=dias - 1)
+    return historial_pozo(pozo_id, desde, ultima, columnas, ruta)
+
+
+def serie_pozo(pozo_id, columna="q_petroleo", desde=None, hasta=None, ruta=RUTA_BD):
+    """(fechas datetime64[D], valores float) de una columna del pozo, listos para NumPy."""
+    df = historial_pozo(pozo_id, desde, hasta, ["fecha", columna], ruta)
+    return df['fecha'].to_numpy().astype('datetime64[D]'), df[columna].to_numpy(dtype=float)
+
+
+def resumen_pozos(ruta=RUTA_BD):
+    """Por pozo: cantidad de registros, primera y última fecha y petróleo acumulado (tabla 'resumen')."""
+    consulta = "SELECT pozo_id, registros, desde, hasta, np_bbl FROM resumen ORDER BY pozo_id"
+    with closing(conectar(ruta)) as conexion:
+        return pd.read_sql_query(consulta, conexion)
+
+
+def existe_historial(ruta=RUTA_BD):
+    """True si la base existe y tiene registros."""
+    if not Path(ruta).exists():
+        return False
+    with closing(conectar(ruta)) as conexion:
+        return conexion.execute("SELECT 1 FROM produccion LIMIT 1").fetchone() is not None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historial de producción en SQLite")
+    parser.add_argument("--cargar", nargs="*", default=[], help="CSV de historial a cargar")
+    parser.add_argument("--bd", default=str(RUTA_BD))
+    parser.add_argument("--pozo", help="consulta rápida de un pozo")
+    parser.add_argument("--ultimos", type=int, default=90)
+    args = parser.parse_args()
+
+    for ruta_csv in args.cargar:
+        inicio = time.perf_counter()
+        filas = cargar_csv(ruta_csv, args.bd)
+        print(f"✅ {ruta_csv}: {filas} registros en {time.perf_counter() - inicio:.1f} s")
+    if args.pozo:
+        inicio = time.perf_counter()
+        df = ultimos_dias(args.pozo, args.ultimos, ruta=args.bd)
+        print(df.to_string(index=False))
+        print(f"{len(df)} registros en {(time.perf_counter() - inicio) * 1000:.1f} ms")
@@ -0,0 +1,207 @@
+# src/ingesta.py
+"""
+Ingesta incremental (sólo por el final) de los CSV de 'datos/'.
+
+Los archivos de campo crecen agregando filas al final. Por cada archivo se
+guarda una marca de agua: byte hasta el que ya se leyó, encabezado, inodo y
+una huella del último bloque leído. En la siguiente lectura se parsean sólo
+los bytes nuevos (hasta el último salto de línea completo: una fila que se
+está escribiendo queda para la próxima), así el costo diario depende de lo
+agregado y no del historial completo.
+
+Si el archivo se achicó, se reemplazó, cambió el encabezado o la huella no
+coincide, se asume que fue reescrito y se vuelve a leer completo.
+
+Uso (desde la raíz del proyecto), historial diario -> SQLite:
+    python -m src.ingesta                   # una corrida (cron)
+    python -m src.ingesta --cada 15         # loop local, revisa cada 15 minutos
+"""
+import argparse
+import hashlib
+import io
+import json
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+DIR_DATOS = Path(__file__).resolve().parent.parent / "datos"
+RUTA_HISTORICO = DIR_DATOS / "produccion_historica.csv"
+BYTES_HUELLA = 4096
+
+_ESQUEMA_MARCAS = """
+CREATE TABLE IF NOT EXISTS ingesta (
+    archivo      TEXT PRIMARY KEY,
+    marca        TEXT NOT NULL,      -- JSON con offset, filas, encabezado, inodo y huella
+    actualizado  TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _huella(datos):
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+
+def _fila_encabezado(archivo):
+    archivo.seek(0)
+    return archivo.readline()
+
+
+def _es_continuacion(archivo, marca, info):
+    """True si el archivo sólo creció desde la marca (mismo inodo, encabezado y último bloque)."""
+    offset = marca["offset"]
+    if info.st_ino != marca["inodo"] or info.st_size < offset:
+        return False
+    if _fila_encabezado(archivo).decode("utf-8") != marca["encabezado"]:
+        return False
+    inicio = max(0, offset - BYTES_HUELLA)
+    archivo.seek(inicio)
+    if _huella(archivo.read(offset - inicio)) != marca["huella"]:
+        return False
+    # Si lo leído no terminaba en salto de línea, lo nuevo tiene que empezar con uno
+    # (si no, se estaría completando la última fila ya leída)
+    return marca["cierre"] or info.st_size == offset or archivo.read(1) in (b"\n", b"\r")
+
+
+class _LectorAcotado(io.RawIOBase):
+    """Sólo los primeros 'limite' bytes del archivo (lo que había al hacer stat)."""
+
+    def __init__(self, archivo, limite):
+        super().__init__()
+        self._archivo = archivo
+        self._restante = limite
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        n = self._archivo.readinto(memoryview(destino)[:self._restante])
+        self._restante -= n
+        return n
+
+    def close(self):
+        self._archivo.close()
+        super().close()
+
+
+def _leer_csv(ruta, limite, tamano_bloque):
+    # Se parsea desde el disco hasta 'limite' (por bloques si se pide): el archivo
+    # nunca está entero en memoria. Sin encabezado (archivo vacío): DataFrame vacío.
+    if limite == 0:
+        return pd.DataFrame() if tamano_bloque is None else iter([pd.DataFrame()])
+    if tamano_bloque is None:
+        with io.BufferedReader(_LectorAcotado(open(ruta, "rb"), limite)) as lector:
+            return pd.read_csv(lector)
+    return _bloques_acotados(ruta, limite, tamano_bloque)
+
+
+def _bloques_acotados(ruta, limite, tamano_bloque):
+    with io.BufferedReader(_LectorAcotado(open(ruta, "rb"), limite)) as lector:
+        yield from pd.read_csv(lector, chunksize=tamano_bloque)
+
+
+def leer_nuevas_filas(ruta, marca=None, tamano_bloque=None):
+    """
+    Filas agregadas a un CSV desde 'marca' (None: el archivo completo).
+    Devuelve (filas, marca_nueva, completo): 'filas' es un DataFrame (o un
+    iterador de bloques si se pasa 'tamano_bloque'); 'completo' es True si se
+    leyó el archivo entero (primera vez o archivo reescrito).
+    """
+    ruta = Path(ruta)
+    with open(ruta, "rb") as archivo:
+        info = ruta.stat()
+        completo = marca is None or not _es_continuacion(archivo, marca, info)
+        encabezado = _fila_encabezado(archivo)
+        if completo:
+            # Hasta el tamaño del stat: lo que se agregue mientras tanto queda para la próxima
+            offset = info.st_size
+        else:
+            archivo.seek(marca["offset"])
+            datos = archivo.read(info.st_size - marca["offset"])
+            # Sólo hasta la última línea completa
+            offset = marca["offset"] + datos.rfind(b"\n") + 1
+            cuerpo = encabezado + datos[:offset - marca["offset"]]
+        inicio = max(0, offset - BYTES_HUELLA)
+        archivo.seek(inicio)
+        ultimo_bloque = archivo.read(offset - inicio)
+
+    if completo:
+        filas = _leer_csv(ruta, offset, tamano_bloque)
+        cierre = ultimo_bloque.endswith(b"\n")
+    else:
+        filas = pd.read_csv(io.BytesIO(cuerpo), chunksize=tamano_bloque)
+        cierre = cuerpo.endswith(b"\n")
+    marca_nueva = {
+        "offset": offset,
+        "encabezado": encabezado.decode("utf-8"),
+        "inodo": info.st_ino,
+        "huella": _huella(ultimo_bloque),
+        "cierre": cierre,
+        "filas": 0 if completo else marca.get("filas", 0),
+    }
+    if tamano_bloque is None:
+        marca_nueva["filas"] += len(filas)
+        return filas, marca_nueva, completo
+    return _contar_bloques(filas, marca_nueva), marca_nueva, completo
+
+
+def _contar_bloques(bloques, marca):
+    # Los bloques se consumen de a uno; la marca lleva la cuenta de filas leídas
+    for bloque in bloques:
+        marca["filas"] += len(bloque)
+        yield bloque
+
+
+# --- HISTORIAL DIARIO -> SQLITE ---
+
+def leer_marca(conexion, archivo):
+    conexion.execute(_ESQUEMA_MARCAS)
+    fila = conexion.execute("SELECT marca FROM ingesta WHERE archivo = ?", (str(archivo),)).fetchone()
+    return None if fila is None else json.loads(fila[0])
+
+
+def guardar_marca(conexion, archivo, marca):
+    conexion.execute(_ESQUEMA_MARCAS)
+    conexion.execute("INSERT OR REPLACE INTO ingesta (archivo, marca, actualizado) VALUES (?, ?, ?)",
+                     (str(archivo), json.dumps(marca), pd.Timestamp.now().isoformat(timespec="seconds")))
+
+
+def ingerir_historial(ruta_csv=RUTA_HISTORICO, ruta_bd=None):
+    """
+    Carga en la base de historial sólo las filas nuevas del CSV diario. Las
+    filas y la marca de agua se guardan en la misma transacción: si algo
+    falla, la próxima corrida retoma desde la marca anterior.
+    Devuelve {'filas', 'completo', 'segundos'}.
+    """
+    try:
+        from src.historial import RUTA_BD, TAMANO_BLOQUE, conectar, insertar
+    except ImportError:
+        from historial import RUTA_BD, TAMANO_BLOQUE, conectar, insertar
+
+    inicio = time.perf_counter()
+    ruta_csv = Path(ruta_csv).resolve()
+    with closing(conectar(ruta_bd or RUTA_BD)) as conexion:
+        marca = leer_marca(conexion, ruta_csv)
+        bloques, marca_nueva, completo = leer_nuevas_filas(ruta_csv, marca, TAMANO_BLOQUE)
+        with conexion:
+            filas = sum(insertar(conexion, bloque) for bloque in bloques)
+            guardar_marca(conexion, ruta_csv, marca_nueva)
+    return {"filas": filas, "completo": completo, "segundos": time.perf_counter() - inicio}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta incremental del historial diario")
+    parser.add_argument("--archivo", default=str(RUTA_HISTORICO))
+    parser.add_argument("--bd", default=None)
+    parser.add_argument("--cada", type=float, default=None, help="minutos entre corridas (loop)")
+    args = parser.parse_args()
+
+    while True:
+        resultado = ingerir_historial(args.archivo, args.bd)
+        modo = "lectura completa" if resultado["completo"] else "sólo filas nuevas"
+        print(f"✅ {Path(args.archivo).name}: {resultado['filas']} registros ({modo}) "
+              f"en {resultado['segundos']:.2f} s")
+        if args.cada is None:
+            break
+        time.sleep(args.cada * 60)
@@ -0,0 +1,121 @@
+# src/lote_pozos.py
+"""
+Lote de pozos en formato columnar (struct-of-arrays).
+
+Un LotePozos guarda un array NumPy contiguo por campo (pozo_id, qi, di, b,
+bsw, modelo, costos y estado) en lugar de un objeto por pozo. Un pozo es un
+lote de largo 1, así el detalle de un pozo y el cálculo del campo completo
+pasan por el mismo código vectorizado (petro_logic.calcular_detalle_lote).
+
+Cortar un lote con un slice (lote[100:200], lote[3]) devuelve vistas sobre
+los mismos arrays, sin copia; con una lista de posiciones o una máscara se
+copian sólo las filas elegidas.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from src.validacion import normalizar_water_cut
+except ImportError:
+    from validacion import normalizar_water_cut
+
+# Estado de cada pozo del lote (array int8; ESTADOS da el nombre de cada código)
+ESTADO_OK = 0
+ESTADO_NO_ENCONTRADO = 1
+ESTADO_ERROR = 2
+ESTADO_CURVA_TIPO = 3   # sin datos propios válidos: qi, di y b asignados por curva tipo (src/curvas_tipo.py)
+ESTADOS = ("ok", "no_encontrado", "error", "curva_tipo")
+
+
+def _columna(valores, n, dtype):
+    # Escalar -> se repite para los n pozos; array -> se valida el largo
+    array = np.asarray(valores, dtype=dtype)
+    if array.ndim == 0:
+        return np.full(n, array, dtype=dtype)
+    if len(array) != n:
+        raise ValueError(f"Se esperaban {n} valores por pozo y llegaron {len(array)}")
+    return np.ascontiguousarray(array)
+
+
+class LotePozos:
+    """
+    Pozos como arrays paralelos. bsw en fracción; opex_mensual y
+    costo_tratamiento_bbl por pozo (NaN: se usa el valor del escenario).
+    """
+
+    __slots__ = ("pozo_id", "qi", "di", "b", "bsw", "modelo", "opex_mensual", "costo_tratamiento_bbl", "estado")
+
+    def __init__(self, pozo_id, qi, di, b=0.0, bsw=0.0, modelo="exponencial",
+                 opex_mensual=np.nan, costo_tratamiento_bbl=np.nan, estado=ESTADO_OK):
+        self.qi = np.ascontiguousarray(np.atleast_1d(np.asarray(qi, dtype=float)))
+        n = len(self.qi)
+        self.pozo_id = _columna(pozo_id, n, object)
+        self.di = _columna(di, n, float)
+        self.b = _columna(b, n, float)
+        self.bsw = _columna(bsw, n, float)
+        self.modelo = _columna(modelo, n, object)
+        self.opex_mensual = _columna(opex_mensual, n, float)
+        self.costo_tratamiento_bbl = _columna(costo_tratamiento_bbl, n, float)
+        self.estado = _columna(estado, n, np.int8)
+
+    @classmethod
+    def desde_dataframe(cls, df):
+        """
+        Lote con las columnas de la tabla de pozos (prod_real_bpd, di, b,
+        water_cut, modelo_declinacion y, si están, costos). Las columnas
+        numéricas ya tipadas se toman sin copia.
+        """
+        n = len(df)
+        wc = np.zeros(n)
+        if 'water_cut' in df.columns:
+            wc = np.nan_to_num(normalizar_water_cut(df['water_cut'], unidad="fraccion"))
+        return cls(
+            df['pozo_id'].astype(str).to_numpy() if 'pozo_id' in df.columns else np.arange(n).astype(str),
+            pd.to_numeric(df['prod_real_bpd'], errors='coerce').fillna(0).to_numpy(dtype=float),
+            df['di'].to_numpy(dtype=float),
+            df['b'].to_numpy(dtype=float) if 'b' in df.columns else 0.0,
+            wc,
+            df['modelo_declinacion'].astype(str).to_numpy() if 'modelo_declinacion' in df.columns else "exponencial",
+            df['opex_mensual'].to_numpy(dtype=float) if 'opex_mensual' in df.columns else np.nan,
+            df['costo_tratamiento_bbl'].to_numpy(dtype=float) if 'costo_tratamiento_bbl' in df.columns else np.nan,
+        )
+
+    def __len__(self):
+        return len(self.qi)
+
+    def __getitem__(self, seleccion):
+        # Un entero también devuelve un lote (de un pozo) y como vista
+        if isinstance(seleccion, (int, np.integer)):
+            seleccion = slice(seleccion, seleccion + 1 or None)
+        nuevo = LotePozos.__new__(LotePozos)
+        for campo in LotePozos.__slots__:
+            setattr(nuevo, campo, getattr(self, campo)[seleccion])
+        return nuevo
+
+    def reemplazar(self, **campos):
+        """Lote nuevo con algunos campos cambiados (escalar o un valor por pozo); el resto se comparte."""
+        nuevo = self[:]
+        n = len(self)
+        for campo, valores in campos.items():
+            if campo not in LotePozos.__slots__:
+                raise AttributeError(f"LotePozos no tiene el campo '{campo}'")
+            setattr(nuevo, campo, _columna(valores, n, getattr(self, campo).dtype))
+        return nuevo
+
+    def costos(self, opex_mensual, costo_tratamiento_bbl):
+        """(opex_mensual, costo_tratamiento_bbl) por pozo: el del pozo si está informado, si no el del escenario."""
+        return (np.where(np.isnan(self.opex_mensual), opex_mensual, self.opex_mensual),
+                np.where(np.isnan(self.costo_tratamiento_bbl), costo_tratamiento_bbl, self.costo_tratamiento_bbl))
+
+    def a_dataframe(self):
+        return pd.DataFrame({
+            'pozo_id': self.pozo_id,
+            'prod_real_bpd': self.qi,
+            'di': self.di,
+            'b': self.b,
+            'water_cut': self.bsw,
+            'modelo_declinacion': self.modelo,
+            'opex_mensual': self.opex_mensual,
+            'costo_tratamiento_bbl': self.costo_tratamiento_bbl,
+            'estado': np.asarray(ESTADOS, dtype=object)[self.estado],
+        })
@@ -0,0 +1,257 @@
+# src/modelos_declinacion.py
+"""
+Registro de modelos de declinación de Arps.
+
+Cada modelo implementa, de forma vectorizada (broadcasting de NumPy):
+    tasa(qi, di, b, t)          -> q(t)       caudal a tiempo t (días)
+    acumulada(qi, di, b, t)     -> Np(t)      producción acumulada desde t = 0
+    tiempo_a_tasa(qi, di, b, q) -> t          días hasta que el caudal cae a q
+    acumulada_descontada(qi, di, b, t, r)     integral de q(t)·e^(-r·t) entre 0 y t
+                                              (r = tasa de descuento continua diaria)
+
+qi, di y b pueden ser escalares o arrays de pozos. Para obtener una matriz
+(pozos x días) se pasa qi[:, None] y t[None, :], o se usan las funciones
+'*_por_pozo', que además permiten elegir un modelo distinto para cada pozo.
+"""
+import numpy as np
+import pandas as pd
+
+B_MINIMO = 1e-6           # por debajo de esto la hiperbólica se trata como exponencial
+D_LIMITE_ANUAL = 0.10     # declinación terminal de la hiperbólica modificada (10% anual)
+
+# Gauss-Legendre compuesta (8 tramos x 8 nodos en [0, 1]) para las integrales
+# descontadas que no tienen primitiva elemental (armónica / hiperbólica)
+_NODOS_GL, _PESOS_GL = np.polynomial.legendre.leggauss(8)
+_TRAMOS_GL = 8
+_NODOS_GL = ((np.arange(_TRAMOS_GL)[:, None] + (_NODOS_GL[None, :] + 1) / 2) / _TRAMOS_GL).ravel()
+_PESOS_GL = np.tile(_PESOS_GL / 2, _TRAMOS_GL) / _TRAMOS_GL
+
+
+def _integral_descontada(tasa, qi, di, b, t, r):
+    # Integra tasa(t)·e^(-r·t) en [0, t] para cada pozo (arrays 1D del mismo largo)
+    qi, di, b, t, r = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (qi, di, b, t, r)))
+    tiempos = t[:, None] * _NODOS_GL[None, :]
+    valores = tasa(qi[:, None], di[:, None], b[:, None], tiempos) * np.exp(-r[:, None] * tiempos)
+    return t * (valores @ _PESOS_GL)
+
+
+class DeclinacionExponencial:
+    """q = qi * e^(-D*t)"""
+
+    def tasa(self, qi, di, b, t):
+        return qi * np.exp(-di * t)
+
+    def acumulada(self, qi, di, b, t):
+        return qi / di * (1 - np.exp(-di * t))
+
+    def tiempo_a_tasa(self, qi, di, b, q):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log(qi / q) / di
+
+    def acumulada_descontada(self, qi, di, b, t, r):
+        # Forma cerrada: la exponencial descontada sigue siendo exponencial a tasa D + r
+        return qi / (di + r) * (1 - np.exp(-(di + r) * t))
+
+
+class DeclinacionArmonica:
+    """q = qi / (1 + D*t)   (hiperbólica con b = 1)"""
+
+    def tasa(self, qi, di, b, t):
+        return qi / (1 + di * t)
+
+    def acumulada(self, qi, di, b, t):
+        return qi / di * np.log1p(di * t)
+
+    def tiempo_a_tasa(self, qi, di, b, q):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (qi / q - 1) / di
+
+    def acumulada_descontada(self, qi, di, b, t, r):
+        return _integral_descontada(self.tasa, qi, di, b, t, r)
+
+
+class DeclinacionHiperbolica:
+    """q = qi * (1 + b*D*t)^(-1/b). Con b -> 0 tiende a la exponencial y con b = 1 es la armónica."""
+
+    def tasa(self, qi, di, b, t):
+        b_seguro = np.maximum(b, B_MINIMO)
+        return np.where(b < B_MINIMO,
+                        qi * np.exp(-di * t),
+                        qi * (1 + b_seguro * di * t) ** (-1 / b_seguro))
+
+    def acumulada(self, qi, di, b, t):
+        b_seguro = np.maximum(b, B_MINIMO)
+        q = self.tasa(qi, di, b, t)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            general = qi ** b_seguro / ((1 - b_seguro) * di) * (qi ** (1 - b_seguro) - q ** (1 - b_seguro))
+        return np.select(
+            [b < B_MINIMO, np.isclose(b, 1.0)],
+            [(qi - q) / di, qi / di * np.log1p(di * t)],
+            general,
+        )
+
+    def tiempo_a_tasa(self, qi, di, b, q):
+        b_seguro = np.maximum(b, B_MINIMO)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(b < B_MINIMO,
+                            np.log(qi / q) / di,
+                            ((qi / q) ** b_seguro - 1) / (b_seguro * di))
+
+    def acumulada_descontada(self, qi, di, b, t, r):
+        return _integral_descontada(self.tasa, qi, di, b, t, r)
+
+
+class DeclinacionHiperbolicaModificada:
+    """
+    Hiperbólica hasta que la declinación instantánea D(t) = D / (1 + b*D*t) baja a
+    'd_limite'; desde ahí sigue exponencial a d_limite (perfil típico de shale).
+    """
+
+    def __init__(self, d_limite=D_LIMITE_ANUAL / 365):
+        self.d_limite = d_limite
+        self._hiperbolica = DeclinacionHiperbolica()
+
+    def _cambio(self, qi, di, b):
+        # Tiempo y caudal del cambio a exponencial (si di ya es menor al límite, cambia en t = 0)
+        b_seguro = np.maximum(b, B_MINIMO)
+        t_cambio = np.maximum((di / self.d_limite - 1) / (b_seguro * di), 0)
+        t_cambio = np.where(b < B_MINIMO, 0.0, t_cambio)
+        q_cambio = self._hiperbolica.tasa(qi, di, b, t_cambio)
+        return t_cambio, q_cambio
+
+    def tasa(self, qi, di, b, t):
+        t_cambio, q_cambio = self._cambio(qi, di, b)
+        d_exp = np.where(b < B_MINIMO, di, np.minimum(di, self.d_limite))
+        return np.where(t <= t_cambio,
+                        self._hiperbolica.tasa(qi, di, b, np.minimum(t, t_cambio)),
+                        q_cambio * np.exp(-d_exp * (t - t_cambio)))
+
+    def acumulada(self, qi, di, b, t):
+        t_cambio, q_cambio = self._cambio(qi, di, b)
+        d_exp = np.where(b < B_MINIMO, di, np.minimum(di, self.d_limite))
+        np_hasta_cambio = self._hiperbolica.acumulada(qi, di, b, np.minimum(t, t_cambio))
+        tramo_exp = q_cambio / d_exp * (1 - np.exp(-d_exp * np.maximum(t - t_cambio, 0)))
+        return np_hasta_cambio + tramo_exp
+
+    def tiempo_a_tasa(self, qi, di, b, q):
+        t_cambio, q_cambio = self._cambio(qi, di, b)
+        d_exp = np.where(b < B_MINIMO, di, np.minimum(di, self.d_limite))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(q >= q_cambio,
+                            self._hiperbolica.tiempo_a_tasa(qi, di, b, q),
+                            t_cambio + np.log(q_cambio / q) / d_exp)
+
+    def acumulada_descontada(self, qi, di, b, t, r):
+        # Tramo hiperbólico por cuadratura + cola exponencial en forma cerrada
+        t_cambio, q_cambio = self._cambio(qi, di, b)
+        d_exp = np.where(b < B_MINIMO, di, np.minimum(di, self.d_limite))
+        tramo_hip = self._hiperbolica.acumulada_descontada(qi, di, b, np.minimum(t, t_cambio), r)
+        tramo_exp = (q_cambio * np.exp(-r * t_cambio) / (d_exp + r)
+                     * (1 - np.exp(-(d_exp + r) * np.maximum(t - t_cambio, 0))))
+        return tramo_hip + tramo_exp
+
+
+# --- REGISTRO ---
+MODELOS_DECLINACION = {}
+
+
+def registrar_modelo(nombre, modelo):
+    """Agrega (o reemplaza) un modelo en el registro."""
+    MODELOS_DECLINACION[nombre] = modelo
+    return modelo
+
+
+def obtener_modelo(nombre="exponencial"):
+    try:
+        return MODELOS_DECLINACION[nombre]
+    except KeyError:
+        raise ValueError(f"Modelo de declinación desconocido: '{nombre}'. "
+                         f"Disponibles: {', '.join(MODELOS_DECLINACION)}") from None
+
+
+registrar_modelo("exponencial", DeclinacionExponencial())
+registrar_modelo("armonica", DeclinacionArmonica())
+registrar_modelo("hiperbolica", DeclinacionHiperbolica())
+registrar_modelo("hiperbolica_modificada", DeclinacionHiperbolicaModificada())
+
+
+# --- EVALUACIÓN POR POZO (un modelo por pozo) ---
+
+def _por_modelo(modelos, n_pozos, calcular):
+    # Agrupa los pozos por modelo y evalúa cada grupo en una sola llamada vectorizada
+    modelos = np.broadcast_to(np.asarray(modelos, dtype=object), (n_pozos,))
+    # factorize (hash) en lugar de np.unique (ordena strings): se llama en bucles de bisección
+    grupo, nombres = pd.factorize(modelos)
+    if len(nombres) == 1:
+        return np.asarray(calcular(obtener_modelo(nombres[0]), slice(None)), dtype=float)
+    resultado = None
+    for i, nombre in enumerate(nombres):
+        idx = np.flatnonzero(grupo == i)
+        valores = calcular(obtener_modelo(nombre), idx)
+        if resultado is None:
+            resultado = np.empty((n_pozos,) + valores.shape[1:], dtype=float)
+        resultado[idx] = valores
+    return resultado
+
+
+def _como_pozos(qi, di, b):
+    qi = np.atleast_1d(np.asarray(qi, dtype=float))
+    di = np.broadcast_to(np.asarray(di, dtype=float), qi.shape)
+    b = np.broadcast_to(np.asarray(b, dtype=float), qi.shape)
+    return qi, di, b
+
+
+def tasa_por_pozo(modelos, qi, di, b, dias):
+    """Matriz (pozos x días) de caudal, con el modelo indicado para cada pozo."""
+    qi, di, b = _como_pozos(qi, di, b)
+    dias = np.asarray(dias, dtype=float)[None, :]
+    return _por_modelo(modelos, len(qi), lambda m, i: m.tasa(qi[i, None], di[i, None], b[i, None], dias))
+
+
+def acumulada_por_pozo(modelos, qi, di, b, t):
+    """Producción acumulada de cada pozo hasta t (t escalar o un valor por pozo)."""
+    qi, di, b = _como_pozos(qi, di, b)
+    t = np.broadcast_to(np.asarray(t, dtype=float), qi.shape)
+    return _por_modelo(modelos, len(qi), lambda m, i: m.acumulada(qi[i], di[i], b[i], t[i]))
+
+
+def tiempo_a_tasa_por_pozo(modelos, qi, di, b, q_objetivo):
+    """Días hasta que cada pozo cae al caudal objetivo (escalar o un valor por pozo)."""
+    qi, di, b = _como_pozos(qi, di, b)
+    q = np.broadcast_to(np.asarray(q_objetivo, dtype=float), qi.shape)
+    return _por_modelo(modelos, len(qi), lambda m, i: m.tiempo_a_tasa(qi[i], di[i], b[i], q[i]))
+
+
+def acumulada_descontada_por_pozo(modelos, qi, di, b, t, r):
+    """Producción descontada de cada pozo hasta t, con tasa continua diaria r (escalar o por pozo)."""
+    qi, di, b = _como_pozos(qi, di, b)
+    t = np.broadcast_to(np.asarray(t, dtype=float), qi.shape)
+    r = np.broadcast_to(np.asarray(r, dtype=float), qi.shape)
+    return _por_modelo(modelos, len(qi), lambda m, i: m.acumulada_descontada(qi[i], di[i], b[i], t[i], r[i]))
+
+
+def dia_limite_economico(modelos, qi, di, b, q_limite, horizonte):
+    """
+    Primer día entero con caudal por debajo de Qel (misma regla que la curva diaria),
+    sin materializar la curva. 0 si ya arranca por debajo, 'horizonte' si nunca cruza.
+    """
+    qi, di, b = _como_pozos(qi, di, b)
+    q_limite = np.broadcast_to(np.asarray(q_limite, dtype=float), qi.shape)
+    t_cruce = tiempo_a_tasa_por_pozo(modelos, qi, di, b, q_limite)
+    dia = np.where(np.isfinite(t_cruce), np.floor(t_cruce) + 1, horizonte)
+    dia = np.where(qi < q_limite, 0, np.minimum(dia, horizonte))
+    return dia.astype(int)
+
+
+def completar_columnas_modelo(df, modelo="exponencial", b=0.0):
+    """
+    Asegura las columnas 'modelo_declinacion' y 'b' del DataFrame de pozos
+    (si el archivo no las trae, o vienen vacías, se usa el modelo por defecto).
+    """
+    if 'modelo_declinacion' not in df.columns:
+        df['modelo_declinacion'] = modelo
+    df['modelo_declinacion'] = df['modelo_declinacion'].fillna(modelo).astype(str)
+    if 'b' not in df.columns:
+        df['b'] = b
+    df['b'] = df['b'].fillna(b).astype(float)
+    return df
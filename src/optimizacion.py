@@ -0,0 +1,150 @@
+# src/optimizacion.py
+"""
+Priorización de intervenciones (workovers) bajo un presupuesto.
+
+Para cada pozo candidato se estima:
+  - uplift_bpd: caudal recuperable. Lo que falta para llevar al pozo a 'Monitoreo'
+    (gap_eficiencia de calcular_distancia_monitoreo) más una fracción del resto
+    de la producción diferida (teórica - real).
+  - valor_usd: valor presente del uplift declinando con el di del pozo, con la
+    integral cerrada de q·e^-(d+r)t hasta el horizonte (r = tasa de descuento diaria).
+  - costo_usd: costo de la intervención ('costo_intervencion' si viene en los
+    datos; si no, costo base + costo por punto de gap).
+La selección es un greedy vectorizado por VPN/costo: se ordena una vez y el
+presupuesto y el tope de cuadrillas se aplican con sumas acumuladas por
+pasadas (un pozo que no entra se saltea y se siguen probando los que vienen
+detrás), así que escala a cientos de miles de candidatos.
+"""
+import numpy as np
+import pandas as pd
+
+from src.funciones_petroleras import calcular_distancia_monitoreo, estimar_tasa_declinacion
+from src.validacion import normalizar_water_cut
+
+COSTO_BASE_USD = 60000
+COSTO_POR_PUNTO_GAP_USD = 1500
+FRACCION_DIFERIDA_RECUPERABLE = 0.3
+
+
+def estimar_candidatos(df, precio_brent, regalias=0.12, costo_tratamiento_bbl=0.0, horizonte=365,
+                       tasa_descuento=0.10, fraccion_diferida=FRACCION_DIFERIDA_RECUPERABLE,
+                       costo_base=COSTO_BASE_USD, costo_por_punto=COSTO_POR_PUNTO_GAP_USD):
+    """
+    Uplift, valor presente, costo y VPN de intervenir cada pozo.
+    Devuelve un DataFrame por pozo (mismo orden que df).
+    """
+    df = df[['pozo_id', 'prod_teorica_bpd', 'prod_real_bpd']
+            + [c for c in ('water_cut', 'di', 'costo_intervencion') if c in df.columns]].copy()
+    teorica = pd.to_numeric(df['prod_teorica_bpd'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    real = pd.to_numeric(df['prod_real_bpd'], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['eficiencia'] = np.where(teorica > 0, real / teorica * 100, 100.0)
+    df = calcular_distancia_monitoreo(df)
+    if 'di' not in df.columns:
+        df = estimar_tasa_declinacion(df)
+
+    # Uplift: volver a Monitoreo (70%) + parte recuperable del resto de lo diferido
+    gap = df['gap_eficiencia'].to_numpy(dtype=float)
+    uplift_gap = gap / 100 * teorica
+    diferida = np.maximum(teorica - real, 0)
+    uplift = uplift_gap + fraccion_diferida * np.maximum(diferida - uplift_gap, 0)
+
+    # Valor neto por barril de petróleo (el agua asociada paga tratamiento)
+    wc = np.zeros(len(df))
+    if 'water_cut' in df.columns:
+        wc = np.clip(np.nan_to_num(normalizar_water_cut(df['water_cut'], unidad="fraccion")), 0, 0.99)
+    neto_bbl = precio_brent * (1 - regalias) - costo_tratamiento_bbl / (1 - wc)
+
+    # Valor presente del uplift: integral de q·e^-(d+r)t entre 0 y el horizonte
+    r = np.log1p(tasa_descuento) / 365
+    k = df['di'].to_numpy(dtype=float) + r
+    volumen_descontado = uplift / k * (1 - np.exp(-k * horizonte))
+    valor = volumen_descontado * neto_bbl
+
+    if 'costo_intervencion' in df.columns:
+        costo = pd.to_numeric(df['costo_intervencion'], errors='coerce').fillna(costo_base).to_numpy(dtype=float)
+    else:
+        costo = costo_base + costo_por_punto * gap
+
+    return pd.DataFrame({
+        'pozo_id': df['pozo_id'].to_numpy(),
+        'gap_eficiencia': gap,
+        'uplift_bpd': uplift,
+        'valor_usd': valor,
+        'costo_usd': costo,
+        'vpn_usd': valor - costo,
+    })
+
+
+def optimizar_intervenciones(candidatos, presupuesto, max_intervenciones=None):
+    """
+    Greedy por índice de rentabilidad (VPN / costo): se recorren los pozos con
+    VPN > 0 en orden de rentabilidad y se elige cada uno que entre en el
+    presupuesto restante mientras haya cuadrillas; el que no entra se saltea y
+    pozos más baratos que vienen detrás todavía pueden entrar.
+
+    Es la regla greedy de la mochila, no el óptimo exacto: al final se compara
+    el VPN del greedy con el del mejor pozo individual que entra en el
+    presupuesto y se queda el mayor, así el plan vale al menos la mitad del
+    óptimo (un pozo caro y muy rentable no queda afuera por varios baratos).
+    Devuelve los candidatos con 'prioridad'
+    (1 = más rentable), 'costo_acumulado' (inversión acumulada del plan hasta
+    ese pozo; NaN si no se interviene) e 'intervenir'.
+    """
+    vpn = candidatos['vpn_usd'].to_numpy(dtype=float)
+    costo = candidatos['costo_usd'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indice = np.where(costo > 0, vpn / costo, np.inf)
+    indice = np.where(vpn > 0, indice, -np.inf)
+
+    orden = np.argsort(-indice, kind='stable')
+    prioridad = np.empty(len(costo), dtype=int)
+    prioridad[orden] = np.arange(1, len(costo) + 1)
+
+    # Pasadas: entre los pendientes que todavía entran, se toma el prefijo que cabe
+    # en lo que queda; el siguiente no cabe y se descarta en la próxima pasada
+    intervenir = np.zeros(len(costo), dtype=bool)
+    restante = float(presupuesto)
+    cupo = len(costo) if max_intervenciones is None else int(max_intervenciones)
+    pendientes = orden[vpn[orden] > 0]
+    while cupo > 0:
+        pendientes = pendientes[costo[pendientes] <= restante]
+        if len(pendientes) == 0:
+            break
+        acumulado = np.cumsum(costo[pendientes])
+        n = min(int(np.searchsorted(acumulado, restante, side='right')), cupo)
+        intervenir[pendientes[:n]] = True
+        restante -= acumulado[n - 1]
+        cupo -= n
+        pendientes = pendientes[n:]
+
+    # Mejor pozo individual que entra en el presupuesto (con al menos una cuadrilla)
+    entran = (vpn > 0) & (costo <= float(presupuesto))
+    if entran.any() and (max_intervenciones is None or int(max_intervenciones) > 0):
+        mejor = int(np.argmax(np.where(entran, vpn, -np.inf)))
+        if vpn[mejor] > vpn[intervenir].sum():
+            intervenir[:] = False
+            intervenir[mejor] = True
+
+    elegidos = orden[intervenir[orden]]
+    costo_acumulado = np.full(len(costo), np.nan)
+    costo_acumulado[elegidos] = np.cumsum(costo[elegidos])
+
+    resultado = candidatos.copy()
+    resultado['indice_rentabilidad'] = indice
+    resultado['prioridad'] = prioridad
+    resultado['costo_acumulado'] = costo_acumulado
+    resultado['intervenir'] = intervenir
+    return resultado
+
+
+def resumir_plan(plan):
+    """Totales del plan elegido: pozos, inversión, VPN y caudal recuperado."""
+    elegidos = plan[plan['intervenir']]
+    return {
+        'pozos': int(len(elegidos)),
+        'inversion_usd': float(elegidos['costo_usd'].sum()),
+        'vpn_usd': float(elegidos['vpn_usd'].sum()),
+        'uplift_bpd': float(elegidos['uplift_bpd'].sum()),
+    }
@@ -0,0 +1,228 @@
+# src/paralelo.py
+"""
+Ejecución por fragmentos del pipeline de DataFrames de funciones_petroleras.
+
+El dataset se parte por hash de 'pozo_id' (todas las filas de un pozo caen en
+el mismo fragmento) y cada fragmento corre la lista de pasos en un proceso
+del pool. Los datos no viajan pickleados: el proceso principal copia las
+columnas, ya ordenadas por fragmento, a un bloque de memoria compartida; cada
+worker lee su rango de filas de ese bloque y deja su resultado en otro. Entre
+procesos sólo viajan nombres de bloque y esquemas (columna, dtype, offset).
+
+La unión es determinística: mismas filas, mismo orden y mismos valores que
+correr los pasos sobre el DataFrame completo, con cualquier cantidad de
+procesos. El resultado conserva el índice de entrada de las filas que quedan
+(aunque algún paso lo reinicie) y las columnas no numéricas viajan como texto.
+
+Los pasos son funciones df -> df por fila o por pozo (como las de
+funciones_petroleras), o tuplas (funcion, kwargs). Lo que se decide sobre la
+columna completa (la unidad del water cut) se pasa fijo, por ejemplo
+(calcular_produccion_neta, {"origen_wc": "porcentaje"}).
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+MIN_FILAS_PARALELO = 50_000  # por debajo, el costo de repartir supera al cálculo
+_ALINEACION = 64
+_COLUMNA_FILA = "__fila"
+
+_pool = None
+_procesos_pool = 0
+_lock = threading.Lock()
+
+
+def _obtener_pool(procesos):
+    # Un pool por proceso, reutilizado entre corridas (levantar workers cuesta importar pandas)
+    global _pool, _procesos_pool
+    with _lock:
+        if _pool is None or _procesos_pool != procesos:
+            if _pool is not None:
+                _pool.shutdown()
+            metodos = multiprocessing.get_all_start_methods()
+            # Sin fork: el proceso que llama puede tener threads (Streamlit, API)
+            contexto = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+            _pool = ProcessPoolExecutor(procesos, mp_context=contexto)
+            _procesos_pool = procesos
+        return _pool
+
+
+@atexit.register
+def cerrar_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+# --- COLUMNAS <-> MEMORIA COMPARTIDA ---
+
+def _como_arrays(df):
+    """{columna: (valores, nulos)} con arrays NumPy de tamaño fijo (el texto como 'U')."""
+    arrays = {}
+    for nombre in df.columns:
+        serie = df[nombre]
+        if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biufcmM":
+            arrays[nombre] = (serie.to_numpy(), None)
+        else:
+            nulos = serie.isna().to_numpy()
+            valores = serie.astype(object).where(~nulos, "").to_numpy().astype(str)
+            arrays[nombre] = (valores, nulos if nulos.any() else None)
+    return arrays
+
+
+def _escribir(arrays, orden=None):
+    """Copia las columnas (permutadas por 'orden') a un bloque nuevo. Devuelve (bloque, esquema)."""
+    esquema = []
+    offset = 0
+    for nombre, (valores, nulos) in arrays.items():
+        ubicaciones = []
+        for array in (valores, nulos):
+            if array is None:
+                ubicaciones.append(None)
+                continue
+            offset = -(-offset // _ALINEACION) * _ALINEACION
+            ubicaciones.append((array.dtype.str, offset))
+            offset += array.nbytes
+        esquema.append((nombre, *ubicaciones))
+
+    bloque = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (valores, nulos), (_, ubicacion, ubicacion_nulos) in zip(arrays.values(), esquema):
+        for array, (tipo, inicio) in ((valores, ubicacion), (nulos, ubicacion_nulos or (None, 0))):
+            if array is None:
+                continue
+            destino = np.ndarray(array.shape, array.dtype, bloque.buf, inicio)
+            destino[:] = array if orden is None else array[orden]
+    return bloque, esquema
+
+
+def _leer(bloque, esquema, n_filas, inicio=0, fin=None):
+    """{columna: (valores, nulos)} como vistas sobre el bloque (sin copia)."""
+    arrays = {}
+    for nombre, ubicacion, ubicacion_nulos in esquema:
+        vistas = []
+        for tipo, offset in (ubicacion, ubicacion_nulos or (None, None)):
+            vistas.append(None if tipo is None else
+                          np.ndarray((n_filas,), np.dtype(tipo), bloque.buf, offset)[inicio:fin])
+        arrays[nombre] = tuple(vistas)
+    return arrays
+
+
+def _a_dataframe(arrays, index=None):
+    # pd.DataFrame copia los arrays: el bloque se puede cerrar después
+    columnas = {}
+    for nombre, (valores, nulos) in arrays.items():
+        serie = pd.Series(valores, copy=True)
+        columnas[nombre] = serie if nulos is None else serie.where(~nulos)
+    df = pd.DataFrame(columnas)
+    if index is not None:
+        df.index = index
+    return df
+
+
+# --- PIPELINE ---
+
+def aplicar_pasos(df, pasos):
+    """Corre los pasos en orden sobre un DataFrame (camino secuencial y de cada worker)."""
+    for paso in pasos:
+        funcion, kwargs = paso if isinstance(paso, tuple) else (paso, {})
+        df = funcion(df, **kwargs)
+    return df
+
+
+def _procesar_fragmento(nombre_bloque, esquema, n_filas, inicio, fin, pasos):
+    # Corre en el worker: lee su rango del bloque de entrada y escribe el resultado en uno propio
+    entrada = shared_memory.SharedMemory(name=nombre_bloque)
+    try:
+        df = _a_dataframe(_leer(entrada, esquema, n_filas, inicio, fin))
+    finally:
+        entrada.close()
+    df = aplicar_pasos(df, pasos)
+    salida, esquema_salida = _escribir(_como_arrays(df))
+    salida.close()  # lo libera el proceso principal al unir
+    return salida.name, esquema_salida, len(df)
+
+
+def fragmento_por_pozo(pozo_ids, n_fragmentos):
+    """Fragmento de cada fila por hash estable de pozo_id (no depende de la semilla de Python)."""
+    ids = pd.Series(pozo_ids).astype(str).str.strip()
+    return (pd.util.hash_pandas_object(ids, index=False).to_numpy() % n_fragmentos).astype(np.int64)
+
+
+def _unir(bloques, resultados):
+    """Concatena las salidas en orden de fragmento y restaura el orden original de filas."""
+    partes = [_leer(bloque, esquema, n) for bloque, (_, esquema, n) in zip(bloques, resultados)]
+    total = sum(n for _, _, n in resultados)
+    fila = np.concatenate([parte[_COLUMNA_FILA][0] for parte in partes])
+    orden = np.argsort(fila, kind="stable")
+
+    columnas = {}
+    for nombre in partes[0]:
+        if nombre == _COLUMNA_FILA:
+            continue
+        # Un fragmento puede tipar distinto (int/float, ancho de texto): se usa el tipo común
+        tipo = np.result_type(*[parte[nombre][0].dtype for parte in partes])
+        valores = np.concatenate([parte[nombre][0] for parte in partes]).astype(tipo, copy=False)
+        nulos = None
+        if any(parte[nombre][1] is not None for parte in partes):
+            nulos = np.concatenate([parte[nombre][1] if parte[nombre][1] is not None
+                                    else np.zeros(len(parte[nombre][0]), dtype=bool) for parte in partes])
+            nulos = nulos[orden]
+        columnas[nombre] = (valores[orden], nulos)
+    return columnas, fila[orden], total
+
+
+def ejecutar_por_fragmentos(df, pasos, procesos=None, n_fragmentos=None, min_filas=MIN_FILAS_PARALELO):
+    """
+    Corre 'pasos' sobre 'df' repartido por pozo en 'procesos' procesos (por
+    defecto, uno por núcleo). Con un solo proceso o pocos datos corre en el
+    proceso actual. El DataFrame de entrada no se modifica y el resultado es
+    el mismo en ambos casos.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos <= 1 or len(df) < min_filas:
+        # Mismo resultado que el camino paralelo: la posición de entrada viaja como columna
+        resultado = aplicar_pasos(df.assign(**{_COLUMNA_FILA: np.arange(len(df))}), pasos)
+        fila = resultado[_COLUMNA_FILA].to_numpy()
+        resultado = resultado.drop(columns=_COLUMNA_FILA)
+        resultado.index = df.index[fila]
+        return resultado
+
+    n_fragmentos = n_fragmentos or procesos
+    fragmento = fragmento_por_pozo(df['pozo_id'], n_fragmentos)
+    orden = np.argsort(fragmento, kind="stable")
+    limites = np.searchsorted(fragmento[orden], np.arange(n_fragmentos + 1))
+
+    arrays = _como_arrays(df)
+    arrays[_COLUMNA_FILA] = (np.arange(len(df), dtype=np.int64), None)
+    entrada, esquema = _escribir(arrays, orden)
+    del arrays
+
+    pool = _obtener_pool(procesos)
+    futuros = [pool.submit(_procesar_fragmento, entrada.name, esquema, len(df),
+                           int(limites[i]), int(limites[i + 1]), pasos)
+               for i in range(n_fragmentos)]
+    bloques = []
+    try:
+        resultados = []
+        for futuro in futuros:
+            resultado = futuro.result()
+            resultados.append(resultado)
+            bloques.append(shared_memory.SharedMemory(name=resultado[0]))
+        columnas, fila, _ = _unir(bloques, resultados)
+        return _a_dataframe(columnas, df.index[fila])
+    finally:
+        # Si un fragmento falló, igual se liberan los bloques de los que terminaron
+        for futuro in futuros[len(bloques):]:
+            if not futuro.cancel() and futuro.exception() is None:
+                bloques.append(shared_memory.SharedMemory(name=futuro.result()[0]))
+        for bloque in [entrada] + bloques:
+            bloque.close()
+            bloque.unlink()
@@ -0,0 +1,86 @@
+# src/perfil_arranque.py
+"""
+Control de arranque en frío de las páginas.
+
+Para main.py y cada página de 'pages/' detecta los módulos de 'src' que importa,
+los importa en un proceso limpio con 'python -X importtime' y falla (código 1) si:
+  - se carga algún módulo pesado que debe ser diferido (matplotlib, fpdf), o
+  - el tiempo total de import supera el presupuesto en milisegundos.
+
+Uso (desde la raíz del proyecto):
+    python -m src.perfil_arranque
+    python -m src.perfil_arranque --presupuesto-ms 800
+"""
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+PRESUPUESTO_MS = 1000
+MODULOS_DIFERIDOS = ("matplotlib", "fpdf")
+
+
+def modulos_src(ruta_script):
+    """Módulos 'src.*' importados por un script (leídos del código, sin ejecutarlo)."""
+    arbol = ast.parse(Path(ruta_script).read_text(encoding="utf-8"))
+    modulos = set()
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.module.startswith("src"):
+            modulos.add(nodo.module)
+        elif isinstance(nodo, ast.Import):
+            modulos.update(a.name for a in nodo.names if a.name.startswith("src"))
+    return sorted(modulos)
+
+
+def perfilar_imports(modulos):
+    """Importa los módulos en un proceso nuevo. Devuelve (ms totales, nombres de módulos cargados)."""
+    codigo = "; ".join(f"import {m}" for m in modulos) or "pass"
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stderr
+
+    total_us = 0
+    cargados = set()
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        if not acumulado.strip().isdigit():
+            continue  # encabezado
+        cargados.add(nombre.strip())
+        # Sólo las líneas de primer nivel (sin indentación) suman al total
+        if not nombre.startswith("  "):
+            total_us += int(acumulado)
+    return total_us / 1000, cargados
+
+
+def verificar_arranque(presupuesto_ms=PRESUPUESTO_MS):
+    scripts = [RAIZ / "main.py"] + sorted((RAIZ / "pages").glob("*.py"))
+    fallas = []
+    for script in scripts:
+        modulos = modulos_src(script)
+        ms, cargados = perfilar_imports(modulos)
+        pesados = sorted({m.split(".")[0] for m in cargados} & set(MODULOS_DIFERIDOS))
+
+        estado = "✅"
+        if pesados:
+            estado = "❌"
+            fallas.append(f"{script.name}: carga módulos diferidos {pesados}")
+        if ms > presupuesto_ms:
+            estado = "❌"
+            fallas.append(f"{script.name}: {ms:.0f} ms > presupuesto {presupuesto_ms} ms")
+        print(f"{estado} {script.relative_to(RAIZ)}: {ms:.0f} ms ({len(modulos)} módulos src)")
+
+    for falla in fallas:
+        print(f"   - {falla}")
+    return not fallas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Control de tiempo de import en arranque en frío")
+    parser.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS)
+    args = parser.parse_args()
+    sys.exit(0 if verificar_arranque(args.presupuesto_ms) else 1)
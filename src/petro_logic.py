@@ -2,45 +2,186 @@
 import numpy as np
 from pathlib import Path
 
+# Se importa como 'src.*' desde las páginas y como módulo suelto desde los notebooks
+try:
+    from src.activos import abrir_activo, firma_archivo
+    from src.lote_pozos import LotePozos
+    from src.modelos_declinacion import obtener_modelo, tasa_por_pozo
+    from src.precios import MazoPrecios
+    from src.pronostico_agua import agua_water_cut_fijo, proyectar_agua
+except ImportError:
+    from activos import abrir_activo, firma_archivo
+    from lote_pozos import LotePozos
+    from modelos_declinacion import obtener_modelo, tasa_por_pozo
+    from precios import MazoPrecios
+    from pronostico_agua import agua_water_cut_fijo, proyectar_agua
+
 def calcular_q_limite(opex_diario, precio_brent, regalias=0.12):
-    """Calcula el punto de equilibrio económico (Qel) con blindaje."""
+    """
+    Calcula el punto de equilibrio económico (Qel) con blindaje.
+    Acepta escalares o arrays (un valor por pozo o por escenario); con OPEX y
+    precio por día (pozos x días) devuelve Qel como serie diaria.
+    """
     try:
-        # Validación de seguridad
-        if precio_brent <= 0:
-            return 0.0
-        
-        denominador = precio_brent * (1 - regalias)
-        if denominador <= 0:
-            return 0.0
-            
-        return opex_diario / denominador
+        precio = np.asarray(precio_brent, dtype=float)
+        denominador = precio * (1 - np.asarray(regalias, dtype=float))
+        # Validación de seguridad: sin precio o sin margen, Qel = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q_limite = np.where((precio > 0) & (denominador > 0), opex_diario / denominador, 0.0)
+        return float(q_limite) if q_limite.ndim == 0 else q_limite
     except Exception:
         return 0.0
 
-def proyectar_produccion(qi, di, dias_proyeccion=200):
-    """Genera la curva de declinación exponencial."""
+def proyectar_produccion(qi, di=None, dias_proyeccion=200, modelo="exponencial", b=0.0):
+    """
+    Genera la curva de declinación con el modelo del registro (exponencial por defecto).
+    Con qi escalar devuelve una curva; con arrays de pozos, una matriz (pozos x días),
+    y 'modelo' puede ser un nombre por pozo. Con un LotePozos en 'qi' se usan su
+    di, modelo y b (también matriz, aunque el lote tenga un solo pozo).
+    """
     try:
         dias = np.arange(0, dias_proyeccion)
-        prod = qi * np.exp(-di * dias)
+        if isinstance(qi, LotePozos):
+            prod = tasa_por_pozo(qi.modelo, qi.qi, qi.di, qi.b, dias)
+        elif np.ndim(qi) == 0 and isinstance(modelo, str):
+            prod = obtener_modelo(modelo).tasa(qi, di, b, dias)
+        else:
+            prod = tasa_por_pozo(modelo, qi, di, b, dias)
         return dias, prod
     except Exception as e:
         print(f"Error en proyección: {e}")
         return np.array([0]), np.array([0])
 
 def calcular_flujo_caja(prod_proyectada, precio_brent, opex_total_diario, regalias=0.12):
-    """Calcula el cash flow diario y acumulado."""
+    """
+    Calcula el cash flow diario y acumulado. El precio y el OPEX pueden ser
+    escalares o series diarias (días,) / (pozos, días) que se combinan por
+    broadcasting con la producción.
+    """
     ingreso_neto = prod_proyectada * precio_brent * (1 - regalias)
     cf_diario = ingreso_neto - opex_total_diario
     mascara_rentabilidad = cf_diario > 0
     cf_diario_positivo = np.where(mascara_rentabilidad, cf_diario, 0)
-    cf_acumulado = np.cumsum(cf_diario_positivo)
+    # axis=-1: acumula por día, también cuando se pasa una matriz (pozos x días)
+    cf_acumulado = np.cumsum(cf_diario_positivo, axis=-1)
     return cf_diario, cf_acumulado
 
-def get_documentation_pdf():
- # Detecta la raíz del proyecto dinámicamente
+def calcular_detalle_lote(lote, precio_brent, opex_mensual, costo_tratamiento_bbl,
+                          horizonte=730, regalias=0.12, m_std=30, tendencia_agua=None):
+    """
+    Detalle técnico-económico de todos los pozos de un LotePozos en un solo
+    paso vectorizado (matrices pozos x días). Los costos informados en el lote
+    reemplazan, pozo por pozo, a los del escenario.
+    'precio_brent' es un número (o uno por pozo) o un MazoPrecios (curva de Brent
+    diaria o mensual e índice de costos): Qel pasa a ser una serie diaria por
+    pozo y el día de quiebre es el primero con caudal debajo del Qel de ese día.
+    Con una TendenciaAgua (src/pronostico_agua.py) el water cut sube con la
+    acumulada de cada pozo; si no, se mantiene el del lote todo el horizonte.
+    """
+    opex_mensual, costo_tratamiento_bbl = lote.costos(opex_mensual, costo_tratamiento_bbl)
+    if isinstance(precio_brent, MazoPrecios):
+        precio = precio_brent.brent_diario(horizonte)
+        indice_costos = precio_brent.indice_costos_diario(horizonte)
+        brent = round(float(np.mean(precio)), 2)  # precio promedio de la curva, para el reporte
+    else:
+        # Un precio por pozo va como columna para combinarse con las matrices pozos x días
+        precio = np.asarray(precio_brent, dtype=float)
+        precio = precio[:, None] if precio.ndim else float(precio)
+        indice_costos = 1.0
+        brent = precio_brent
+    opex_fijo_diario = (opex_mensual / m_std)[:, None] * indice_costos
+
+    # A. Punto de equilibrio (por pozo; por pozo y día si el precio o los costos cambian)
+    q_limite_diario = calcular_q_limite(opex_fijo_diario, precio, regalias)
+
+    # B. Proyección de producción (modelo y b de cada pozo)
+    dias, prod_proyectada = proyectar_produccion(lote, dias_proyeccion=horizonte)
+    # Escenario plano: una columna por pozo que se expande sin copiar
+    q_limite_diario = np.broadcast_to(q_limite_diario, prod_proyectada.shape)
+
+    # C. OPEX variable por emulsión (volumen de fluido total)
+    if tendencia_agua is None:
+        fluidos = agua_water_cut_fijo(prod_proyectada, lote.bsw)
+    else:
+        fluidos = proyectar_agua(prod_proyectada, *tendencia_agua.para_lote(lote))
+    produccion_fluido, water_cut_diario = fluidos["fluido"], fluidos["water_cut"]
+    costo_emulsion_diario = produccion_fluido * (costo_tratamiento_bbl[:, None] * indice_costos)
+    opex_total_diario = opex_fijo_diario + costo_emulsion_diario
+
+    # D. Flujo de caja
+    cf_diario, cf_acumulado = calcular_flujo_caja(prod_proyectada, precio, opex_total_diario, regalias)
+
+    # E. Día de quiebre (primer día por debajo del límite económico de ese día);
+    # 'horizonte' (un día después del último proyectado) = no cae debajo del límite
+    debajo = prod_proyectada < q_limite_diario
+    dia_final = np.where(debajo.any(axis=1), debajo.argmax(axis=1), horizonte)
+
+    return {
+        "brent": brent,
+        "qi": lote.qi,
+        "q_limite": q_limite_diario[:, 0],
+        "q_limite_diario": q_limite_diario,
+        "dias": dias,
+        "prod_proyectada": prod_proyectada,
+        "produccion_fluido": produccion_fluido,
+        "water_cut_diario": water_cut_diario,
+        "costo_emulsion_diario": costo_emulsion_diario,
+        "opex_total_diario": opex_total_diario,
+        "cash_flow_diario": cf_diario,
+        "cash_flow_acumulado": cf_acumulado,
+        "dia_final": dia_final,
+        "horizonte": horizonte,
+    }
+
+def datos_reporte(detalle_lote, i=0):
+    """Dict del reporte PDF (qi, brent, q_limite, opex, estado, dia_quiebre) para el pozo i del lote."""
+    dia_final = int(detalle_lote["dia_final"][i])
+    brent = detalle_lote["brent"]
+    return {
+        "qi": round(float(detalle_lote["qi"][i]), 2),
+        "brent": float(brent[i]) if np.ndim(brent) else brent,  # un precio por pozo: el de este pozo
+        "q_limite": float(detalle_lote["q_limite"][i]),
+        "opex": float(detalle_lote["opex_total_diario"][i].mean()),  # Usamos el promedio diario
+        "estado": ("OPERACION RENTABLE" if dia_final >= detalle_lote["horizonte"]
+                   else f"ALERTA DE CIERRE (Día {dia_final})"),
+        "dia_quiebre": dia_final
+    }
+
+def detalle_de_pozo(detalle_lote, i=0):
+    """Resultado de calcular_detalle_lote para un solo pozo (curvas 1D y datos del reporte)."""
+    detalle = {clave: (valor[i] if clave != "dias" and np.ndim(valor) > 0 else valor)
+               for clave, valor in detalle_lote.items() if clave not in ("brent", "qi")}
+    detalle["q_limite"] = float(detalle["q_limite"])
+    detalle["dia_final"] = int(detalle["dia_final"])
+    detalle["datos_reporte"] = datos_reporte(detalle_lote, i)
+    return detalle
+
+def calcular_detalle_pozo(qi, bsw, di, precio_brent, opex_mensual, costo_tratamiento_bbl,
+                          horizonte=730, regalias=0.12, m_std=30, modelo="exponencial", b=0.0):
+    """
+    Calcula en un solo paso todo el detalle técnico-económico de un pozo
+    para un escenario (Brent, OPEX, costo de tratamiento, horizonte).
+    Devuelve un dict listo para graficar y para armar el reporte PDF.
+    Es el mismo cálculo que calcular_detalle_lote, con un lote de un pozo.
+    """
+    lote = LotePozos("", qi, di, b=b, bsw=bsw, modelo=modelo)
+    detalle_lote = calcular_detalle_lote(lote, precio_brent, opex_mensual, costo_tratamiento_bbl,
+                                         horizonte=horizonte, regalias=regalias, m_std=m_std)
+    return detalle_de_pozo(detalle_lote)
+
+def get_documentation_path():
+    """Ruta del manual en PDF, o None si no está. No lee el archivo."""
+    # Detecta la raíz del proyecto dinámicamente
     project_root = Path(__file__).resolve().parent.parent
     pdf_path = project_root / "assets" / "pdf" / "documentation.pdf"
+    return pdf_path if pdf_path.exists() else None
 
-    if pdf_path.exists():
-        return pdf_path.read_bytes()
+def get_documentation_pdf():
+    """
+    Manual en PDF como lector sobre el mapeo compartido (src/activos.py):
+    el archivo se mapea una vez por proceso, no se relee ni se copia por sesión.
+    """
+    pdf_path = get_documentation_path()
+    if pdf_path is not None:
+        return abrir_activo(pdf_path)
     return None
\ No newline at end of file
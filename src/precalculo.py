@@ -0,0 +1,166 @@
+# src/precalculo.py
+"""
+Worker de precálculo nocturno.
+
+Lee los últimos archivos de 'datos/', calcula en lote las métricas de todos los
+pozos para un set estándar de precios Brent y deja los resultados versionados en
+'datos/precalculado/'. Los dashboards sólo leen esas tablas.
+
+Uso (desde la raíz del proyecto):
+    python -m src.precalculo                # una corrida (cron)
+    python -m src.precalculo --cada 60      # loop local, revisa cada 60 minutos
+    python -m src.precalculo --procesos 8   # métricas por pozo repartidas en 8 procesos
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.almacenamiento import guardar_resultados, leer_manifiesto
+from src.funciones_petroleras import (
+    procesar_datos_produccion,
+    categorizar_pozos,
+    calcular_produccion_neta,
+    preparar_pozos,
+)
+from src.lote_pozos import LotePozos
+from src.modelos_declinacion import dia_limite_economico
+from src.paralelo import ejecutar_por_fragmentos
+from src.petro_logic import calcular_q_limite, calcular_flujo_caja, firma_archivo, proyectar_produccion
+from src.reservas import sensibilidad_brent
+from src.validacion import unidad_origen
+
+DIR_DATOS = Path(__file__).resolve().parent.parent / "datos"
+ARCHIVO_CAMPO = "datos_campo_masivos.csv"
+
+# Escenario estándar (mismos valores por defecto que la Vista Global)
+BRENT_ESTANDAR = tuple(range(40, 125, 5))
+ESCENARIO_BASE = {
+    "opex_mensual": 45000,
+    "costo_tratamiento_bbl": 2.0,
+    "regalias": 0.12,
+    "horizonte": 730,
+}
+TAMANO_BLOQUE = 5000  # pozos por bloque al materializar la curva diaria
+
+
+def firma_entrada(dir_datos=DIR_DATOS):
+    """Firma de todos los CSV de entrada: si no cambió, no hace falta recalcular."""
+    partes = [f"{ruta.name}:{firma_archivo(ruta)}" for ruta in sorted(Path(dir_datos).glob("*.csv"))]
+    return "|".join(partes)
+
+
+def calcular_metricas_pozos(nombre_archivo=ARCHIVO_CAMPO, procesos=1):
+    """
+    Métricas por pozo que no dependen del precio: eficiencia, categoría, neto,
+    di y modelo de declinación. Con procesos > 1 se reparten por pozo (src/paralelo.py).
+    """
+    df = procesar_datos_produccion(nombre_archivo, incremental=True)
+    if df is None:
+        return None
+    df = df[df['prod_real_bpd'] > 0]
+    # La unidad del water cut se decide sobre todo el archivo, no por fragmento
+    origen_wc = unidad_origen(df['water_cut']) if 'water_cut' in df.columns else None
+    pasos = [
+        categorizar_pozos,
+        (calcular_produccion_neta, {"origen_wc": origen_wc}),
+        preparar_pozos,
+    ]
+    df = ejecutar_por_fragmentos(df, pasos, procesos)
+    return df.reset_index(drop=True)
+
+
+def calcular_resumen_escenarios(df, brents=BRENT_ESTANDAR, escenario=ESCENARIO_BASE):
+    """
+    Para cada pozo y cada Brent: Qel, margen, día de límite económico y resumen
+    del flujo de caja sobre el horizonte. Procesa por bloques de pozos.
+    """
+    m_std = 30
+    opex_diario = escenario["opex_mensual"] / m_std
+    horizonte = escenario["horizonte"]
+    regalias = escenario["regalias"]
+
+    lote = LotePozos.desde_dataframe(df)
+    qi = lote.qi
+    # water_cut ya viene en % (calcular_produccion_neta)
+    bsw = (df['water_cut'].to_numpy(dtype=float) / 100).clip(0, 0.99)
+
+    bloques = []
+    for precio in brents:
+        q_limite = calcular_q_limite(opex_diario, precio, regalias)
+
+        # Día de límite económico en forma cerrada (tiempo-a-caudal del modelo de cada pozo)
+        dia_limite = dia_limite_economico(lote.modelo, qi, lote.di, lote.b, q_limite, horizonte)
+
+        cf_inicial = np.empty_like(qi)
+        cf_horizonte = np.empty_like(qi)
+        dias_positivos = np.empty(len(qi), dtype=int)
+        for inicio in range(0, len(qi), TAMANO_BLOQUE):
+            s = slice(inicio, inicio + TAMANO_BLOQUE)
+            # lote[s]: vistas sobre los arrays del lote, sin copiar
+            _, prod = proyectar_produccion(lote[s], dias_proyeccion=horizonte)
+            opex_total = opex_diario + (prod / (1 - bsw[s, None])) * escenario["costo_tratamiento_bbl"]
+            cf_diario, cf_acumulado = calcular_flujo_caja(prod, precio, opex_total, regalias)
+            cf_inicial[s] = cf_diario[:, 0]
+            cf_horizonte[s] = cf_acumulado[:, -1]
+            dias_positivos[s] = (cf_diario > 0).sum(axis=1)
+
+        bloques.append(pd.DataFrame({
+            'pozo_id': df['pozo_id'].to_numpy(),
+            'brent': precio,
+            'q_limite': q_limite,
+            'margen_bpd': qi - q_limite,
+            'rentable': qi > q_limite,
+            'dia_limite_economico': dia_limite,
+            'cf_diario_inicial': cf_inicial,
+            'cf_acumulado_horizonte': cf_horizonte,
+            'dias_flujo_positivo': dias_positivos,
+        }))
+
+    return pd.concat(bloques, ignore_index=True)
+
+
+def ejecutar_precalculo(forzar=False, procesos=1):
+    """Una corrida completa. Devuelve la versión escrita, o None si no hubo cambios."""
+    firma = firma_entrada()
+    manifiesto = leer_manifiesto()
+    if not forzar and manifiesto and manifiesto.get("firma_entrada") == firma:
+        print("ℹ️ Sin cambios en 'datos/': se conserva la versión", manifiesto.get("version"))
+        return None
+
+    inicio = time.perf_counter()
+    df_metricas = calcular_metricas_pozos(procesos=procesos)
+    if df_metricas is None:
+        return None
+    df_resumen = calcular_resumen_escenarios(df_metricas)
+    df_reservas = sensibilidad_brent(df_metricas, BRENT_ESTANDAR, ESCENARIO_BASE["opex_mensual"],
+                                     ESCENARIO_BASE["regalias"])
+
+    version = guardar_resultados(
+        {"metricas_pozos": df_metricas, "resumen_escenarios": df_resumen, "reservas_campo": df_reservas},
+        metadatos={
+            "firma_entrada": firma,
+            "brent_estandar": list(BRENT_ESTANDAR),
+            "escenario": ESCENARIO_BASE,
+            "n_pozos": len(df_metricas),
+        },
+    )
+    print(f"✅ Precálculo {version}: {len(df_metricas)} pozos x {len(BRENT_ESTANDAR)} precios "
+          f"en {time.perf_counter() - inicio:.2f} s")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precálculo de analítica de campo")
+    parser.add_argument("--cada", type=float, default=None,
+                        help="Minutos entre corridas (loop local). Sin valor: una sola corrida.")
+    parser.add_argument("--forzar", action="store_true", help="Recalcula aunque los datos no hayan cambiado.")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos para las métricas por pozo.")
+    args = parser.parse_args()
+
+    ejecutar_precalculo(forzar=args.forzar, procesos=args.procesos)
+    while args.cada:
+        time.sleep(args.cada * 60)
+        ejecutar_precalculo(procesos=args.procesos)
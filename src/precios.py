@@ -0,0 +1,150 @@
+# src/precios.py
+"""
+Serie histórica de precios (Brent y tipo de cambio) para valorizar producción.
+
+La serie diaria se carga de 'datos/precios_brent.csv' (fecha, brent_usd,
+tipo_cambio) a arrays ordenados por fecha. valor_a_fecha devuelve el último
+precio conocido a cada fecha (as-of) con searchsorted, en forma vectorizada.
+Así, valorizar años de producción diaria de todos los pozos es un único
+'join as-of' sobre arrays, no una búsqueda fila por fila.
+
+MazoPrecios es el escenario hacia adelante: Brent diario o mensual (curva
+forward de presupuesto) e índice de costos (escalamiento del OPEX y del
+tratamiento). El motor de flujo de caja (petro_logic.calcular_detalle_lote) lo expande a una serie diaria y
+evalúa todos los pozos contra ella en un solo paso.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RUTA_PRECIOS = Path(__file__).resolve().parent.parent / "datos" / "precios_brent.csv"
+DIAS_MES = 30  # mismo mes estándar que el OPEX mensual (m_std)
+
+
+def _como_dias(fechas):
+    # Fechas (str, Timestamp, datetime64 o arrays de ellos) -> datetime64[D]
+    fechas = pd.to_datetime(pd.Series(np.atleast_1d(fechas)))
+    return fechas.to_numpy().astype('datetime64[D]')
+
+
+class SeriePrecios:
+    """Serie diaria ordenada: fechas (datetime64[D], únicas) y una columna de valores por nombre."""
+
+    def __init__(self, fechas, columnas):
+        self.fechas = fechas
+        self.columnas = columnas
+
+    def __len__(self):
+        return len(self.fechas)
+
+    def valor_a_fecha(self, fechas, columna="brent_usd"):
+        """Último valor publicado en o antes de cada fecha (NaN si es anterior al inicio de la serie o NaT)."""
+        consulta = _como_dias(fechas)
+        pos = np.searchsorted(self.fechas, consulta, side='right') - 1
+        # searchsorted ubica NaT después de todas las fechas: sin este corte tomaría la última cotización
+        pos = np.where(np.isnat(consulta), -1, pos)
+        valores = np.where(pos >= 0, self.columnas[columna][np.maximum(pos, 0)], np.nan)
+        return valores if np.ndim(fechas) else float(valores[0])
+
+
+def curva_diaria(valores, horizonte, paso="diario"):
+    """
+    Serie diaria de 'horizonte' días (último eje) a partir de valores diarios o
+    mensuales (cada mes dura DIAS_MES días). Si la curva es más corta que el
+    horizonte se extiende con su último valor; si es más larga, se corta.
+    """
+    valores = np.asarray(valores, dtype=float)
+    if valores.ndim == 0:
+        return np.full(horizonte, float(valores))
+    if paso == "mensual":
+        valores = np.repeat(valores[..., :-(-horizonte // DIAS_MES)], DIAS_MES, axis=-1)
+    elif paso != "diario":
+        raise ValueError(f"Paso desconocido: {paso} (diario o mensual)")
+    faltan = horizonte - valores.shape[-1]
+    if faltan > 0:
+        relleno = np.repeat(valores[..., -1:], faltan, axis=-1)
+        valores = np.concatenate([valores, relleno], axis=-1)
+    return valores[..., :horizonte]
+
+
+class MazoPrecios:
+    """
+    Precio Brent e índice de costos a lo largo del horizonte. El Brent puede ser
+    una curva (días o meses,) común a todos los pozos, o una por pozo (pozos, días
+    o meses). El índice de costos multiplica al OPEX y al costo de tratamiento
+    (1.0 = costos de hoy): una curva propia o un escalamiento anual compuesto.
+    """
+
+    def __init__(self, brent, paso="diario", escalamiento_costos=0.0, indice_costos=None):
+        self.brent = np.asarray(brent, dtype=float)
+        self.paso = paso
+        self.escalamiento_costos = float(escalamiento_costos)
+        self.indice_costos = None if indice_costos is None else np.asarray(indice_costos, dtype=float)
+
+    @classmethod
+    def desde_tendencia(cls, brent_inicial, variacion_anual=0.0, escalamiento_costos=0.0, meses=36):
+        """Curva mensual que parte de 'brent_inicial' y varía a tasa anual compuesta."""
+        brent = brent_inicial * (1 + variacion_anual) ** (np.arange(meses) / 12)
+        return cls(brent, paso="mensual", escalamiento_costos=escalamiento_costos)
+
+    def brent_diario(self, horizonte):
+        """Brent por día: (horizonte,) o (pozos, horizonte)."""
+        return curva_diaria(self.brent, horizonte, self.paso)
+
+    def indice_costos_diario(self, horizonte):
+        """Multiplicador de costos por día (horizonte,)."""
+        if self.indice_costos is not None:
+            return curva_diaria(self.indice_costos, horizonte, self.paso)
+        return (1 + self.escalamiento_costos) ** (np.arange(horizonte) / 365)
+
+
+def cargar_precios(ruta=RUTA_PRECIOS):
+    """
+    Lee la serie de precios. Ordena por fecha, se queda con la última cotización
+    de cada día y completa huecos de una columna con el valor anterior.
+    """
+    df = pd.read_csv(ruta)
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+    df = df.dropna(subset=['fecha']).sort_values('fecha')
+    df = df.drop_duplicates(subset='fecha', keep='last')
+
+    columnas = {}
+    for columna in ('brent_usd', 'tipo_cambio'):
+        if columna in df.columns:
+            columnas[columna] = pd.to_numeric(df[columna], errors='coerce').ffill().to_numpy(dtype=float)
+    # Filas previas al primer precio válido no sirven para valorizar
+    validas = ~np.isnan(columnas['brent_usd'])
+    columnas = {nombre: valores[validas] for nombre, valores in columnas.items()}
+    return SeriePrecios(df['fecha'].to_numpy().astype('datetime64[D]')[validas], columnas)
+
+
+def valorizar_produccion(df_historico, serie, regalias=0.12):
+    """
+    Ingreso diario de cada registro de producción al Brent vigente ese día
+    (y en pesos, si la serie trae tipo de cambio). Una sola búsqueda vectorizada.
+    """
+    df = df_historico.copy()
+    fechas = pd.to_datetime(df['fecha'], format='%Y-%m-%d', errors='coerce').to_numpy()
+    df['brent_usd'] = serie.valor_a_fecha(fechas)
+    df['ingreso_usd'] = df['q_petroleo'] * df['brent_usd'] * (1 - regalias)
+    if 'tipo_cambio' in serie.columnas:
+        df['tipo_cambio'] = serie.valor_a_fecha(fechas, columna='tipo_cambio')
+        df['ingreso_ars'] = df['ingreso_usd'] * df['tipo_cambio']
+    return df
+
+
+def resumir_valorizacion(df_valorizado, por='pozo_id'):
+    """
+    Barriles, ingreso y precio realizado (Brent ponderado por volumen) por pozo
+    u otra columna. El precio realizado se promedia sólo sobre los registros con
+    Brent vigente (los previos al inicio de la serie no cuentan).
+    """
+    con_precio = df_valorizado['brent_usd'].notna()
+    df = df_valorizado.assign(
+        _q_con_precio=df_valorizado['q_petroleo'].where(con_precio, 0),
+        _q_x_brent=(df_valorizado['q_petroleo'] * df_valorizado['brent_usd']).where(con_precio, 0),
+    )
+    resumen = df.groupby(por)[['q_petroleo', 'ingreso_usd', '_q_x_brent', '_q_con_precio']].sum()
+    resumen['precio_realizado_usd'] = resumen['_q_x_brent'] / resumen['_q_con_precio'].replace(0, np.nan)
+    return resumen.drop(columns=['_q_x_brent', '_q_con_precio']).rename(columns={'q_petroleo': 'barriles'})
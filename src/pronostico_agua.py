@@ -0,0 +1,169 @@
+# src/pronostico_agua.py
+"""
+Tendencia del water cut por pozo: WOR (agua/petróleo) contra petróleo acumulado.
+
+En la mayoría de los pozos ln(WOR) crece casi lineal con la acumulada Np:
+    ln(WOR) = ln_wor + pendiente * (Np - Np actual)
+El ajuste es de mínimos cuadrados para todos los pozos a la vez sobre el
+historial diario (produccion_historica.csv): sumas por pozo con bincount, sin
+loop por pozo. Para proyectar, Np avanza con el propio petróleo proyectado,
+así el WOR de cada día sale de una suma acumulada sobre la matriz pozos x días
+y agua y fluido total se obtienen en el mismo paso vectorizado.
+
+La proyección parte del water cut actual de cada pozo; un pozo sin historial
+lo conserva todo el horizonte (WOR constante), que es lo que asumía la
+proyección hasta ahora.
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.activos import firma_archivo
+    from src.validacion import normalizar_water_cut
+except ImportError:
+    from activos import firma_archivo
+    from validacion import normalizar_water_cut
+
+RUTA_HISTORICO = Path(__file__).resolve().parent.parent / "datos" / "produccion_historica.csv"
+WC_MINIMO, WC_MAXIMO = 0.001, 0.98
+LN_WOR_MINIMO = np.log(WC_MINIMO / (1 - WC_MINIMO))
+LN_WOR_MAXIMO = np.log(WC_MAXIMO / (1 - WC_MAXIMO))
+MIN_PUNTOS = 5  # registros con water cut válido para ajustar la pendiente
+
+_tendencias = {}
+_lock = threading.Lock()
+
+
+def ln_wor_desde_water_cut(water_cut):
+    """ln(WOR) de un water cut en fracción (acotado a [WC_MINIMO, WC_MAXIMO])."""
+    wc = np.clip(np.asarray(water_cut, dtype=float), WC_MINIMO, WC_MAXIMO)
+    return np.log(wc / (1 - wc))
+
+
+class TendenciaAgua:
+    """Parámetros de la tendencia ln(WOR) vs Np de cada pozo, en arrays paralelos."""
+
+    def __init__(self, pozo_id, ln_wor, pendiente, np_acumulada, puntos):
+        self.pozo_id = np.asarray(pozo_id, dtype=object)
+        self.ln_wor = np.asarray(ln_wor, dtype=float)          # ln(WOR) ajustado a la acumulada actual
+        self.pendiente = np.asarray(pendiente, dtype=float)    # por barril de petróleo acumulado
+        self.np_acumulada = np.asarray(np_acumulada, dtype=float)
+        self.puntos = np.asarray(puntos, dtype=int)
+        self._posiciones = dict(zip(self.pozo_id, range(len(self.pozo_id))))
+
+    def __len__(self):
+        return len(self.pozo_id)
+
+    @classmethod
+    def ajustar(cls, df_historico, min_puntos=MIN_PUNTOS):
+        """
+        Ajusta la tendencia de todos los pozos de un historial diario (pozo_id,
+        fecha, q_petroleo, water_cut en % o fracción). La acumulada de cada
+        registro es la del inicio de ese día. Pendientes negativas (ruido) se
+        toman como WOR constante.
+        """
+        if len(df_historico) == 0:
+            return cls([], [], [], [], [])
+        codigo, ids = pd.factorize(df_historico['pozo_id'].astype(str).str.strip(), sort=True)
+        fechas = pd.to_datetime(df_historico['fecha'], errors='coerce').to_numpy()
+        orden = np.lexsort((fechas, codigo))
+        codigo = codigo[orden]
+        q = pd.to_numeric(df_historico['q_petroleo'], errors='coerce').to_numpy(dtype=float)[orden]
+        q = np.nan_to_num(np.maximum(q, 0))
+        wc = normalizar_water_cut(df_historico['water_cut'])[orden]
+        n_pozos = len(ids)
+
+        # Acumulada al inicio de cada día: suma acumulada global menos la de los pozos anteriores
+        # (ordenado por pozo, los códigos 0..n-1 aparecen en bloques consecutivos)
+        acumulada = np.cumsum(q) - q
+        inicio = np.flatnonzero(np.r_[True, codigo[1:] != codigo[:-1]])
+        np_dia = acumulada - acumulada[inicio][codigo]
+        np_actual = np.bincount(codigo, weights=q, minlength=n_pozos)
+
+        # Mínimos cuadrados por pozo con sumas centradas (dos pasadas de bincount)
+        validos = np.isfinite(wc) & (wc > 0) & (wc < 1)
+        c, x, y = codigo[validos], np_dia[validos], ln_wor_desde_water_cut(wc[validos])
+        puntos = np.bincount(c, minlength=n_pozos)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_media = np.bincount(c, weights=x, minlength=n_pozos) / puntos
+            y_media = np.bincount(c, weights=y, minlength=n_pozos) / puntos
+            dx, dy = x - x_media[c], y - y_media[c]
+            sxx = np.bincount(c, weights=dx * dx, minlength=n_pozos)
+            sxy = np.bincount(c, weights=dx * dy, minlength=n_pozos)
+            pendiente = np.where((puntos >= min_puntos) & (sxx > 0), sxy / sxx, 0.0)
+        pendiente = np.maximum(np.nan_to_num(pendiente), 0.0)
+        ln_wor = np.clip(y_media + pendiente * (np_actual - x_media), LN_WOR_MINIMO, LN_WOR_MAXIMO)
+        return cls(np.asarray(ids, dtype=object), ln_wor, pendiente, np_actual, puntos)
+
+    def para_lote(self, lote):
+        """
+        (ln_wor, pendiente) alineados con los pozos de un LotePozos. La
+        proyección arranca del water cut actual del lote (el mismo que muestran
+        las páginas) con la pendiente del historial; el nivel ajustado sólo se
+        usa si el lote no lo informa. Pozos sin historial: pendiente 0.
+        """
+        pos = np.array([self._posiciones.get(str(pozo_id).strip(), -1) for pozo_id in lote.pozo_id], dtype=int)
+        con_tendencia = pos >= 0
+        con_tendencia[con_tendencia] = self.puntos[pos[con_tendencia]] > 0
+        ln_wor_lote = ln_wor_desde_water_cut(lote.bsw)
+        sin_dato = ~np.isfinite(lote.bsw) & con_tendencia
+        ln_wor = np.where(sin_dato, self.ln_wor[pos], ln_wor_lote)
+        pendiente = np.where(con_tendencia, self.pendiente[pos], 0.0)
+        return ln_wor, pendiente
+
+    def a_dataframe(self):
+        wor = np.exp(self.ln_wor)
+        return pd.DataFrame({
+            'pozo_id': self.pozo_id,
+            'water_cut_actual': wor / (1 + wor) * 100,
+            'wor_actual': wor,
+            'pendiente_ln_wor_por_mbbl': self.pendiente * 1000,
+            'np_acumulada_bbl': self.np_acumulada,
+            'puntos': self.puntos,
+        })
+
+
+def proyectar_agua(petroleo, ln_wor, pendiente):
+    """
+    Agua, fluido total y water cut diarios a partir del petróleo proyectado
+    (pozos x días) y la tendencia de cada pozo. Devuelve un dict de matrices.
+    """
+    petroleo = np.asarray(petroleo, dtype=float)
+    np_futura = np.cumsum(petroleo, axis=-1) - petroleo
+    ln = np.asarray(ln_wor, dtype=float)[..., None] + np.asarray(pendiente, dtype=float)[..., None] * np_futura
+    wor = np.exp(np.minimum(ln, LN_WOR_MAXIMO))
+    agua = petroleo * wor
+    return {"water_cut": wor / (1 + wor), "agua": agua, "fluido": petroleo + agua}
+
+
+def agua_water_cut_fijo(petroleo, water_cut):
+    """
+    Agua, fluido total y water cut diarios con el water cut actual de cada pozo
+    constante: fluido = petróleo / (1 - WC), agua = petróleo * WC / (1 - WC).
+    Mismo dict que proyectar_agua (WC acotado a [0, WC_MAXIMO]).
+    """
+    petroleo = np.asarray(petroleo, dtype=float)
+    wc = np.clip(np.asarray(water_cut, dtype=float), 0, WC_MAXIMO)[..., None]
+    fluido = petroleo / (1 - wc)
+    return {"water_cut": np.broadcast_to(wc, petroleo.shape), "agua": fluido - petroleo, "fluido": fluido}
+
+
+def tendencia_desde_archivo(ruta=RUTA_HISTORICO):
+    """
+    TendenciaAgua del historial diario en CSV, ajustada una vez por proceso y
+    de nuevo sólo si cambia el archivo. None si el archivo no existe.
+    """
+    ruta = Path(ruta)
+    with _lock:
+        firma = firma_archivo(ruta)
+        if firma is None:
+            return None
+        guardada = _tendencias.get(ruta)
+        if guardada is None or guardada[0] != firma:
+            df = pd.read_csv(ruta, usecols=['fecha', 'pozo_id', 'q_petroleo', 'water_cut'])
+            guardada = (firma, TendenciaAgua.ajustar(df))
+            _tendencias[ruta] = guardada
+        return guardada[1]
@@ -0,0 +1,77 @@
+# src/pronostico_campo.py
+"""
+Pronóstico diario de producción del campo (petróleo, agua y fluido total).
+
+Se proyecta el petróleo de cada pozo con proyectar_produccion (modelo de
+declinación del registro), igual que el detalle por pozo (petro_logic), y el
+agua sale de agua_water_cut_fijo: agua = petróleo * WC / (1 - WC).
+Con una TendenciaAgua (src/pronostico_agua.py) el agua de cada pozo sigue su
+WOR contra la acumulada de petróleo en lugar de un water cut fijo.
+La suma por día se hace por bloques de pozos: la matriz completa pozos x días
+nunca existe en memoria, sólo un bloque y los acumuladores (grupos x días).
+"""
+import numpy as np
+import pandas as pd
+
+from src.funciones_petroleras import preparar_pozos
+from src.lote_pozos import LotePozos
+from src.petro_logic import proyectar_produccion
+from src.pronostico_agua import agua_water_cut_fijo, proyectar_agua
+
+TAMANO_BLOQUE = 2000
+
+
+def pronosticar_campo(df, horizonte=730, agrupar_por=None, tamano_bloque=TAMANO_BLOQUE, tendencia_agua=None):
+    """
+    Suma diaria de petróleo, agua y fluido por grupo (p. ej. 'categoria' o 'Estado').
+    Devuelve un DataFrame largo: dia, grupo, petroleo_bpd, agua_bpd, fluido_bpd.
+    """
+    df = preparar_pozos(df)
+
+    lote = LotePozos.desde_dataframe(df)
+    if tendencia_agua is not None:
+        ln_wor, pendiente = tendencia_agua.para_lote(lote)
+
+    if agrupar_por is None:
+        grupos, codigo_grupo = np.array(["Total"]), np.zeros(len(df), dtype=int)
+    else:
+        grupos, codigo_grupo = np.unique(df[agrupar_por].astype(str).to_numpy(), return_inverse=True)
+
+    petroleo = np.zeros((len(grupos), horizonte))
+    agua = np.zeros((len(grupos), horizonte))
+
+    for inicio in range(0, len(df), tamano_bloque):
+        s = slice(inicio, inicio + tamano_bloque)
+        _, petroleo_bloque = proyectar_produccion(lote[s], dias_proyeccion=horizonte)
+        # Matriz de pertenencia (grupos x pozos del bloque): la reducción es un producto matricial
+        pertenencia = np.zeros((len(grupos), petroleo_bloque.shape[0]))
+        pertenencia[codigo_grupo[s], np.arange(petroleo_bloque.shape[0])] = 1.0
+        if tendencia_agua is None:
+            agua_bloque = agua_water_cut_fijo(petroleo_bloque, lote.bsw[s])["agua"]
+        else:
+            agua_bloque = proyectar_agua(petroleo_bloque, ln_wor[s], pendiente[s])["agua"]
+        petroleo += pertenencia @ petroleo_bloque
+        agua += pertenencia @ agua_bloque
+
+    dias = np.arange(horizonte)
+    return pd.DataFrame({
+        'dia': np.tile(dias, len(grupos)),
+        'grupo': np.repeat(grupos, horizonte),
+        'petroleo_bpd': petroleo.ravel(),
+        'agua_bpd': agua.ravel(),
+        'fluido_bpd': (petroleo + agua).ravel(),
+    })
+
+
+def capacidad_instalaciones(df_pronostico):
+    """
+    Totales del campo para dimensionar separadores / planta de tratamiento:
+    pico diario de fluido y de agua, y volumen total de fluido del horizonte.
+    """
+    total = df_pronostico.groupby('dia')[['petroleo_bpd', 'agua_bpd', 'fluido_bpd']].sum()
+    return {
+        'pico_fluido_bpd': float(total['fluido_bpd'].max()),
+        'dia_pico_fluido': int(total['fluido_bpd'].idxmax()),
+        'pico_agua_bpd': float(total['agua_bpd'].max()),
+        'fluido_total_bbl': float(total['fluido_bpd'].sum()),
+    }
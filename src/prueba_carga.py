@@ -0,0 +1,421 @@
+# src/prueba_carga.py
+"""
+Prueba de carga de las páginas de Streamlit con sesiones concurrentes.
+
+Se levanta un servidor real ('streamlit run main.py') sobre una copia del
+proyecto (main.py, pages/, src/, assets/) con un datos_campo_masivos.csv
+sintético de N pozos, así se elige el tamaño del campo sin tocar 'datos/'.
+Cada sesión es un cliente sin navegador que habla el mismo protocolo que el
+frontend (websocket /_stcore/stream con los BackMsg / ForwardMsg de
+streamlit.proto): abre una página, mueve sliders, cambia filtros, cambia de
+pozo (selector de Vista Global -> Detalle) y pide el PDF, que descarga por
+HTTP cuando la cola de exportación lo termina.
+
+Por rerun se mide la latencia (del pedido hasta 'script_finished') y los KB
+recibidos; la memoria es el RSS del proceso del servidor (muestreado durante
+la carga, más el pico que informa el sistema; Linux).
+
+AppTest no sirve para esto: cada corrida reemplaza el runtime global y
+recompila el script, así que no admite sesiones concurrentes en un proceso.
+
+Uso (desde la raíz del proyecto):
+    python -m src.prueba_carga --pozos 20000 --sesiones 8 --iteraciones 15
+    python -m src.prueba_carga --paginas detalle --p95-maximo-ms 3000   # código 1 si se supera
+    python -m src.prueba_carga --json resultados_carga.json
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+RAIZ = Path(__file__).resolve().parent.parent
+# Nombre de cada página en la navegación de Streamlit ("" = la principal)
+PAGINAS = {"principal": "", "global": "Vista Global", "detalle": "Detalle Pozo"}
+COPIAR = ("main.py", "pages", "src", "assets")
+DATOS_COPIAR = ("precios_brent.csv",)
+TIMEOUT_ARRANQUE_S = 60
+TIMEOUT_RERUN_S = 300
+TIMEOUT_PDF_S = 300
+INTERVALO_MEMORIA_S = 0.2
+INTERVALO_PDF_S = 0.5
+
+
+# --- DATOS SINTÉTICOS Y SERVIDOR ---
+
+def generar_campo(n_pozos, semilla=0):
+    """Tabla de pozos con las columnas de datos_campo_masivos.csv (water cut en %)."""
+    rng = np.random.default_rng(semilla)
+    teorica = rng.integers(200, 1200, n_pozos)
+    return pd.DataFrame({
+        'pozo_id': [f"AN-{i:03d}" for i in range(1, n_pozos + 1)],
+        'prod_teorica_bpd': teorica,
+        'prod_real_bpd': teorica * rng.uniform(0.05, 0.95, n_pozos),
+        'water_cut': rng.uniform(5, 95, n_pozos),
+    })
+
+
+def preparar_directorio(destino, n_pozos, semilla=0):
+    """Copia el proyecto a 'destino' con un campo sintético de 'n_pozos' pozos."""
+    destino = Path(destino)
+    ignorar = shutil.ignore_patterns("__pycache__", "*.pyc")
+    for nombre in COPIAR:
+        origen = RAIZ / nombre
+        if origen.is_dir():
+            shutil.copytree(origen, destino / nombre, ignore=ignorar)
+        elif origen.exists():
+            shutil.copy2(origen, destino / nombre)
+    (destino / "datos").mkdir(exist_ok=True)
+    for nombre in DATOS_COPIAR:
+        if (RAIZ / "datos" / nombre).exists():
+            shutil.copy2(RAIZ / "datos" / nombre, destino / "datos" / nombre)
+    generar_campo(n_pozos, semilla).to_csv(destino / "datos" / "datos_campo_masivos.csv", index=False)
+    return destino
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(directorio, puerto):
+    """'streamlit run main.py' en 'directorio'; vuelve cuando responde /_stcore/health."""
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "main.py", "--server.headless", "true",
+         "--server.port", str(puerto), "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false",
+         "--server.fileWatcherType", "none", "--logger.level", "error"],
+        cwd=directorio, stdout=subprocess.DEVNULL)
+    limite = time.monotonic() + TIMEOUT_ARRANQUE_S
+    while time.monotonic() < limite:
+        if servidor.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar (código {servidor.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=1):
+                return servidor
+        except OSError:
+            time.sleep(0.2)
+    servidor.terminate()
+    raise RuntimeError(f"El servidor no respondió en {TIMEOUT_ARRANQUE_S} s")
+
+
+# --- MEMORIA DEL SERVIDOR ---
+
+def memoria_proceso(pid):
+    """(RSS actual, pico de RSS) del proceso en MB, o (None, None) si no hay /proc."""
+    try:
+        campos = dict(linea.split(":", 1) for linea in Path(f"/proc/{pid}/status").read_text().splitlines()
+                      if ":" in linea)
+        return int(campos["VmRSS"].split()[0]) / 1024, int(campos["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+class MonitorMemoria:
+    """Muestrea el RSS de un proceso en un thread mientras dura la carga."""
+
+    def __init__(self, pid, intervalo=INTERVALO_MEMORIA_S):
+        self.pid = pid
+        self.intervalo = intervalo
+        self.muestras = []
+        self._fin = threading.Event()
+        self._thread = threading.Thread(target=self._muestrear, daemon=True)
+
+    def _muestrear(self):
+        while not self._fin.is_set():
+            rss, _ = memoria_proceso(self.pid)
+            if rss is not None:
+                self.muestras.append(rss)
+            self._fin.wait(self.intervalo)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._fin.set()
+        self._thread.join()
+
+
+# --- CLIENTE SIN NAVEGADOR ---
+
+def estado_widget(tipo, widget, valor=None):
+    """WidgetState con el valor tal como lo manda el frontend para cada tipo de widget."""
+    estado = WidgetState(id=widget.id)
+    if tipo == "slider":
+        estado.double_array_value.data[:] = [valor]
+    elif tipo in ("radio", "selectbox"):
+        estado.string_value = valor
+    elif tipo == "number_input":
+        estado.double_value = valor
+    elif tipo == "button":
+        estado.trigger_value = True
+    else:
+        raise ValueError(f"Widget no soportado: {tipo}")
+    return estado
+
+
+class SesionCliente:
+    """Una sesión de Streamlit por websocket. Cada rerun queda en 'registros' (pagina, accion, ms, kb, error)."""
+
+    def __init__(self, url, nombre):
+        self.url = url
+        self.nombre = nombre
+        self.registros = []
+        self.elementos = []
+        self.paginas = {}
+        self.pagina = ""
+        self._ws = None
+
+    async def __aenter__(self):
+        self._ws = await connect(self.url.replace("http", "ws", 1) + "/_stcore/stream",
+                                 subprotocols=["streamlit"], max_size=None, open_timeout=TIMEOUT_RERUN_S)
+        return self
+
+    async def __aexit__(self, *_):
+        await self._ws.close()
+
+    async def rerun(self, accion, widgets=(), pagina=None):
+        """Pide un rerun (de la página 'pagina' o de la actual) con los widgets cambiados y espera que termine."""
+        mensaje = BackMsg()
+        mensaje.rerun_script.query_string = ""
+        mensaje.rerun_script.page_script_hash = self.pagina if pagina is None else self.paginas.get(pagina, "")
+        # El servidor conserva el resto de los widgets: sólo se mandan los que cambian
+        mensaje.rerun_script.widget_states.widgets.extend(widgets)
+
+        inicio = time.perf_counter()
+        await self._ws.send(mensaje.SerializeToString())
+        recibidos = 0
+        error = None
+        while True:
+            datos = await asyncio.wait_for(self._ws.recv(), TIMEOUT_RERUN_S)
+            recibidos += len(datos)
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(datos)
+            tipo = respuesta.WhichOneof("type")
+            if tipo == "new_session":
+                # Empieza una corrida (también la de la página nueva tras st.switch_page)
+                self.elementos = []
+                self.pagina = respuesta.new_session.page_script_hash
+            elif tipo == "navigation":
+                self.paginas = {p.page_name: p.page_script_hash for p in respuesta.navigation.app_pages}
+            elif tipo == "delta" and respuesta.delta.WhichOneof("type") == "new_element":
+                elemento = respuesta.delta.new_element
+                self.elementos.append(elemento)
+                if elemento.WhichOneof("type") == "exception":
+                    error = f"{elemento.exception.type}: {elemento.exception.message}"
+            elif tipo == "script_finished":
+                estado = ForwardMsg.ScriptFinishedStatus.Name(respuesta.script_finished)
+                if estado == "FINISHED_EARLY_FOR_RERUN":
+                    continue  # st.rerun / st.switch_page: la corrida siguiente es parte del mismo pedido
+                if estado != "FINISHED_SUCCESSFULLY":
+                    error = error or estado
+                break
+        self.registros.append((self.nombre, accion, (time.perf_counter() - inicio) * 1000, recibidos / 1024, error))
+        return error is None
+
+    def widgets(self, tipo, etiqueta=""):
+        """Elementos 'tipo' de la última corrida cuya etiqueta empieza con 'etiqueta'."""
+        encontrados = [getattr(e, tipo) for e in self.elementos if e.WhichOneof("type") == tipo]
+        return [w for w in encontrados if w.label.startswith(etiqueta)] if etiqueta else encontrados
+
+    async def cambiar(self, accion, tipo, etiqueta, valor=None):
+        encontrados = self.widgets(tipo, etiqueta)
+        if not encontrados:
+            raise LookupError(f"No hay {tipo} '{etiqueta}' en la página")
+        return await self.rerun(accion, [estado_widget(tipo, encontrados[0], valor)])
+
+    async def descargar(self, url):
+        def leer():
+            with urllib.request.urlopen(self.url + url, timeout=TIMEOUT_RERUN_S) as respuesta:
+                return respuesta.read()
+        return await asyncio.to_thread(leer)
+
+
+# --- ACCIONES DE CADA SESIÓN ---
+
+async def abrir_pozo(sesion, pozo_id):
+    """Como el usuario: elige el pozo en Vista Global y pasa al Detalle (st.switch_page)."""
+    if sesion.pagina != sesion.paginas.get(PAGINAS["global"]):
+        await sesion.rerun("abrir_vista_global", pagina=PAGINAS["global"])
+    selector = sesion.widgets("selectbox", "Seleccione un pozo")
+    boton = sesion.widgets("button", "Ver Análisis Detallado")
+    if not selector or not boton:
+        raise LookupError("No está el selector de pozo en Vista Global")
+    return await sesion.rerun("cambio_pozo", [estado_widget("selectbox", selector[0], pozo_id),
+                                              estado_widget("button", boton[0])])
+
+
+async def pedir_pdf(sesion):
+    """Genera el PDF del pozo, espera a la cola de exportación y lo descarga. Registra el tiempo total."""
+    inicio = time.perf_counter()
+    ok = await sesion.cambiar("pdf_pedido", "button", "📄 Generar Reporte PDF")
+    limite = time.monotonic() + TIMEOUT_PDF_S
+    # Mientras haya exportaciones en curso la página muestra barras de progreso
+    while ok and sesion.widgets("progress") and time.monotonic() < limite:
+        await asyncio.sleep(INTERVALO_PDF_S)
+        ok = await sesion.rerun("pdf_espera")
+    descargas = [d for d in sesion.widgets("download_button", "📥") if d.label.endswith(".pdf")]
+    error = None if ok and descargas else "PDF no disponible"
+    if error is None:
+        contenido = await sesion.descargar(descargas[-1].url)
+        error = None if contenido.startswith(b"%PDF") else "La descarga no es un PDF"
+    sesion.registros.append((sesion.nombre, "pdf_total", (time.perf_counter() - inicio) * 1000, 0.0, error))
+    return error is None
+
+
+async def _accion_principal(sesion, rng, pozo_ids):
+    return await sesion.cambiar("slider_brent", "slider", "Precio Brent", int(rng.integers(40, 121)))
+
+
+async def _accion_global(sesion, rng, pozo_ids):
+    accion = str(rng.choice(["slider_brent", "slider_tratamiento", "filtro", "orden", "pagina"]))
+    if accion == "slider_brent":
+        return await sesion.cambiar(accion, "slider", "Precio Brent", int(rng.integers(40, 121)))
+    if accion == "slider_tratamiento":
+        return await sesion.cambiar(accion, "slider", "Costo Tratamiento", float(rng.choice(np.arange(0.5, 5.01, 0.5))))
+    if accion == "filtro":
+        return await sesion.cambiar(accion, "radio", "Filtrar por",
+                                    str(rng.choice(["Todos", "Solo Rentables", "Solo en Riesgo"])))
+    if accion == "orden":
+        return await sesion.cambiar(accion, "radio", "Ordenar por", str(rng.choice(["Margen", "Prioridad de intervención"])))
+    return await sesion.cambiar(accion, "number_input", "Página", int(rng.integers(1, 50)))
+
+
+async def _accion_detalle(sesion, rng, pozo_ids):
+    accion = str(rng.choice(["slider_brent", "cambio_pozo", "pdf"]))
+    if accion == "slider_brent":
+        return await sesion.cambiar(accion, "slider", "Precio Brent", int(rng.integers(40, 121)))
+    if accion == "cambio_pozo":
+        return await abrir_pozo(sesion, str(rng.choice(pozo_ids)))
+    return await pedir_pdf(sesion)
+
+
+ACCIONES = {"principal": _accion_principal, "global": _accion_global, "detalle": _accion_detalle}
+
+
+async def correr_sesion(url, pagina, iteraciones, pozo_ids, semilla):
+    """Una sesión: carga inicial de la página + 'iteraciones' acciones al azar. Devuelve sus registros."""
+    rng = np.random.default_rng(semilla)
+    sesion = SesionCliente(url, pagina)
+    try:
+        async with sesion:
+            ok = await sesion.rerun("carga_inicial")
+            if ok and pagina == "detalle":
+                ok = await abrir_pozo(sesion, str(rng.choice(pozo_ids)))
+            elif ok and PAGINAS[pagina]:
+                ok = await sesion.rerun("carga_pagina", pagina=PAGINAS[pagina])
+            for _ in range(iteraciones if ok else 0):
+                if not await ACCIONES[pagina](sesion, rng, pozo_ids):
+                    break
+    except Exception as e:
+        sesion.registros.append((pagina, "error", 0.0, 0.0, f"{type(e).__name__}: {e}"))
+    return sesion.registros
+
+
+async def _correr_sesiones(url, paginas, sesiones, iteraciones, pozo_ids, semilla):
+    resultados = await asyncio.gather(*(correr_sesion(url, paginas[i % len(paginas)], iteraciones, pozo_ids, semilla + i)
+                                        for i in range(sesiones)))
+    return [registro for registros in resultados for registro in registros]
+
+
+def ejecutar_carga(url, pid, paginas, sesiones, iteraciones, pozo_ids, semilla=0):
+    """
+    Corre 'sesiones' sesiones concurrentes (repartidas entre 'paginas') contra el
+    servidor en 'url' (proceso 'pid'). Devuelve (latencias DataFrame, memoria dict).
+    """
+    memoria_inicial, _ = memoria_proceso(pid)
+    with MonitorMemoria(pid) as monitor:
+        registros = asyncio.run(_correr_sesiones(url, paginas, sesiones, iteraciones, pozo_ids, semilla))
+    memoria_final, pico = memoria_proceso(pid)
+    latencias = pd.DataFrame(registros, columns=["pagina", "accion", "ms", "kb", "error"])
+    picos = monitor.muestras + ([pico] if pico is not None else [])
+    memoria = {"inicial_mb": memoria_inicial, "final_mb": memoria_final, "pico_mb": max(picos) if picos else None}
+    return latencias, memoria
+
+
+def resumir(latencias):
+    """Reruns, errores, p50 / p95 / p99 / máximo de latencia (ms) y KB medianos por página y acción."""
+    def percentiles(grupo):
+        ms = grupo['ms'].to_numpy()
+        return pd.Series({"reruns": len(ms), "errores": int(grupo['error'].notna().sum()),
+                          "p50_ms": np.percentile(ms, 50), "p95_ms": np.percentile(ms, 95),
+                          "p99_ms": np.percentile(ms, 99), "max_ms": ms.max(), "kb_p50": grupo['kb'].median()})
+
+    columnas = ["ms", "kb", "error"]
+    por_accion = latencias.groupby(["pagina", "accion"])[columnas].apply(percentiles)
+    # El total del PDF abarca varios reruns: no entra en el resumen de reruns de la página
+    reruns = latencias[latencias['accion'] != "pdf_total"]
+    por_pagina = reruns.groupby("pagina")[columnas].apply(percentiles)
+    por_pagina.index = pd.MultiIndex.from_product([por_pagina.index, ["(reruns)"]], names=["pagina", "accion"])
+    return pd.concat([por_pagina, por_accion]).sort_index()
+
+
+# --- LÍNEA DE COMANDOS ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de las páginas de Streamlit")
+    parser.add_argument("--pozos", type=int, default=10_000, help="tamaño del campo sintético")
+    parser.add_argument("--sesiones", type=int, default=8, help="sesiones concurrentes")
+    parser.add_argument("--iteraciones", type=int, default=10, help="acciones por sesión")
+    parser.add_argument("--paginas", nargs="+", choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--p95-maximo-ms", type=float, default=None,
+                        help="falla (código 1) si el p95 de reruns de una página lo supera")
+    parser.add_argument("--json", default=None, help="guarda el resumen en este archivo")
+    args = parser.parse_args()
+
+    pozo_ids = generar_campo(args.pozos, args.semilla)['pozo_id'].tolist()
+    with tempfile.TemporaryDirectory(prefix="prueba_carga_") as directorio:
+        preparar_directorio(directorio, args.pozos, args.semilla)
+        puerto = _puerto_libre()
+        print(f"Campo sintético de {args.pozos} pozos en {directorio} · servidor en el puerto {puerto}")
+        servidor = iniciar_servidor(directorio, puerto)
+        try:
+            inicio = time.perf_counter()
+            latencias, memoria = ejecutar_carga(f"http://127.0.0.1:{puerto}", servidor.pid, args.paginas,
+                                                args.sesiones, args.iteraciones, pozo_ids, args.semilla)
+            duracion = time.perf_counter() - inicio
+        finally:
+            servidor.terminate()
+            servidor.wait(timeout=30)
+
+    resumen = resumir(latencias)
+    print(f"\n{args.sesiones} sesiones · {args.iteraciones} acciones por sesión "
+          f"· {len(latencias)} registros en {duracion:.1f} s")
+    print(resumen.to_string(float_format=lambda v: f"{v:,.0f}"))
+    if memoria["pico_mb"] is not None:
+        print(f"\nMemoria del servidor: inicial {memoria['inicial_mb']:,.0f} MB · "
+              f"pico {memoria['pico_mb']:,.0f} MB · final {memoria['final_mb']:,.0f} MB")
+    for error in latencias['error'].dropna().unique()[:5]:
+        print(f"❌ {error}")
+
+    if args.json:
+        salida = {"pozos": args.pozos, "sesiones": args.sesiones, "iteraciones": args.iteraciones,
+                  "segundos": duracion, "memoria": memoria,
+                  "latencias": resumen.reset_index().to_dict(orient="records")}
+        Path(args.json).write_text(json.dumps(salida, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    p95 = resumen.xs("(reruns)", level="accion")["p95_ms"]
+    excedidos = p95[p95 > args.p95_maximo_ms] if args.p95_maximo_ms else p95.iloc[:0]
+    for pagina, valor in excedidos.items():
+        print(f"❌ {pagina}: p95 {valor:,.0f} ms supera {args.p95_maximo_ms:,.0f} ms")
+    return 1 if latencias['error'].notna().any() or len(excedidos) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
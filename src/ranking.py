@@ -0,0 +1,108 @@
+# src/ranking.py
+"""
+Ranking de pozos paginado en el servidor.
+
+Ordenar y serializar la tabla completa en cada rerun cuesta O(n log n) más el
+envío de todas las filas. Acá el orden de cada clave se calcula una vez por
+dataset (IndiceOrden, guardado en DatasetCampo) y el ranking es sólo un array
+de posiciones: una página es tomar 'tamano' filas de ese array, así el costo
+de mostrarla no depende de la cantidad de pozos.
+
+Los filtros por umbral sobre la misma clave (rentables / en riesgo según
+Qel) son cortes del índice por búsqueda binaria, sin recorrer el campo.
+
+La exportación recorre el ranking por bloques de filas y los escribe en un
+buffer en memoria como CSV o como stream Arrow IPC, sin armar además una
+copia ordenada de la tabla completa.
+"""
+import io
+
+import numpy as np
+import pyarrow as pa
+
+TAMANO_PAGINA = 50
+TAMANO_BLOQUE_EXPORTACION = 20_000
+
+
+class IndiceOrden:
+    """Posiciones de las filas ordenadas (ascendente, estable, NaN al final) por una columna numérica."""
+
+    def __init__(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        self.orden = np.argsort(valores, kind='stable')
+        self.claves = valores[self.orden]
+        # argsort deja los NaN al final: las primeras 'finitos' claves están ordenadas
+        self.finitos = int(np.count_nonzero(~np.isnan(valores)))
+        for array in (self.orden, self.claves):
+            array.flags.writeable = False
+
+    def __len__(self):
+        return len(self.orden)
+
+    def hasta(self, umbral):
+        """Posiciones con valor <= umbral y las sin dato (al final), en orden."""
+        corte = np.searchsorted(self.claves[:self.finitos], umbral, side='right')
+        if self.finitos == len(self.orden):
+            return self.orden[:corte]
+        return np.concatenate([self.orden[:corte], self.orden[self.finitos:]])
+
+    def mayores(self, umbral):
+        """Posiciones con valor > umbral, en orden (vista, sin copia)."""
+        corte = np.searchsorted(self.claves[:self.finitos], umbral, side='right')
+        return self.orden[corte:self.finitos]
+
+
+def orden_por_valores(valores):
+    """Posiciones ordenadas por 'valores' (ascendente, estable, NaN al final)."""
+    return IndiceOrden(valores).orden
+
+
+class Ranking:
+    """Filas de un DataFrame en el orden de 'posiciones' (posiciones de fila, no etiquetas)."""
+
+    def __init__(self, df, posiciones):
+        self.df = df
+        self.posiciones = posiciones
+
+    def __len__(self):
+        return len(self.posiciones)
+
+    def paginas(self, tamano=TAMANO_PAGINA):
+        return max(1, -(-len(self) // tamano))
+
+    def pagina(self, numero, tamano=TAMANO_PAGINA):
+        """DataFrame con las filas de la página 'numero' (desde 1; fuera de rango: la última)."""
+        numero = min(max(1, int(numero)), self.paginas(tamano))
+        return self.df.iloc[self.posiciones[(numero - 1) * tamano:numero * tamano]]
+
+    def bloques(self, tamano_bloque=TAMANO_BLOQUE_EXPORTACION):
+        """Itera el ranking en DataFrames de hasta 'tamano_bloque' filas."""
+        for inicio in range(0, len(self), tamano_bloque):
+            yield self.df.iloc[self.posiciones[inicio:inicio + tamano_bloque]]
+
+    def escribir_csv(self, destino, tamano_bloque=TAMANO_BLOQUE_EXPORTACION):
+        """Escribe el ranking como CSV en un archivo binario abierto, bloque por bloque."""
+        for i, bloque in enumerate(self.bloques(tamano_bloque)):
+            destino.write(bloque.to_csv(index=False, header=i == 0).encode('utf-8'))
+        if len(self) == 0:
+            destino.write(self.df.iloc[:0].to_csv(index=False).encode('utf-8'))
+
+    def escribir_arrow(self, destino, tamano_bloque=TAMANO_BLOQUE_EXPORTACION):
+        """Escribe el ranking como stream Arrow IPC (un record batch por bloque)."""
+        esquema = pa.Schema.from_pandas(self.df.iloc[:0], preserve_index=False)
+        with pa.ipc.new_stream(destino, esquema) as escritor:
+            for bloque in self.bloques(tamano_bloque):
+                escritor.write_batch(pa.RecordBatch.from_pandas(bloque, schema=esquema, preserve_index=False))
+
+    def exportar(self, formato="csv", tamano_bloque=TAMANO_BLOQUE_EXPORTACION):
+        """
+        BytesIO (posicionado al inicio) con el ranking completo en 'csv' o
+        'arrow', escrito por bloques de filas. download_button lo lee entero.
+        """
+        buffer = io.BytesIO()
+        if formato == "arrow":
+            self.escribir_arrow(buffer, tamano_bloque)
+        else:
+            self.escribir_csv(buffer, tamano_bloque)
+        buffer.seek(0)
+        return buffer
@@ -1,10 +1,17 @@
 
-import os
+import io
 from fpdf import FPDF
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 
 # Importamos tus funciones de lógica de negocio
-from funciones_petroleras import calcular_metricas_emulsion
+from funciones_petroleras import calcular_metricas_emulsion, preparar_pozos
+from activos import DIR_ASSETS, abrir_activo
+from lote_pozos import LotePozos
+from modelos_declinacion import dia_limite_economico
+from petro_logic import calcular_q_limite
+from validacion import normalizar_water_cut
 
 class ReportePetroleroPro(FPDF):
     def header(self):
@@ -25,32 +32,28 @@ class ReportePetroleroPro(FPDF):
         self.cell(0, 10, f'Pagina {self.page_no()}', 0, 0, 'C')
 
 
-def generar_reporte_avanzado(df, df_historico, dia_quiebre, produccion_futura):
-
-
-    # 1. DEFINICIÓN DE RUTAS PROFESIONAL
-    # Usamos la raíz del proyecto para assets y una carpeta temporal para el gráfico
-    base_path = os.getcwd() # Obtiene la raíz donde está main.py
-    ruta_assets = os.path.join(base_path, "assets")
-
-    # El gráfico lo guardamos en el sistema temporal del servidor
-    ruta_img = "temp_grafico.png" 
-    # El PDF final lo guardamos donde Streamlit pueda encontrarlo
-    ruta_final = "Reporte_Final_YPF_2026.pdf"
+def generar_reporte_avanzado(df, df_historico, dia_quiebre, produccion_futura,
+                             destino="Reporte_Final_YPF_2026.pdf", top_n=5):
+    """
+    Reporte de ingeniería. 'destino' puede ser una ruta o un stream binario
+    (p. ej. io.BytesIO); 'top_n' es la cantidad de pozos críticos a listar.
+    """
 
     pdf = ReportePetroleroPro()
     pdf.add_page()
 
     # 2. PROCESAMIENTO DE DATOS
     total_perdida = df['perdida_usd_dia'].sum()
-    top_5 = df.sort_values('perdida_usd_dia', ascending=False).head(5)
+    top = df.nlargest(top_n, 'perdida_usd_dia')
 
-    # 3. GRÁFICO
+    # 3. GRÁFICO (en memoria: nada de archivos temporales con nombre fijo en el CWD)
+    img_buf = io.BytesIO()
     plt.figure(figsize=(8, 5))
     plt.scatter(df['water_cut'], df['perdida_usd_dia'], alpha=0.6, c=df['perdida_usd_dia'], cmap='Reds')
     plt.title("Analisis de Perdidas - Proyecto Anelo 2026")
-    plt.savefig(ruta_img, dpi=100)
-    plt.close()  
+    plt.savefig(img_buf, format='png', dpi=100)
+    plt.close()
+    img_buf.seek(0)
 
     # Título
     pdf.set_font('Arial', 'B', 16)
@@ -58,17 +61,19 @@ def generar_reporte_avanzado(df, df_historico, dia_quiebre, produccion_futura):
     pdf.cell(0, 15, 'ALERTA: IMPACTO ECONOMICO DIARIO', 0, 1, 'C')
 
     # Imagen
-    pdf.image(ruta_img, x=15, w=180)
+    pdf.image(img_buf, x=15, w=180)
     pdf.ln(5)
 
-    # TABLA TOP 5 (Con celdas reforzadas)
+    # TABLA TOP N (Con celdas reforzadas)
     pdf.set_font('Arial', 'B', 11)
     pdf.set_text_color(0, 0, 0)
-    pdf.cell(0, 10, 'Detalle de Pozos Criticos (Top 5):', 0, 1)
+    pdf.cell(0, 10, f'Detalle de Pozos Criticos (Top {top_n}):', 0, 1)
     pdf.set_font('Arial', '', 10)
     
-    for _, row in top_5.iterrows():
-        texto_fila = f"ID: {row['pozo_id']} | Agua: {row['water_cut']:.1f}% | Perdida: USD {row['perdida_usd_dia']:,.0f}"
+    # Recorremos columnas (arrays), no filas de pandas
+    for pozo_id, wc, perdida in zip(top['pozo_id'].to_numpy(), top['water_cut'].to_numpy(),
+                                    top['perdida_usd_dia'].to_numpy()):
+        texto_fila = f"ID: {pozo_id} | Agua: {wc:.1f}% | Perdida: USD {perdida:,.0f}"
         pdf.cell(0, 8, texto_fila, border=1, ln=1)
 
     # IMPACTO TOTAL (Toque personal)
@@ -92,9 +97,10 @@ def generar_reporte_avanzado(df, df_historico, dia_quiebre, produccion_futura):
                          f"de desemulsionantes. La relacion temperatura/viscosidad sugiere optimizar "
                          f"los puntos de inyeccion en fondo.")
     
-    # Insertamos el gráfico de dispersión de la Celda 1
-    if os.path.exists('../assets/grafico_emulsion.png'):
-        pdf.image('../assets/grafico_emulsion.png', x=15, w=170)
+    # Insertamos el gráfico de dispersión de la Celda 1 (mapeado una sola vez, sin releer el disco)
+    grafico_emulsion = abrir_activo(DIR_ASSETS / 'grafico_emulsion.png')
+    if grafico_emulsion is not None:
+        pdf.image(grafico_emulsion, x=15, w=170)
     pdf.ln(5)
 
     # --- SECCIÓN 2: DECLINACIÓN Y LÍMITE ECONÓMICO ---
@@ -102,8 +108,9 @@ def generar_reporte_avanzado(df, df_historico, dia_quiebre, produccion_futura):
     pdf.section_title("2. PRONOSTICO DE PRODUCCION (ARPS) Y RENTABILIDAD")
     
     # Insertamos el gráfico de la curva roja de la Celda 3
-    if os.path.exists('../assets/grafico_declinacion.png'):
-        pdf.image('../assets/grafico_declinacion.png', x=15, w=170)
+    grafico_declinacion = abrir_activo(DIR_ASSETS / 'grafico_declinacion.png')
+    if grafico_declinacion is not None:
+        pdf.image(grafico_declinacion, x=15, w=170)
     
     pdf.ln(5)
     pdf.set_font('Arial', 'B', 11)
@@ -229,5 +236,98 @@ def generar_reporte_avanzado(df, df_historico, dia_quiebre, produccion_futura):
     pdf.multi_cell(0, 7, "Nota: Este reporte fue generado automaticamente integrando modelos de declinacion "
                          "exponencial y factores reologicos de emulsion.")
 
-    pdf.output(ruta_final)
-    return ruta_final
+    pdf.output(destino)
+    return destino
+
+
+#-----------------------------------------------------------------------------------------------------------------#
+# REPORTE DE CAMPO: tabla paginada con TODOS los pozos
+#-----------------------------------------------------------------------------------------------------------------#
+
+# (título, columna, formato, ancho en mm)
+COLUMNAS_REPORTE_CAMPO = [
+    ('ID Pozo', 'pozo_id', '{}', 30),
+    ('Eficiencia %', 'eficiencia', '{:.1f}', 28),
+    ('WC %', 'water_cut', '{:.1f}', 22),
+    ('Margen Qel (bpd)', 'margen_qel_bpd', '{:,.1f}', 36),
+    ('Dia Quiebre', 'dia_quiebre', '{:d}', 28),
+    ('Diferido (USD/dia)', 'diferido_usd_dia', '{:,.0f}', 46),
+]
+
+
+def armar_tabla_campo(df, precio_brent=75, opex_mensual=45000, regalias=0.12, horizonte=730):
+    """
+    Columnas del reporte de campo, calculadas en forma vectorizada para todos los pozos:
+    eficiencia, WC (%), margen sobre Qel, día de quiebre y diferido en USD/día.
+    """
+    df = preparar_pozos(df)
+
+    lote = LotePozos.desde_dataframe(df)
+    qi = lote.qi
+    teorica = pd.to_numeric(df['prod_teorica_bpd'], errors='coerce').to_numpy(dtype=float)
+    wc = np.nan_to_num(normalizar_water_cut(df['water_cut'], unidad="porcentaje"))
+    q_limite = calcular_q_limite(opex_mensual / 30, precio_brent, regalias)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eficiencia = np.where(teorica > 0, qi / teorica * 100, np.nan)
+
+    return pd.DataFrame({
+        'pozo_id': lote.pozo_id,
+        'eficiencia': eficiencia,
+        'water_cut': wc,
+        'margen_qel_bpd': qi - q_limite,
+        'dia_quiebre': dia_limite_economico(lote.modelo, qi, lote.di, lote.b, q_limite, horizonte),
+        'diferido_usd_dia': np.clip(np.nan_to_num(teorica - qi), 0, None) * precio_brent * (1 - regalias),
+    })
+
+
+def generar_reporte_campo(tabla, destino, precio_brent=75, filas_por_bloque=1000):
+    """
+    Reporte PDF con la tabla paginada de todos los pozos (encabezado repetido en
+    cada página). Se recorre la tabla por bloques de columnas: sólo se formatean
+    a texto 'filas_por_bloque' filas a la vez. 'destino': ruta o stream binario.
+    """
+    pdf = ReportePetroleroPro()
+    pdf.set_compression(True)
+    pdf.add_page()
+
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 12, 'REPORTE COMPARATIVO DE CAMPO', 0, 1, 'C')
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(0, 6, f"{len(tabla)} pozos | Brent USD {precio_brent} | "
+                   f"Diferido total: USD {np.nansum(tabla['diferido_usd_dia'].to_numpy()):,.0f} / dia", 0, 1, 'C')
+    pdf.ln(4)
+
+    def encabezado():
+        pdf.set_font('Arial', 'B', 9)
+        pdf.set_fill_color(200, 220, 255)
+        for titulo, _, _, ancho in COLUMNAS_REPORTE_CAMPO:
+            pdf.cell(ancho, 7, titulo, 1, 0, 'C', True)
+        pdf.ln()
+        pdf.set_font('Arial', '', 9)
+
+    encabezado()
+    alto_fila = 6
+    columnas = {col: tabla[col].to_numpy() for _, col, _, _ in COLUMNAS_REPORTE_CAMPO}
+    margen = columnas['margen_qel_bpd']
+
+    for inicio in range(0, len(tabla), filas_por_bloque):
+        fin = min(inicio + filas_por_bloque, len(tabla))
+        textos = [[fmt.format(v) if not (isinstance(v, float) and np.isnan(v)) else '-'
+                   for v in columnas[col][inicio:fin].tolist()]
+                  for _, col, fmt, _ in COLUMNAS_REPORTE_CAMPO]
+
+        for i in range(fin - inicio):
+            if pdf.will_page_break(alto_fila):
+                pdf.add_page()
+                encabezado()
+            for j, (_, _, _, ancho) in enumerate(COLUMNAS_REPORTE_CAMPO):
+                # Margen negativo (por debajo del límite económico) en rojo
+                if j == 3 and margen[inicio + i] < 0:
+                    pdf.set_text_color(200, 0, 0)
+                pdf.cell(ancho, alto_fila, textos[j][i], 1, 0, 'C')
+                pdf.set_text_color(0, 0, 0)
+            pdf.ln()
+
+    pdf.output(destino)
+    return destino
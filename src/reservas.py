@@ -0,0 +1,106 @@
+# src/reservas.py
+"""
+Reservas (EUR) hasta el límite económico con integrales cerradas de Arps.
+
+Para cada pozo: tiempo hasta Qel (tiempo-a-caudal del modelo), reservas
+remanentes = Np(t_limite) desde hoy, y EUR = acumulada histórica + remanentes.
+No se arma ninguna curva diaria: todo sale de una llamada vectorizada por modelo,
+así que escala a cientos de miles de pozos.
+"""
+import numpy as np
+import pandas as pd
+
+from src.funciones_petroleras import preparar_pozos
+from src.modelos_declinacion import (
+    acumulada_por_pozo,
+    tiempo_a_tasa_por_pozo,
+)
+from src.petro_logic import calcular_q_limite
+
+T_MAXIMO_DIAS = 30 * 365  # tope de vida útil (evita reservas infinitas con b >= 1 y Qel ~ 0)
+
+
+def calcular_reservas(modelos, qi, di, b, q_limite, np_historica=0.0, t_maximo=T_MAXIMO_DIAS):
+    """
+    Vectorizado sobre pozos. Devuelve un dict de arrays:
+    t_limite (días hasta Qel), reservas_remanentes (bbl) y eur (bbl).
+    """
+    qi = np.atleast_1d(np.asarray(qi, dtype=float))
+    q_limite = np.broadcast_to(np.asarray(q_limite, dtype=float), qi.shape)
+
+    t_limite = tiempo_a_tasa_por_pozo(modelos, qi, di, b, q_limite)
+    t_limite = np.where(np.isfinite(t_limite), t_limite, t_maximo)
+    t_limite = np.clip(t_limite, 0, t_maximo)
+    # Si el pozo ya está por debajo del límite, no hay reservas económicas remanentes
+    t_limite = np.where(qi > q_limite, t_limite, 0.0)
+
+    remanentes = acumulada_por_pozo(modelos, qi, di, b, t_limite)
+    return {
+        "t_limite": t_limite,
+        "reservas_remanentes": remanentes,
+        "eur": np.asarray(np_historica, dtype=float) + remanentes,
+    }
+
+
+def reservas_por_pozo(df, precio_brent, opex_mensual, regalias=0.12, np_historica=None, m_std=30):
+    """
+    Reservas por pozo para un escenario. 'np_historica' es opcional: una Serie
+    indexada por pozo_id con la producción ya acumulada (ver produccion_acumulada_historica).
+    """
+    df = preparar_pozos(df)
+    q_limite = calcular_q_limite(opex_mensual / m_std, precio_brent, regalias)
+
+    acumulada = 0.0
+    if np_historica is not None:
+        acumulada = df['pozo_id'].map(np_historica).fillna(0).to_numpy(dtype=float)
+
+    res = calcular_reservas(
+        df['modelo_declinacion'].to_numpy(), df['prod_real_bpd'].to_numpy(dtype=float),
+        df['di'].to_numpy(dtype=float), df['b'].to_numpy(dtype=float), q_limite, acumulada,
+    )
+    return pd.DataFrame({
+        'pozo_id': df['pozo_id'].to_numpy(),
+        'q_limite': q_limite,
+        'dias_hasta_limite': res['t_limite'],
+        'reservas_remanentes_bbl': res['reservas_remanentes'],
+        'eur_bbl': res['eur'],
+    })
+
+
+def resumir_reservas_campo(df_reservas, por=None):
+    """Roll-up al campo (o por la columna 'por', p. ej. categoría)."""
+    columnas = ['reservas_remanentes_bbl', 'eur_bbl']
+    if por is None:
+        totales = df_reservas[columnas].sum()
+        totales['pozos_con_reservas'] = int((df_reservas['reservas_remanentes_bbl'] > 0).sum())
+        return totales
+    return df_reservas.groupby(por)[columnas].sum()
+
+
+def sensibilidad_brent(df, precios_brent, opex_mensual, regalias=0.12, m_std=30):
+    """
+    Reservas remanentes del campo para cada precio Brent (vía Qel).
+    Una llamada vectorizada sobre todos los pozos por cada precio.
+    """
+    df = preparar_pozos(df)
+    modelos = df['modelo_declinacion'].to_numpy()
+    qi = df['prod_real_bpd'].to_numpy(dtype=float)
+    di = df['di'].to_numpy(dtype=float)
+    b = df['b'].to_numpy(dtype=float)
+
+    filas = []
+    for precio in precios_brent:
+        q_limite = calcular_q_limite(opex_mensual / m_std, precio, regalias)
+        res = calcular_reservas(modelos, qi, di, b, q_limite)
+        filas.append({
+            'brent': precio,
+            'q_limite': q_limite,
+            'reservas_remanentes_bbl': res['reservas_remanentes'].sum(),
+            'pozos_con_reservas': int((res['reservas_remanentes'] > 0).sum()),
+        })
+    return pd.DataFrame(filas)
+
+
+def produccion_acumulada_historica(df_historico):
+    """Np histórico por pozo a partir de caudales diarios (bbl/d x 1 día)."""
+    return df_historico.groupby('pozo_id')['q_petroleo'].sum()
@@ -0,0 +1,217 @@
+# src/validacion.py
+"""
+Pipeline declarativo de limpieza y validación de datos de campo.
+
+Cada regla es un dict {'nombre', 'columna', 'accion', ...parámetros}. Todas se
+evalúan como máscaras vectorizadas sobre la columna completa (tiempo lineal) y
+las filas rechazadas se juntan al final: se quitan del resultado y se escriben
+en un archivo de cuarentena con el motivo. Devuelve los datos limpios y tipados
+más un contador de filas afectadas por regla.
+
+Acciones disponibles:
+    'numerico'    convierte a float (lo no numérico queda NaN)
+    'texto'       convierte a str y recorta espacios
+    'porcentaje'  normaliza la unidad de la columna ('fraccion' o 'porcentaje').
+                  Regla única: si algún valor supera 1, la columna viene en %.
+                  Con 'origen' fijado (ver fijar_unidades) no se vuelve a decidir.
+    'recortar'    recorta a [minimo, maximo]
+    'rellenar'    completa NaN con 'valor'
+    'cuarentena'  rechaza la fila si el valor no cumple minimo < v < maximo
+                  (los NaN también se rechazan)
+"""
+import io
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DIR_CUARENTENA = Path(__file__).resolve().parent.parent / "datos" / "cuarentena"
+
+
+# --- CONJUNTOS DE REGLAS ---
+
+# Carga base (procesar_datos_produccion): sólo tipado, no descarta filas
+REGLAS_PRODUCCION = [
+    {"nombre": "prod_real_no_numerica", "columna": "prod_real_bpd", "accion": "numerico"},
+    {"nombre": "prod_teorica_no_numerica", "columna": "prod_teorica_bpd", "accion": "numerico"},
+]
+
+# Vista Global: sin dato o negativo se interpreta como pozo parado (0), WC en fracción
+REGLAS_MONITOREO = [
+    {"nombre": "prod_real_no_numerica", "columna": "prod_real_bpd", "accion": "numerico"},
+    {"nombre": "prod_real_negativa", "columna": "prod_real_bpd", "accion": "recortar", "minimo": 0},
+    {"nombre": "prod_real_sin_dato", "columna": "prod_real_bpd", "accion": "rellenar", "valor": 0},
+    {"nombre": "water_cut_no_numerico", "columna": "water_cut", "accion": "numerico"},
+    {"nombre": "water_cut_unidad", "columna": "water_cut", "accion": "porcentaje", "unidad": "fraccion"},
+]
+
+# Detalle de pozo: se descartan caudales imposibles (<= 0 o >= 5000 bpd)
+REGLAS_DETALLE = [
+    {"nombre": "pozo_id", "columna": "pozo_id", "accion": "texto"},
+    {"nombre": "prod_real_no_numerica", "columna": "prod_real_bpd", "accion": "numerico"},
+    {"nombre": "prod_teorica_no_numerica", "columna": "prod_teorica_bpd", "accion": "numerico"},
+    {"nombre": "prod_real_fuera_de_rango", "columna": "prod_real_bpd", "accion": "cuarentena",
+     "minimo": 0, "maximo": 5000},
+    {"nombre": "water_cut_no_numerico", "columna": "water_cut", "accion": "numerico"},
+    {"nombre": "water_cut_unidad", "columna": "water_cut", "accion": "porcentaje", "unidad": "fraccion"},
+]
+
+
+def unidad_origen(valores):
+    """'porcentaje' si algún valor es > 1, si no 'fraccion' (decisión por columna)."""
+    wc = pd.to_numeric(pd.Series(valores), errors='coerce').to_numpy(dtype=float)
+    return "porcentaje" if np.isfinite(wc).any() and np.nanmax(wc) > 1 else "fraccion"
+
+
+def normalizar_water_cut(valores, unidad="fraccion", origen=None):
+    """
+    Water cut en una unidad consistente. La unidad de origen se decide por
+    columna (no valor a valor): si algún valor es > 1, la columna está en %.
+    'origen' fuerza la unidad de entrada (p. ej. la decidida sobre el archivo
+    completo cuando sólo se procesan las filas nuevas).
+    """
+    wc = pd.to_numeric(pd.Series(valores), errors='coerce').to_numpy(dtype=float)
+    en_porcentaje = (origen or unidad_origen(wc)) == "porcentaje"
+    if unidad == "fraccion" and en_porcentaje:
+        wc = wc / 100
+    elif unidad == "porcentaje" and not en_porcentaje:
+        wc = wc * 100
+    return wc
+
+
+def _cambiados(nuevo, original):
+    # Cuenta valores modificados (un NaN que sigue siendo NaN no es un cambio)
+    return int((~((nuevo == original) | (np.isnan(nuevo) & np.isnan(original)))).sum())
+
+
+def _aplicar_regla(df, regla):
+    """Aplica una regla. Devuelve (máscara de filas a rechazar o None, filas afectadas)."""
+    col = regla["columna"]
+    accion = regla["accion"]
+    if col not in df.columns:
+        return None, 0
+
+    if accion == "numerico":
+        antes_nulo = df[col].isna().to_numpy()
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+        return None, int((df[col].isna().to_numpy() & ~antes_nulo).sum())
+
+    if accion == "texto":
+        original = df[col]
+        df[col] = original.astype(str).str.strip()
+        return None, int((df[col] != original).sum())
+
+    if accion == "porcentaje":
+        original = df[col].to_numpy(dtype=float)
+        df[col] = normalizar_water_cut(original, regla.get("unidad", "fraccion"), regla.get("origen"))
+        return None, _cambiados(df[col].to_numpy(), original)
+
+    if accion == "recortar":
+        valores = df[col].to_numpy(dtype=float)
+        recortado = np.clip(valores, regla.get("minimo"), regla.get("maximo"))
+        df[col] = recortado
+        return None, _cambiados(recortado, valores)
+
+    if accion == "rellenar":
+        nulos = df[col].isna().to_numpy()
+        df[col] = df[col].fillna(regla["valor"])
+        return None, int(nulos.sum())
+
+    if accion == "cuarentena":
+        valores = df[col].to_numpy(dtype=float)
+        valido = ~np.isnan(valores)
+        if regla.get("minimo") is not None:
+            valido &= valores > regla["minimo"]
+        if regla.get("maximo") is not None:
+            valido &= valores < regla["maximo"]
+        return ~valido, int((~valido).sum())
+
+    raise ValueError(f"Acción de validación desconocida: '{accion}'")
+
+
+def validar_datos(df, reglas, origen=None, dir_cuarentena=DIR_CUARENTENA):
+    """
+    Aplica las reglas en una pasada vectorizada.
+    Devuelve (df_limpio, contadores). Si 'origen' viene informado, las filas
+    rechazadas se agregan a 'datos/cuarentena/<origen>_cuarentena.csv'.
+    """
+    df = df.copy()
+    contadores = {"filas_entrada": len(df)}
+    rechazo = np.zeros(len(df), dtype=bool)
+    motivos = []
+
+    for regla in reglas:
+        mascara, afectadas = _aplicar_regla(df, regla)
+        contadores[regla["nombre"]] = contadores.get(regla["nombre"], 0) + afectadas
+        if mascara is not None:
+            rechazo |= mascara
+            motivos.append((regla["nombre"], mascara))
+
+    contadores["filas_cuarentena"] = int(rechazo.sum())
+    contadores["filas_validas"] = len(df) - contadores["filas_cuarentena"]
+
+    if rechazo.any() and origen:
+        df_rechazo = df[rechazo].copy()
+        # El motivo se arma sólo sobre las filas rechazadas (pocas), regla por regla
+        motivo = pd.Series("", index=df_rechazo.index)
+        for nombre, mascara in motivos:
+            motivo = motivo.where(~mascara[rechazo], motivo + nombre + ";")
+        df_rechazo['motivo'] = motivo.str.rstrip(";")
+        df_rechazo['origen'] = origen
+        df_rechazo['fecha_validacion'] = datetime.now().isoformat(timespec="seconds")
+        escribir_cuarentena(df_rechazo, origen, dir_cuarentena)
+
+    return df[~rechazo].reset_index(drop=True), contadores
+
+
+def fijar_unidades(reglas, df):
+    """
+    Copia de las reglas con la unidad de origen de cada columna 'porcentaje'
+    decidida sobre 'df' (datos crudos). Sirve para validar después sólo filas
+    nuevas del mismo archivo con la misma unidad.
+    """
+    fijas = []
+    for regla in reglas:
+        if regla["accion"] == "porcentaje" and regla["columna"] in df.columns and "origen" not in regla:
+            regla = {**regla, "origen": unidad_origen(df[regla["columna"]])}
+        fijas.append(regla)
+    return fijas
+
+
+def unidades_consistentes(reglas, df):
+    """
+    False si las filas crudas de 'df' cambian la unidad fijada de alguna columna
+    (un valor > 1 en una columna fijada como fracción): todo el archivo pasa a
+    estar en % y hay que revalidarlo completo.
+    """
+    for regla in reglas:
+        if (regla["accion"] == "porcentaje" and regla.get("origen") == "fraccion"
+                and regla["columna"] in df.columns
+                and unidad_origen(df[regla["columna"]]) == "porcentaje"):
+            return False
+    return True
+
+
+def escribir_cuarentena(df_rechazo, origen, dir_cuarentena=DIR_CUARENTENA):
+    """
+    Agrega las filas rechazadas al archivo de cuarentena del origen. Una fila
+    que ya está (mismo pozo y mismos valores; sólo cambia fecha_validacion) no
+    se repite: recargar el mismo archivo no hace crecer la cuarentena.
+    """
+    dir_cuarentena = Path(dir_cuarentena)
+    dir_cuarentena.mkdir(parents=True, exist_ok=True)
+    ruta = dir_cuarentena / f"{origen}_cuarentena.csv"
+    if ruta.exists():
+        # Se comparan como texto, con el mismo formato con que se escribieron
+        existentes = pd.read_csv(ruta, dtype=str, keep_default_na=False)
+        nuevas = pd.read_csv(io.StringIO(df_rechazo.to_csv(index=False)), dtype=str, keep_default_na=False)
+        columnas = [c for c in nuevas.columns if c in existentes.columns and c != 'fecha_validacion']
+        # Anti-join vectorizado: un hash por fila y pertenencia con isin
+        vistas = pd.util.hash_pandas_object(existentes[columnas], index=False).to_numpy()
+        repetidas = np.isin(pd.util.hash_pandas_object(nuevas[columnas], index=False).to_numpy(), vistas)
+        df_rechazo = df_rechazo[~repetidas]
+        if len(df_rechazo) == 0:
+            return ruta
+    df_rechazo.to_csv(ruta, mode='a', header=not ruta.exists(), index=False)
+    return ruta